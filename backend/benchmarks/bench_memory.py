@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Track a game's resident memory over a long run.
+
+Steps one game against a canned LLM (no API key, no TTS) and reports the
+Python heap growth measured by tracemalloc every few steps, with history
+compaction on (the default settings) and off (every item kept live).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_memory --steps 100 --audio-bytes 20000
+"""
+
+import argparse
+import asyncio
+import base64
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+os.environ.setdefault("IMPOSTOR_EVENT_LOG_DIR", "")
+
+from src.core.tts_service import tts_service
+from src.features.impostor_game.history import ColdStore, History
+from src.features.impostor_game.service import ImpostorGameService
+
+
+class CannedLLMClient:
+    async def generate_response(self, messages, max_tokens: int = 200, temperature: float = 0.7) -> str:
+        if "moderating" in messages[-1]["content"]:
+            return "Red"
+        return json.dumps({
+            "think": "Blue was the only one near Electrical, I should keep an eye on them.",
+            "speak": "Blue, where were you when the lights went out?",
+            "impostor_hypothesis": "blue",
+            "vote": None,
+        })
+
+
+async def fake_speech(text, agent_color, is_impostor=False, on_sent=None):
+    if on_sent:
+        on_sent()
+    # Compressed audio is close to random bytes
+    return base64.b64encode(os.urandom(fake_speech.audio_bytes)).decode()
+
+
+async def run(mode: str, args) -> dict:
+    saved = History.hot_items, History.cold_store
+    if mode == "uncompacted":
+        History.hot_items = 10 ** 9
+    elif mode == "spilled":
+        History.cold_store = ColdStore(tempfile.mkdtemp(prefix="history-spill-"))
+    try:
+        service = ImpostorGameService()
+        service.llm_client = CannedLLMClient()
+        service.joint_generator.llm_client = service.llm_client
+        game_id = service.create_game(max_steps=args.steps + 1).game_id
+
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        samples = []
+        for step in range(1, args.steps + 1):
+            await service.step_game(game_id)
+            if step % args.every == 0:
+                gc.collect()
+                samples.append({"step": step, "kib": (tracemalloc.get_traced_memory()[0] - base) / 1024})
+        tracemalloc.stop()
+        return {"mode": mode, "samples": samples}
+    finally:
+        History.hot_items, History.cold_store = saved
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--every", type=int, default=20, help="sample every N steps")
+    parser.add_argument("--audio-bytes", type=int, default=0, help="fake TTS audio per spoken line (0: no audio)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    tts_service.api_key = None  # never hit ElevenLabs from a benchmark
+    if args.audio_bytes:
+        fake_speech.audio_bytes = args.audio_bytes
+        tts_service.api_key = "benchmark"
+        tts_service.text_to_speech = fake_speech
+    await run("compacted", argparse.Namespace(steps=5, every=5))  # warm up imports and caches
+    results = [await run(mode, args) for mode in ("uncompacted", "compacted", "spilled")]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    steps = [s["step"] for s in results[0]["samples"]]
+    print(f"{'mode':<12} " + " ".join(f"{'step ' + str(s):>10}" for s in steps) + "   (KiB growth)")
+    for r in results:
+        print(f"{r['mode']:<12} " + " ".join(f"{s['kib']:>10.0f}" for s in r["samples"]))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Measure CPU time spent building agent prompts per step.
+
+Compares building a fresh Crewmate/Impostor for every agent on every step
+(rendering the role, instruction text and conversation window each time) with
+reusing the game's agents, whose static prompt segments were rendered once,
+and the game's shared conversation window, where each action is formatted once.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_prompt_build --history 60
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+os.environ.setdefault("IMPOSTOR_EVENT_LOG_DIR", "")
+
+from src.features.impostor_game.schema import ActionType, AgentAction, AgentMemory
+from src.features.impostor_game.service import ImpostorGameService
+
+
+def build_game(service: ImpostorGameService, history: int):
+    game = service.get_game(service.create_game().game_id)
+    for i in range(history):
+        agent = game.agents[i % len(game.agents)]
+        game.public_action_history.append(AgentAction(agent_id=agent.id, action_type=ActionType.SPEAK,
+                                                      content=f"Step {i}: where were you when the lights went out?"))
+        game.private_thoughts.setdefault(agent.id, []).append(AgentAction(agent_id=agent.id, action_type=ActionType.THINK,
+                                                                          content="Blue was near the vent."))
+        agent.memory_history.append(AgentMemory(step_number=i, location=agent.location, action=agent.action, met=agent.met))
+    return game
+
+
+def time_steps(service, game, steps: int, reuse: bool) -> float:
+    context = service._build_step_context(game, service._get_alive_agents(game))
+    action = AgentAction(agent_id="red", action_type=ActionType.SPEAK, content="Blue, where were you?")
+    start = time.process_time()
+    # The builders still print debug lines; keep them out of the terminal, not out of the measurement
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(steps):
+            game.public_action_history.append(action)
+            conversation = service._conversation(game) if reuse else None
+            for agent_data in service._get_alive_agents(game):
+                agent = service._create_agent(agent_data, game.game_id if reuse else None)
+                agent.build_messages(context, game.public_action_history,
+                                     game.private_thoughts.get(agent_data.id, []), game.agents, conversation)
+    return (time.process_time() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=200, help="prompt builds per agent")
+    parser.add_argument("--history", type=int, default=60, help="actions already in the game")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    service = ImpostorGameService()
+    game = build_game(service, args.history)
+    time_steps(service, game, 5, reuse=True)  # warm up
+    per_step = time_steps(service, game, args.steps, reuse=False)
+    reused = time_steps(service, game, args.steps, reuse=True)
+    result = {"history": args.history, "per_step_agents_us": per_step * 1e6, "per_game_agents_us": reused * 1e6,
+              "speedup": per_step / reused}
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"prompt build CPU per step ({len(service._get_alive_agents(game))} agents, {args.history} actions of history)")
+    print(f"  fresh agents every step:            {result['per_step_agents_us']:8.1f} us")
+    print(f"  reused agents, shared conversation: {result['per_game_agents_us']:8.1f} us  ({result['speedup']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
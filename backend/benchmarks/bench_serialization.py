@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Measure step response encode time against conversation history length.
+
+Compares FastAPI's default `response_model` path (dump to dict, re-validate,
+dump to JSON-compatible objects, json.dumps) with the fast path used by the
+routes (`model_construct` + pydantic-core's JSON serializer via ModelResponse).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization --lengths 10 100 1000 5000
+"""
+
+import argparse
+import json
+import os
+import timeit
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from src.core.responses import ModelResponse
+from src.features.impostor_game.history import History
+from src.features.impostor_game.schema import ActionType, AgentAction, AgentTurn, GamePhase, StepResponse
+
+
+def build_history(length: int) -> History:
+    history = History()
+    colors = ["red", "blue", "green", "yellow"]
+    for i in range(length):
+        color = colors[i % len(colors)]
+        if i % 4 == 3:
+            history.append(AgentAction(agent_id=color, action_type=ActionType.VOTE,
+                                       content="I vote to eliminate blue", target_agent_id="blue"))
+        else:
+            history.append(AgentAction(agent_id=color, action_type=ActionType.SPEAK,
+                                       content=f"Step {i}: I was in Electrical fixing the wiring, where were you?"))
+    return history
+
+
+def build_turns():
+    return [
+        AgentTurn(agent_id=color, agent_name=color.title(), think="Blue was near the vent.",
+                  speak="Blue, where were you?", vote=None, impostor_hypothesis="blue")
+        for color in ["red", "blue", "green", "yellow"]
+    ]
+
+
+def default_path(history, turns) -> bytes:
+    """What FastAPI does with a model returned from a route with response_model set"""
+    response = StepResponse(game_id="g", phase=GamePhase.ACTIVE, step_number=len(history), max_steps=30,
+                            turns=turns, conversation_history=list(history), message="Step completed")
+    validated = StepResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(history, turns) -> bytes:
+    response = StepResponse.model_construct(game_id="g", phase=GamePhase.ACTIVE, step_number=len(history),
+                                            max_steps=30, turns=turns, conversation_history=history.fork(),
+                                            message="Step completed")
+    return ModelResponse(response).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="conversation history lengths to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats (best is reported)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    turns = build_turns()
+    results = []
+    for length in args.lengths:
+        history = build_history(length)
+        assert json.loads(default_path(history, turns)) == json.loads(fast_path(history, turns))
+        number = max(1, 2000 // max(length, 1))
+        row = {"history_length": length}
+        for name, fn in (("default", default_path), ("fast", fast_path)):
+            best = min(timeit.repeat(lambda: fn(history, turns), number=number, repeat=args.repeat))
+            row[f"{name}_ms"] = best / number * 1000
+        row["speedup"] = row["default_ms"] / row["fast_ms"]
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'history':>8} {'default ms':>11} {'fast ms':>9} {'speedup':>8}")
+    for r in results:
+        print(f"{r['history_length']:>8} {r['default_ms']:>11.3f} {r['fast_ms']:>9.3f} {r['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
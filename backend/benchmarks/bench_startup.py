@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Measure how long the API takes to import and to become ready.
+
+Each run is a fresh interpreter, as in a worker (re)start:
+  - import: `import src.main` wall time, minus a bare interpreter start, with
+    the modules contributing most (from `python -X importtime`)
+  - ready: uvicorn launch until GET /ready answers 200, with the startup
+    phases the app reports there (import, configure, warmup)
+
+Run it before and after a change to keep startup from regressing; `--warmup`
+measures readiness with IMPOSTOR_WARMUP=1 (services created at startup).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --runs 5 --warmup --json
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def app_env(warmup: bool) -> Dict[str, str]:
+    env = dict(os.environ, IMPOSTOR_EVENT_LOG_DIR="", LOG_LEVEL="WARNING")
+    env.setdefault("ANTHROPIC_API_KEY", "benchmark")
+    env["IMPOSTOR_WARMUP"] = "1" if warmup else "0"
+    return env
+
+
+def time_command(code: str, env: Dict[str, str]) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def slowest_imports(env: Dict[str, str], top: int) -> List[Dict]:
+    """App modules and top-level packages by cumulative import time (nested entries overlap)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"], cwd=BACKEND_DIR, env=env,
+                            check=True, capture_output=True, text=True)
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if name != "src.main" and (name.startswith("src.") or "." not in name):
+            modules[name] = max(modules.get(name, 0), int(parts[1]))
+    ranked = sorted(modules.items(), key=lambda item: -item[1])[:top]
+    return [{"module": name, "ms": us / 1000} for name, us in ranked]
+
+
+def time_to_ready(env: Dict[str, str], timeout: float = 60.0) -> Dict:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port),
+                                "--log-level", "warning"], cwd=BACKEND_DIR, env=env)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1)
+                if response.status_code == 200:
+                    return {"ready_s": time.perf_counter() - started, "phases_s": response.json()["startup_s"]}
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"not ready after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement (median is reported)")
+    parser.add_argument("--warmup", action="store_true", help="start the app with IMPOSTOR_WARMUP=1")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    env = app_env(args.warmup)
+    interpreter = statistics.median(time_command("pass", env) for _ in range(args.runs))
+    imports = [time_command("import src.main", env) - interpreter for _ in range(args.runs)]
+    ready = [time_to_ready(env) for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "interpreter_s": interpreter,
+        "import_s": statistics.median(imports),
+        "ready_s": statistics.median(r["ready_s"] for r in ready),
+        "phases_s": {phase: statistics.median(r["phases_s"].get(phase, 0.0) for r in ready)
+                     for phase in ready[0]["phases_s"]},
+        "slowest_imports": slowest_imports(env, args.top),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"interpreter start  {report['interpreter_s'] * 1000:8.1f} ms")
+    print(f"import src.main    {report['import_s'] * 1000:8.1f} ms")
+    print(f"launch to /ready   {report['ready_s'] * 1000:8.1f} ms" + ("  (warmup)" if args.warmup else ""))
+    for phase, seconds in report["phases_s"].items():
+        print(f"  {phase:<16} {seconds * 1000:8.1f} ms")
+    print("slowest imports:")
+    for row in report["slowest_imports"]:
+        print(f"  {row['module']:<40} {row['ms']:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
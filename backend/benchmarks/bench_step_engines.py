@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare the fan-out and joint step engines.
+
+Runs pre-meeting steps against a simulated LLM provider (no API key needed)
+and reports LLM calls, estimated tokens and latency per step for each engine.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_step_engines --steps 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import time
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from src.core.tts_service import tts_service
+from src.features.impostor_game.service import ImpostorGameService, STEP_ENGINES
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class SimulatedLLMClient:
+    """Stand-in for LLMClient with a latency model and call/token counters"""
+
+    def __init__(self, base_latency: float, per_output_token: float, seed: int = 0):
+        self.base_latency = base_latency
+        self.per_output_token = per_output_token
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def _respond(self, prompt: str) -> str:
+        candidates = re.findall(r"^- (\w+) wants to say", prompt, re.MULTILINE)
+        if candidates:
+            return candidates[0]
+        turn = {
+            "think": "Blue was the only one near Electrical, I should keep an eye on them.",
+            "speak": "Blue, where were you when the lights went out?",
+            "impostor_hypothesis": "blue",
+            "vote": None,
+        }
+        joint_colors = re.findall(r"^### (\w+)$", prompt, re.MULTILINE)
+        if joint_colors:
+            return json.dumps({"turns": {color: turn for color in joint_colors}})
+        return json.dumps(turn)
+
+    async def generate_response(self, messages, max_tokens: int = 200, temperature: float = 0.7) -> str:
+        prompt = "\n".join(m["content"] for m in messages)
+        response = self._respond(prompt)
+        output_tokens = estimate_tokens(response)
+        self.calls += 1
+        self.input_tokens += estimate_tokens(prompt)
+        self.output_tokens += output_tokens
+        # Heavy-ish tail: lognormal jitter around base + decode time
+        latency = (self.base_latency + output_tokens * self.per_output_token) * self.random.lognormvariate(0, 0.3)
+        await asyncio.sleep(latency)
+        return response
+
+
+async def run_engine(engine: str, steps: int, args) -> dict:
+    service = ImpostorGameService()
+    client = SimulatedLLMClient(args.base_latency, args.per_output_token, seed=args.seed)
+    service.llm_client = client
+    service.joint_generator.llm_client = client
+
+    game_id = service.create_game(max_steps=max(steps + 1, 5), engine=engine).game_id
+    latencies = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        await service.step_game(game_id)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "engine": engine,
+        "steps": steps,
+        "llm_calls_per_step": client.calls / steps,
+        "input_tokens_per_step": client.input_tokens / steps,
+        "output_tokens_per_step": client.output_tokens / steps,
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_p95_s": sorted(latencies)[max(0, int(round(0.95 * len(latencies))) - 1)],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=10, help="pre-meeting steps per engine (max 24)")
+    parser.add_argument("--base-latency", type=float, default=0.4, help="simulated time to first token (s)")
+    parser.add_argument("--per-output-token", type=float, default=0.005, help="simulated decode time per token (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    steps = min(args.steps, 24)
+    tts_service.api_key = None  # never hit ElevenLabs from a benchmark
+    results = [await run_engine(engine, steps, args) for engine in STEP_ENGINES]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'engine':<8} {'calls/step':>10} {'in tok/step':>12} {'out tok/step':>13} {'mean s':>8} {'p95 s':>8}")
+    for r in results:
+        print(f"{r['engine']:<8} {r['llm_calls_per_step']:>10.1f} {r['input_tokens_per_step']:>12.0f} "
+              f"{r['output_tokens_per_step']:>13.0f} {r['latency_mean_s']:>8.2f} {r['latency_p95_s']:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
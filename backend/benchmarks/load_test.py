@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+End-to-end HTTP load test of /init and /step.
+
+Starts the provider stand-ins (benchmarks/stub_providers.py) and one uvicorn
+process serving the real app from src/main.py, then creates games at a
+configurable arrival rate and engine mix and steps each one to completion.
+Reports throughput, latency percentiles and errors per route, plus a time
+series of in-flight games, server RSS and event-loop lag (latency of a
+/health probe sent every sample interval).
+
+Reports are written as JSON (`--out`) for comparison across versions.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --games 200 --arrival-rate 5 --mix fanout=0.7,joint=0.3
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --pid 1234 --games 50   # existing server
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Resident set size of `pid` (Linux /proc), or None when unavailable"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def percentile(ordered: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        engine, _, weight = part.partition("=")
+        mix[engine.strip()] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    """Per-request samples and the sampled time series"""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.requests: List[tuple] = []  # (route, status, latency_s, finished_at_s)
+        self.series: List[Dict] = []
+        self.games_started = 0
+        self.games_finished = 0
+        self.games_in_flight = 0
+
+    def record(self, route: str, status: int, latency: float) -> None:
+        self.requests.append((route, status, latency, time.monotonic() - self.start))
+
+    def summary(self, duration: float) -> Dict:
+        routes = {}
+        for route in sorted({r[0] for r in self.requests}):
+            samples = [r for r in self.requests if r[0] == route]
+            ok = sorted(r[2] for r in samples if r[1] == 200)
+            errors: Dict[str, int] = {}
+            for r in samples:
+                if r[1] != 200:
+                    errors[str(r[1])] = errors.get(str(r[1]), 0) + 1
+            routes[route] = {
+                "requests": len(samples),
+                "throughput_rps": len(ok) / duration if duration else 0.0,
+                "error_rate": (len(samples) - len(ok)) / len(samples),
+                "errors": errors,
+                "latency_s": {f"p{p}": percentile(ok, p) for p in (50, 90, 95, 99)} | {"max": ok[-1] if ok else None},
+            }
+        return routes
+
+
+async def run_game(client: httpx.AsyncClient, recorder: Recorder, engine: str, args) -> None:
+    recorder.games_started += 1
+    recorder.games_in_flight += 1
+    try:
+        start = time.monotonic()
+        try:
+            response = await client.post("/impostor-game/init", params={
+                "num_players": args.players, "max_steps": args.max_steps, "engine": engine})
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 599  # transport error or client timeout
+        recorder.record("init", status, time.monotonic() - start)
+        if status != 200:
+            return
+
+        game_id = response.json()["game_id"]
+        for _ in range(args.max_steps):
+            start = time.monotonic()
+            try:
+                response = await client.post(f"/impostor-game/step/{game_id}")
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 599
+            recorder.record(f"step:{engine}", status, time.monotonic() - start)
+            if status != 200 or response.json().get("game_over"):
+                break
+            if args.think_time:
+                await asyncio.sleep(random.expovariate(1 / args.think_time))
+        recorder.games_finished += 1
+    finally:
+        recorder.games_in_flight -= 1
+
+
+async def sample(client: httpx.AsyncClient, recorder: Recorder, pid: Optional[int], interval: float) -> None:
+    """Every `interval`: server RSS, /health probe latency, load generator loop lag, requests done"""
+    loop = asyncio.get_running_loop()
+    done_before = 0
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        generator_lag = loop.time() - expected
+        start = time.monotonic()
+        try:
+            await client.get("/health")
+            probe = time.monotonic() - start
+        except httpx.HTTPError:
+            probe = None
+        done = len(recorder.requests)
+        recorder.series.append({
+            "t_s": round(time.monotonic() - recorder.start, 3),
+            "games_in_flight": recorder.games_in_flight,
+            "requests_per_s": (done - done_before) / interval,
+            "server_rss_bytes": rss_bytes(pid),
+            "server_loop_lag_s": probe,
+            "generator_loop_lag_s": max(0.0, generator_lag),
+        })
+        done_before = done
+
+
+async def run_load(url: str, pid: Optional[int], args) -> Dict:
+    mix = parse_mix(args.mix)
+    engines, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        sampler = asyncio.ensure_future(sample(client, recorder, pid, args.sample_interval))
+        games = []
+        for _ in range(args.games):
+            if args.concurrency:
+                while recorder.games_in_flight >= args.concurrency:
+                    await asyncio.sleep(0.01)
+            elif args.arrival_rate:
+                await asyncio.sleep(rng.expovariate(args.arrival_rate))  # Poisson arrivals
+            games.append(asyncio.ensure_future(run_game(client, recorder, rng.choices(engines, weights)[0], args)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*games)
+        sampler.cancel()
+    duration = time.monotonic() - recorder.start
+
+    lags = sorted(s["server_loop_lag_s"] for s in recorder.series if s["server_loop_lag_s"] is not None)
+    rss = [s["server_rss_bytes"] for s in recorder.series if s["server_rss_bytes"] is not None]
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("json", "out")},
+        "duration_s": duration,
+        "games": {"started": recorder.games_started, "finished": recorder.games_finished},
+        "routes": recorder.summary(duration),
+        "server_loop_lag_s": {"p50": percentile(lags, 50), "p99": percentile(lags, 99), "max": lags[-1] if lags else None},
+        "server_rss_bytes": {"start": rss[0] if rss else None, "max": max(rss) if rss else None,
+                             "end": rss[-1] if rss else None},
+        "series": recorder.series,
+    }
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def start_servers(args) -> tuple:
+    """Start the provider stand-ins and the app; returns (app URL, app pid, processes)"""
+    stub_port, app_port = free_port(), free_port()
+    stub = subprocess.Popen([sys.executable, "-m", "benchmarks.stub_providers", "--port", str(stub_port),
+                             *shlex.split(args.stub_args)], cwd=BACKEND_DIR)
+    processes = [stub]
+    try:
+        wait_ready(f"http://127.0.0.1:{stub_port}/stats", stub)
+        env = dict(os.environ,
+                   ANTHROPIC_BASE_URL=f"http://127.0.0.1:{stub_port}",
+                   ELEVENLABS_BASE_URL=f"http://127.0.0.1:{stub_port}/v1",
+                   IMPOSTOR_EVENT_LOG_DIR=os.environ.get("IMPOSTOR_EVENT_LOG_DIR", ""),
+                   LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"))
+        app = subprocess.Popen([sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(app_port),
+                                "--log-level", "warning", "--no-access-log"], cwd=BACKEND_DIR, env=env)
+        processes.append(app)
+        wait_ready(f"http://127.0.0.1:{app_port}/health", app)
+    except Exception:
+        for process in processes:
+            process.terminate()
+        raise
+    return f"http://127.0.0.1:{app_port}", app.pid, processes
+
+
+def print_report(report: Dict) -> None:
+    print(f"{report['games']['finished']}/{report['games']['started']} games in {report['duration_s']:.1f}s")
+    print(f"{'route':<14} {'requests':>8} {'rps':>7} {'errors':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7}")
+    fmt = lambda value: f"{value:7.3f}" if value is not None else "      -"
+    for route, r in report["routes"].items():
+        lat = r["latency_s"]
+        print(f"{route:<14} {r['requests']:>8} {r['throughput_rps']:>7.1f} {r['error_rate']:>7.1%} "
+              f"{fmt(lat['p50'])} {fmt(lat['p95'])} {fmt(lat['p99'])} {fmt(lat['max'])}")
+    lag, rss = report["server_loop_lag_s"], report["server_rss_bytes"]
+    print(f"server loop lag (health probe): p50 {fmt(lag['p50']).strip()} s, p99 {fmt(lag['p99']).strip()} s")
+    if rss["max"] is not None:
+        print(f"server RSS: {rss['start'] / 2**20:.0f} MiB -> max {rss['max'] / 2**20:.0f} MiB, end {rss['end'] / 2**20:.0f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="pid of the --url server, for RSS sampling")
+    parser.add_argument("--games", type=int, default=50, help="games to create")
+    parser.add_argument("--arrival-rate", type=float, default=2.0, help="new games per second (Poisson)")
+    parser.add_argument("--concurrency", type=int, default=0, help="keep this many games in flight instead of an arrival rate")
+    parser.add_argument("--mix", default="fanout=1", help="engine mix, e.g. fanout=0.7,joint=0.3")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--max-steps", type=int, default=30, help="max_steps of each game")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between a game's steps (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout per request (s)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="time series resolution (s)")
+    parser.add_argument("--stub-args", default="", help="extra arguments for benchmarks.stub_providers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    processes = []
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        url, pid, processes = start_servers(args)
+    try:
+        report = asyncio.run(run_load(url, pid, args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the Anthropic Messages API and the ElevenLabs TTS API.
+
+Serves `POST /v1/messages` and `POST /v1/text-to-speech/{voice_id}` with the
+same request and response shapes as the real providers, so the whole FastAPI
+app can be load tested with no network and no API keys:
+
+- LLM answers are canned but valid: agent turns, joint turns keyed by color
+  and speaker-selection names, picked with a seeded RNG
+- latency is base + decode time, with lognormal jitter for a realistic tail
+- a fraction of requests can fail with 429 (with Retry-After) or 5xx errors
+- `GET /stats` reports requests, injected errors and tokens served
+
+Usage (from the backend directory):
+    python -m benchmarks.stub_providers --port 9100 --rate-limit-rate 0.02
+
+    # then point the API at it
+    ANTHROPIC_BASE_URL=http://127.0.0.1:9100 ELEVENLABS_BASE_URL=http://127.0.0.1:9100/v1 python -m src.main
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import uuid
+from typing import Dict, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+COLORS = ["red", "blue", "green", "yellow"]
+THOUGHTS = [
+    "{suspect} keeps changing their story about where they were.",
+    "I was with {friend} the whole time, so {suspect} is the one without an alibi.",
+    "Nobody has asked me anything yet; I should watch {suspect} closely.",
+    "{suspect} was near the body and left in a hurry.",
+]
+LINES = [
+    "{Suspect}, where were you when the lights went out?",
+    "I was doing wires in Cafeteria with {Friend}, you can ask them.",
+    "Something doesn't add up about {Suspect}'s alibi.",
+    "{Friend}, did you see {Suspect} near Electrical?",
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class ProviderProfile:
+    """Latency model and fault injection for one stand-in provider"""
+
+    def __init__(self, base_latency: float = 0.0, per_unit: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0):
+        self.base_latency = base_latency
+        self.per_unit = per_unit  # seconds per output token (LLM) or per character (TTS)
+        self.jitter = jitter  # lognormal sigma; 0 = fixed latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+    def latency(self, rng: random.Random, units: int) -> float:
+        latency = self.base_latency + units * self.per_unit
+        return latency * rng.lognormvariate(0, self.jitter) if self.jitter else latency
+
+    def fault(self, rng: random.Random) -> Optional[int]:
+        """Status code of an injected failure, or None"""
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+
+class CannedTurns:
+    """Valid JSON answers for the prompts the game sends"""
+
+    def __init__(self, rng: random.Random, vote_rate: float = 0.05):
+        self.rng = rng
+        self.vote_rate = vote_rate
+
+    def turn(self, color: str) -> Dict:
+        others = [c for c in COLORS if c != color.lower()] or COLORS
+        suspect, friend = self.rng.sample(others, 2)
+        names = {"suspect": suspect, "friend": friend, "Suspect": suspect.capitalize(), "Friend": friend.capitalize()}
+        speak = self.rng.choice(LINES).format(**names) if self.rng.random() < 0.7 else None
+        return {
+            "think": self.rng.choice(THOUGHTS).format(**names),
+            "speak": speak,
+            "impostor_hypothesis": suspect,
+            "vote": suspect if self.rng.random() < self.vote_rate else None,
+        }
+
+    def respond(self, prompt: str) -> str:
+        candidates = re.findall(r"^- (\w+) wants to say", prompt, re.MULTILINE)
+        if candidates:
+            return self.rng.choice(candidates)
+        joint = re.search(r"For EACH player \(([^)]*)\)", prompt)
+        if joint:
+            colors = [color.strip() for color in joint.group(1).split(",")]
+            return json.dumps({"turns": {color: self.turn(color) for color in colors}})
+        agent = re.search(r"YOU ARE: (\w+)", prompt)
+        return json.dumps(self.turn(agent.group(1) if agent else self.rng.choice(COLORS)))
+
+
+def _message_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "\n".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+def create_app(llm: Optional[ProviderProfile] = None, tts: Optional[ProviderProfile] = None,
+               seed: int = 0, audio_bytes: int = 16000, vote_rate: float = 0.05) -> FastAPI:
+    llm = llm or ProviderProfile()
+    tts = tts or ProviderProfile()
+    rng = random.Random(seed)
+    canned = CannedTurns(rng, vote_rate)
+    audio = os.urandom(audio_bytes)
+    stats = {
+        "llm_requests": 0, "llm_rate_limited": 0, "llm_errors": 0, "input_tokens": 0, "output_tokens": 0,
+        "tts_requests": 0, "tts_rate_limited": 0, "tts_errors": 0, "tts_characters": 0,
+    }
+    app = FastAPI(title="Provider stand-ins")
+    app.state.stats = stats
+
+    def anthropic_error(status: int, profile: ProviderProfile) -> JSONResponse:
+        error_type = "rate_limit_error" if status == 429 else "api_error"
+        headers = {"retry-after": str(profile.retry_after)} if status == 429 else None
+        return JSONResponse({"type": "error", "error": {"type": error_type, "message": "Injected failure"}},
+                            status_code=status, headers=headers)
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        stats["llm_requests"] += 1
+        status = llm.fault(rng)
+        if status is not None:
+            stats["llm_rate_limited" if status == 429 else "llm_errors"] += 1
+            return anthropic_error(status, llm)
+
+        prompt = "\n".join(_message_text(message["content"]) for message in body.get("messages", []))
+        text = canned.respond(prompt)
+        input_tokens = estimate_tokens(_message_text(body.get("system", "")) + prompt)
+        output_tokens = min(estimate_tokens(text), body.get("max_tokens", 4096))
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        await asyncio.sleep(llm.latency(rng, output_tokens))
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-3-5-sonnet-20241022"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def text_to_speech(voice_id: str, request: Request):
+        body = await request.json()
+        stats["tts_requests"] += 1
+        status = tts.fault(rng)
+        if status is not None:
+            stats["tts_rate_limited" if status == 429 else "tts_errors"] += 1
+            headers = {"retry-after": str(tts.retry_after)} if status == 429 else None
+            return JSONResponse({"detail": {"status": "injected_failure", "message": "Injected failure"}},
+                                status_code=status, headers=headers)
+
+        characters = len(body.get("text", ""))
+        stats["tts_characters"] += characters
+        await asyncio.sleep(tts.latency(rng, characters))
+        return Response(audio, media_type="audio/mpeg")
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--llm-base-latency", type=float, default=0.4, help="time to first token (s)")
+    parser.add_argument("--llm-per-output-token", type=float, default=0.005, help="decode time per token (s)")
+    parser.add_argument("--llm-jitter", type=float, default=0.3, help="lognormal sigma of LLM latency (0 = fixed)")
+    parser.add_argument("--tts-base-latency", type=float, default=0.3, help="TTS latency (s)")
+    parser.add_argument("--tts-per-char", type=float, default=0.0, help="extra TTS latency per character (s)")
+    parser.add_argument("--tts-jitter", type=float, default=0.3, help="lognormal sigma of TTS latency (0 = fixed)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of injected 429s (s)")
+    parser.add_argument("--audio-bytes", type=int, default=16000, help="size of the returned audio clip")
+    parser.add_argument("--vote-rate", type=float, default=0.05, help="fraction of agent turns that cast a vote")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faults = {"error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate, "retry_after": args.retry_after}
+    app = create_app(
+        llm=ProviderProfile(args.llm_base_latency, args.llm_per_output_token, args.llm_jitter, **faults),
+        tts=ProviderProfile(args.tts_base_latency, args.tts_per_char, args.tts_jitter, **faults),
+        seed=args.seed,
+        audio_bytes=args.audio_bytes,
+        vote_rate=args.vote_rate,
+    )
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
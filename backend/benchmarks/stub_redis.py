@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for a Redis server.
+
+Speaks RESP2 and implements the commands the shared game-state store uses
+(GET/SET with NX/XX/PX/EX, MGET, DEL, EXISTS, INCR, PTTL, WATCH/MULTI/EXEC),
+with Redis semantics for key expiry and optimistic transactions. Start it
+in a test with `await start_server()`, or run it to try several uvicorn
+workers locally without a Redis install.
+
+Usage (from the backend directory):
+    python -m benchmarks.stub_redis --port 6390
+    IMPOSTOR_STATE_URL=redis://127.0.0.1:6390 uvicorn src.main:app --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from src.core.resp import RedisError, read_reply
+
+
+class StubRedis:
+    """Keyspace shared by every connection. Each key has a modification counter for WATCH."""
+
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}  # key -> (value, expires at)
+        self.revisions: Dict[bytes, int] = {}
+        self.commands = 0
+
+    def _touch(self, key: bytes) -> None:
+        self.revisions[key] = self.revisions.get(key, 0) + 1
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            self._touch(key)
+            return None
+        return value
+
+    def revision(self, key: bytes) -> int:
+        self._get(key)  # an expired key counts as modified
+        return self.revisions.get(key, 0)
+
+    def run(self, name: str, args: List[bytes]):
+        self.commands += 1
+        if name == "PING":
+            return "PONG"
+        if name in ("SELECT", "AUTH"):
+            return "OK"
+        if name == "GET":
+            return self._get(args[0])
+        if name == "MGET":
+            return [self._get(key) for key in args]
+        if name == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.monotonic() + int(options[options.index(b"EX") + 1])
+            exists = self._get(key) is not None
+            if (b"NX" in options and exists) or (b"XX" in options and not exists):
+                return None
+            self.data[key] = (value, expires_at)
+            self._touch(key)
+            return "OK"
+        if name == "DEL":
+            deleted = 0
+            for key in args:
+                if self._get(key) is not None:
+                    del self.data[key]
+                    self._touch(key)
+                    deleted += 1
+            return deleted
+        if name == "EXISTS":
+            return sum(1 for key in args if self._get(key) is not None)
+        if name == "INCR":
+            value = int(self._get(args[0]) or 0) + 1
+            expires_at = self.data.get(args[0], (None, None))[1]
+            self.data[args[0]] = (str(value).encode(), expires_at)
+            self._touch(args[0])
+            return value
+        if name == "PTTL":
+            if self._get(args[0]) is None:
+                return -2
+            expires_at = self.data[args[0]][1]
+            return -1 if expires_at is None else int((expires_at - time.monotonic()) * 1000)
+        if name == "FLUSHALL":
+            for key in list(self.data):
+                self._touch(key)
+            self.data.clear()
+            return "OK"
+        return RedisError(f"ERR unknown command '{name}'")
+
+
+def encode_reply(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, RedisError):
+        return b"-%s\r\n" % str(reply).encode()
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(encode_reply(item) for item in reply)
+
+
+async def handle_connection(store: StubRedis, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    watched: Dict[bytes, int] = {}
+    queued: Optional[List[Tuple[str, List[bytes]]]] = None
+    try:
+        while True:
+            try:
+                command = await read_reply(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            name, args = command[0].decode().upper(), command[1:]
+            if name == "WATCH":
+                for key in args:
+                    watched.setdefault(key, store.revision(key))
+                reply = "OK"
+            elif name == "UNWATCH":
+                watched.clear()
+                reply = "OK"
+            elif name == "MULTI":
+                queued = []
+                reply = "OK"
+            elif name == "DISCARD":
+                queued, reply = None, "OK"
+                watched.clear()
+            elif name == "EXEC":
+                if queued is None:
+                    reply = RedisError("ERR EXEC without MULTI")
+                elif any(store.revision(key) != revision for key, revision in watched.items()):
+                    reply = None  # a watched key changed: abort
+                else:
+                    reply = [store.run(queued_name, queued_args) for queued_name, queued_args in queued]
+                queued = None
+                watched.clear()
+            elif queued is not None:
+                queued.append((name, args))
+                reply = "QUEUED"
+            else:
+                reply = store.run(name, args)
+            writer.write(encode_reply(reply))
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def start_server(host: str = "127.0.0.1", port: int = 0) -> Tuple[asyncio.AbstractServer, StubRedis, str]:
+    """Serve a fresh keyspace; returns (server, keyspace, redis:// URL)"""
+    store = StubRedis()
+    server = await asyncio.start_server(lambda r, w: handle_connection(store, r, w), host, port)
+    bound_port = server.sockets[0].getsockname()[1]
+    return server, store, f"redis://{host}:{bound_port}"
+
+
+async def serve(host: str, port: int) -> None:
+    server, _, url = await start_server(host, port)
+    print(f"Redis stand-in listening on {url}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
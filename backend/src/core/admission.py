@@ -0,0 +1,137 @@
+"""
+Admission control: refuse work early instead of letting every game slow down.
+
+Requests that create games or run steps are checked before any work starts:
+
+  - per client: a token bucket (`client_rate` requests per second, bursts of
+    `client_burst`); an exhausted bucket gets a 429. A client is its tenant
+    when it sent one of the configured API keys, its address otherwise, so
+    made-up keys cannot mint fresh buckets
+  - resident games: at most `max_games` active games per worker
+  - concurrent steps: at most `max_steps` steps in flight per worker, counted
+    from admission (the slot is reserved before the handler awaits anything)
+  - queued LLM work: no new step while `max_llm_inflight` LLM calls are
+    outstanding (a step fans out one call per active agent)
+
+Capacity refusals get a 503. Both carry a Retry-After: the time until the
+client's bucket refills, or the recent mean step duration (the time it takes
+for capacity to free up). Every limit is off at 0.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+from .metrics import MetricFamily
+from .settings import Settings
+from .tenancy import ANONYMOUS_TENANT, tenant_var, tenants_of_keys
+
+# Clients whose buckets are kept (least recently seen are dropped, i.e. refilled)
+MAX_TRACKED_CLIENTS = 10000
+
+# Retry-After for capacity refusals before any step was timed (seconds)
+DEFAULT_RETRY_AFTER = 5.0
+
+class Overloaded(Exception):
+    """Raised instead of admitting a request; maps to an HTTP 429 (client limit) or 503 (capacity)"""
+
+    def __init__(self, reason: str, retry_after: float, status_code: int = 503):
+        super().__init__(f"{reason}, retry in {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+class AdmissionController:
+    def __init__(self, max_games: int = 0, max_steps: int = 0, max_llm_inflight: int = 0,
+                 client_rate: float = 0.0, client_burst: int = 10, known_tenants: FrozenSet[str] = frozenset(),
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_games = max_games
+        self.max_steps = max_steps
+        self.max_llm_inflight = max_llm_inflight
+        self.client_rate = client_rate
+        self.client_burst = max(1, client_burst)
+        self.known_tenants = known_tenants  # tenants limited per key rather than per address
+        self.clock = clock
+        self.steps_reserved = 0  # steps admitted and not finished yet
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # client -> [tokens, refilled_at]
+        self.step_seconds: Optional[float] = None  # moving average of step durations
+        self.stats = {"admitted": 0, "rate_limited": 0, "games_full": 0, "steps_full": 0, "llm_full": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AdmissionController":
+        return cls(
+            max_games=settings.max_games,
+            max_steps=settings.max_concurrent_steps,
+            max_llm_inflight=settings.max_llm_inflight,
+            client_rate=settings.client_rate,
+            client_burst=settings.client_burst,
+            known_tenants=tenants_of_keys(settings.client_api_keys),
+        )
+
+    def client_of(self, scope: dict) -> str:
+        """The client a request is limited as: a configured tenant, or else its address"""
+        tenant = tenant_var.get()
+        if tenant in self.known_tenants:
+            return tenant
+        client = scope.get("client")
+        return f"ip-{client[0]}" if client else ANONYMOUS_TENANT
+
+    def _refuse(self, reason: str, retry_after: Optional[float] = None, status_code: int = 503) -> None:
+        self.stats[reason] += 1
+        if retry_after is None:
+            retry_after = self.step_seconds or DEFAULT_RETRY_AFTER
+        raise Overloaded(reason, retry_after, status_code)
+
+    def check_client(self, client: str) -> None:
+        """Take a token from the client's bucket (raises Overloaded with a 429 when it is empty)"""
+        if self.client_rate <= 0:
+            return
+        now = self.clock()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [float(self.client_burst), now]
+            while len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.client_burst, bucket[0] + (now - bucket[1]) * self.client_rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            self._refuse("rate_limited", (1 - bucket[0]) / self.client_rate, status_code=429)
+        bucket[0] -= 1
+
+    def admit_game(self, client: str, active_games: int) -> None:
+        self.check_client(client)
+        if self.max_games and active_games >= self.max_games:
+            self._refuse("games_full")
+        self.stats["admitted"] += 1
+
+    def admit_step(self, client: str, llm_inflight: int, reserve: bool = True) -> None:
+        """Admit a step request and, with `reserve`, hold one step slot for it until `release_step`"""
+        self.check_client(client)
+        if self.max_steps and self.steps_reserved >= self.max_steps:
+            self._refuse("steps_full")
+        if self.max_llm_inflight and llm_inflight >= self.max_llm_inflight:
+            self._refuse("llm_full")
+        self.stats["admitted"] += 1
+        if reserve:
+            self.steps_reserved += 1
+
+    def reserve_step(self) -> None:
+        """Hold a step slot for a step admitted as part of a larger request (bulk steps)"""
+        self.steps_reserved += 1
+
+    def release_step(self) -> None:
+        self.steps_reserved -= 1
+
+    def record_step(self, seconds: float) -> None:
+        self.step_seconds = seconds if self.step_seconds is None else 0.8 * self.step_seconds + 0.2 * seconds
+
+    def collect(self) -> Iterable[MetricFamily]:
+        yield "impostor_admission_total", "counter", "Requests admitted, and refused per reason", [
+            ({"outcome": outcome}, count) for outcome, count in self.stats.items()
+        ]
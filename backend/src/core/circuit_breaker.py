@@ -0,0 +1,89 @@
+import time
+from collections import deque
+from typing import Callable, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"circuit open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Fail fast while a provider is failing, and probe it for recovery.
+
+    Closed: calls go through and their outcomes fill a rolling window. Once the
+    window holds `min_calls` outcomes and the failure rate reaches
+    `failure_rate`, the circuit opens. Open: calls are rejected with
+    `CircuitOpenError` for `open_seconds`. Half-open: one probe call at a time
+    is let through; its success closes the circuit, its failure reopens it.
+
+    Usage:
+        breaker.before_call()    # raises CircuitOpenError
+        try: ... breaker.record_success()
+        except ProviderError: breaker.record_failure()
+        finally: breaker.release()   # frees the half-open probe slot
+    """
+
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 10, window: int = 20, open_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.outcomes = deque(maxlen=window)  # True for a failure
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.probing = False
+        self.outcomes.clear()
+        self.stats["opened"] += 1
+
+    def before_call(self) -> None:
+        if self.state == OPEN:
+            remaining = self.opened_at + self.open_seconds - self.clock()
+            if remaining > 0:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(remaining)
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.probing:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(0.0)
+            self.probing = True
+            self.stats["probes"] += 1
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.probing = False
+        self.outcomes.append(False)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self.outcomes.append(True)
+        if len(self.outcomes) >= self.min_calls and sum(self.outcomes) / len(self.outcomes) >= self.failure_rate:
+            self._open()
+
+    def release(self) -> None:
+        """End a call without an outcome (e.g. cancelled); frees the half-open probe slot"""
+        if self.state == HALF_OPEN:
+            self.probing = False
+
+    def snapshot(self) -> Dict:
+        return {
+            "state": self.state,
+            "failure_rate": round(sum(self.outcomes) / len(self.outcomes), 3) if self.outcomes else 0.0,
+            **self.stats,
+        }
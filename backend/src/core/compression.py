@@ -0,0 +1,48 @@
+"""
+Content-encoding negotiation for response bodies that are encoded once and served many times.
+
+gzip is always available; brotli is offered when the optional `brotli` package
+is installed. Bodies are compressed by the caller's cache, once per version, so
+the levels favour ratio over speed.
+"""
+
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is negotiated
+    brotli = None
+
+# Preferred first
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Bodies smaller than this are sent as is: compression would not pay for the client's decoding
+MIN_COMPRESS_SIZE = 1024
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The best supported encoding the client accepts (None: send the body as is)"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
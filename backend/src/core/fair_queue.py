@@ -0,0 +1,159 @@
+"""
+Weighted fair queuing for provider calls (LLM, TTS).
+
+Games carry a priority class (set at /init). While a provider has free
+capacity, calls go straight through; once `capacity` calls are running, new
+calls wait in a queue per class and, within a class, per game (flow). Freed
+slots go to classes in proportion to their weights (start-time fair queuing:
+each class advances a virtual clock by 1/weight per call served, the lowest
+clock goes next), and to the games of a class in turn, so one game's fan-out
+cannot starve the others. A class with nothing queued gives its share away:
+batch work soaks up whatever interactive games leave.
+
+The class and game of a call are read from context variables set by the game
+service for the step being run (`bind_priority`, `src.core.log.bind_game`).
+"""
+
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from .log import game_id_var
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITY_CLASSES = (INTERACTIVE, BATCH)
+
+priority_var: contextvars.ContextVar[str] = contextvars.ContextVar("priority", default=INTERACTIVE)
+
+def bind_priority(priority: str) -> contextvars.Token:
+    """Schedule provider calls made from the current task (and the tasks it starts) in class `priority`"""
+    return priority_var.set(priority)
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Class weights from "interactive=8,batch=1" (classes left out weigh 1)"""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = max(float(weight), 1e-3)
+    return weights
+
+class _ClassQueue:
+    __slots__ = ("weight", "tag", "vtime", "flows")
+
+    def __init__(self, weight: float, tag: float):
+        self.weight = weight
+        self.tag = tag  # virtual start time of the class's next call
+        self.vtime = 0.0  # virtual time among the class's flows
+        self.flows: "OrderedDict[Optional[str], list]" = OrderedDict()  # flow -> [tag, deque of waiters]
+
+class FairScheduler:
+    """At most `capacity` concurrent calls (0 = unlimited), queued fairly across classes and flows"""
+
+    def __init__(self, capacity: int = 0, weights: Optional[Dict[str, float]] = None):
+        self.capacity = capacity
+        self.weights = weights or {}
+        self.running = 0
+        self.queued = 0
+        self._classes: Dict[str, _ClassQueue] = {}
+        self._vtime = 0.0
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _class_stats(self, priority: str) -> Dict[str, float]:
+        stats = self.stats.get(priority)
+        if stats is None:
+            stats = self.stats[priority] = {"calls": 0, "waited": 0, "wait_s": 0.0}
+        return stats
+
+    async def acquire(self, priority: str, flow: Optional[str] = None) -> None:
+        stats = self._class_stats(priority)
+        stats["calls"] += 1
+        if self.capacity <= 0 or (self.running < self.capacity and not self.queued):
+            self.running += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._enqueue(priority, flow, waiter)
+        started = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # granted just as the caller went away: pass the slot on
+            else:
+                self._remove(priority, flow, queue, waiter)
+            raise
+        stats["waited"] += 1
+        stats["wait_s"] += time.monotonic() - started
+
+    def try_acquire(self, priority: str) -> bool:
+        """Take a slot only if one is free with nobody queued (for optional calls, e.g. hedged duplicates)"""
+        if self.capacity > 0 and (self.running >= self.capacity or self.queued):
+            return False
+        self._class_stats(priority)["calls"] += 1
+        self.running += 1
+        return True
+
+    def release(self) -> None:
+        self.running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None, flow: Optional[str] = None):
+        """Hold a call slot, for the current step's class and game unless given"""
+        await self.acquire(priority or priority_var.get(), flow if flow is not None else game_id_var.get())
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _enqueue(self, priority: str, flow: Optional[str], waiter: asyncio.Future) -> deque:
+        queue = self._classes.get(priority)
+        if queue is None:
+            queue = self._classes[priority] = _ClassQueue(self.weights.get(priority, 1.0), self._vtime)
+        elif not queue.flows:
+            # A class that was idle restarts at the current virtual time (no banked credit)
+            queue.tag = max(queue.tag, self._vtime)
+        entry = queue.flows.get(flow)
+        if entry is None:
+            entry = queue.flows[flow] = [queue.vtime, deque()]
+        entry[1].append(waiter)
+        self.queued += 1
+        return entry[1]
+
+    def _remove(self, priority: str, flow: Optional[str], waiters: deque, waiter: asyncio.Future) -> None:
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            return  # already popped (and skipped) by _dispatch
+        self.queued -= 1
+        flows = self._classes[priority].flows
+        if not waiters and flows.get(flow, (None, None))[1] is waiters:
+            del flows[flow]
+
+    def _dispatch(self) -> None:
+        while self.queued and self.running < self.capacity:
+            queue = min((queue for queue in self._classes.values() if queue.flows), key=lambda queue: queue.tag)
+            self._vtime = queue.tag
+            queue.tag += 1 / queue.weight
+            flow, entry = min(queue.flows.items(), key=lambda item: item[1][0])
+            queue.vtime = entry[0]
+            entry[0] += 1
+            waiter = entry[1].popleft()
+            if not entry[1]:
+                del queue.flows[flow]
+            self.queued -= 1
+            if waiter.done():
+                continue  # cancelled while queued: its caller is leaving, serve the next one
+            self.running += 1
+            waiter.set_result(None)
+
+    def snapshot(self) -> Dict:
+        return {
+            "capacity": self.capacity or None,
+            "running": self.running,
+            "queued": self.queued,
+            "classes": {priority: {**stats, "wait_s": round(stats["wait_s"], 4)} for priority, stats in self.stats.items()},
+        }
+
@@ -0,0 +1,78 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+class LatencyTracker:
+    """Rolling window of call latencies used to decide when to hedge"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency at percentile `p` (0-100), or None until enough samples are recorded"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+async def hedged(
+    make_call: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None,
+    on_hedge_win: Optional[Callable[[], None]] = None,
+    acquire_hedge: Optional[Callable[[], bool]] = None,
+    release_hedge: Optional[Callable[[], None]] = None,
+    on_discard: Optional[Callable[[Optional[T]], None]] = None,
+) -> T:
+    """Run `make_call()`, firing a duplicate if it has not finished after `delay` seconds.
+
+    The duplicate is only fired if `acquire_hedge()` grants it capacity, which
+    `release_hedge()` gives back once it is done. The first successful result
+    wins and the other request is cancelled; `on_discard` is told about it (with
+    its result if it also completed, None if it was cut short), since it was
+    billed all the same. If one request fails while the other is still running,
+    the other one is awaited. Cancelling the caller cancels every request in flight.
+    """
+    if delay is None:
+        return await make_call()
+
+    primary = asyncio.ensure_future(make_call())
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result()
+
+        if acquire_hedge is None or acquire_hedge():
+            if on_hedge:
+                on_hedge()
+            hedge = asyncio.ensure_future(make_call())
+            if release_hedge is not None:
+                # A done callback also runs for a duplicate cancelled before it started
+                hedge.add_done_callback(lambda _: release_hedge())
+            pending.add(hedge)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in done if task.exception() is None), None)
+            if winner is not None:
+                if winner is not primary and on_hedge_win:
+                    on_hedge_win()
+                if on_discard:
+                    for other in done - {winner}:
+                        if other.exception() is None:
+                            on_discard(other.result())
+                    for _ in pending:
+                        on_discard(None)
+                return winner.result()
+            error = next(iter(done)).exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,17 +1,117 @@
-import os
-from typing import List, Dict
-import anthropic
-from dotenv import load_dotenv
+import logging
+import time
+from typing import List, Dict, Optional
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .fair_queue import FairScheduler, parse_weights, priority_var
+from .hedging import LatencyTracker, hedged
+from .settings import Settings
+from .usage import BUDGET_ECONOMY, usage_meter
+
+logger = logging.getLogger(__name__)
+
+class LLMError(Exception):
+    """An LLM call produced no model output"""
+
+class LLMUnavailableError(LLMError):
+    """The call was not made: the provider's circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM provider unavailable, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class LLMProviderError(LLMError):
+    """The provider call failed (the original exception is chained as `__cause__`)"""
+
+def _is_outage(error: Exception) -> bool:
+    """Whether a failure says the provider is unhealthy (vs. a rejected request)"""
+    import anthropic
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return True
 
 class LLMClient:
-    def __init__(self):
-        # Load environment variables
-        load_dotenv()
+    def __init__(self, settings: Optional[Settings] = None):
+        settings = settings or Settings.from_env()
+        # A local stand-in (see benchmarks/stub_providers.py) needs no real key
+        self.base_url = settings.anthropic_base_url
+        self.api_key = settings.anthropic_api_key or ("local" if self.base_url else None)
+        self._client = None
+        self.model = settings.llm_model
+        # Used instead of `model` for games past their budget (see src.core.usage)
+        self.economy_model = settings.llm_economy_model
         
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-        self.client = anthropic.AsyncAnthropic(api_key=api_key)
+        # Hedged requests: once a call outlives this latency percentile, a duplicate
+        # is fired and the first answer wins (0 disables hedging)
+        self.hedge_percentile = settings.llm_hedge_percentile
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "hedges_fired": 0, "hedge_wins": 0, "hedges_skipped": 0, "hedge_losers_billed": 0}
+        # Provider calls queued or awaiting an answer (admission control refuses new steps past a limit)
+        self.inflight = 0
+        # Past LLM_MAX_CONCURRENCY calls, queue by the calling game's priority class and game
+        self.scheduler = FairScheduler(settings.llm_max_concurrency, parse_weights(settings.priority_weights))
+        
+        # Fails calls fast once the provider's error rate trips, then probes it for recovery
+        self.breaker = CircuitBreaker(
+            failure_rate=settings.llm_breaker_failure_rate,
+            min_calls=settings.llm_breaker_min_calls,
+            window=settings.llm_breaker_window,
+            open_seconds=settings.llm_breaker_open_s,
+        )
+    
+    @property
+    def client(self):
+        """The provider SDK client, created on first use: importing the SDK is most of the app's import time"""
+        if self._client is None:
+            if not self.api_key:
+                raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
+            import anthropic
+            self._client = anthropic.AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+        return self._client
+    
+    @client.setter
+    def client(self, value):
+        self._client = value
+    
+    def _hedge_delay(self):
+        if self.hedge_percentile <= 0:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+    
+    def _count(self, key: str):
+        self.stats[key] += 1
+    
+    def _acquire_hedge(self) -> bool:
+        # A duplicate takes a slot of its own, and only a free one: it never jumps the queue
+        if self.scheduler.try_acquire(priority_var.get()):
+            return True
+        self._count("hedges_skipped")
+        return False
+    
+    async def _create(self, request_params: Dict):
+        """One provider call (the caller holds its scheduler slot), hedged when it runs slow"""
+        self.stats["calls"] += 1
+        start = time.monotonic()
+        discarded = []
+        response = await hedged(
+            lambda: self.client.messages.create(**request_params),
+            self._hedge_delay(),
+            on_hedge=lambda: self._count("hedges_fired"),
+            on_hedge_win=lambda: self._count("hedge_wins"),
+            acquire_hedge=self._acquire_hedge,
+            release_hedge=self.scheduler.release,
+            on_discard=discarded.append,
+        )
+        self.latency.record(time.monotonic() - start)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            usage_meter.record_llm(request_params["model"], usage.input_tokens, usage.output_tokens)
+        # The losing request was billed too; one cut short is metered like the winner (same prompt)
+        for loser in discarded:
+            self.stats["hedge_losers_billed"] += 1
+            billed = getattr(loser, "usage", None) or usage
+            if billed is not None:
+                usage_meter.record_llm(request_params["model"], billed.input_tokens, billed.output_tokens)
+        return response
     
     async def generate_response(
         self, 
@@ -19,39 +119,66 @@ class LLMClient:
         max_tokens: int = 200,
         temperature: float = 0.7
     ) -> str:
+        """Model output for `messages`.
+        
+        Raises `LLMUnavailableError` without calling the provider while the
+        circuit breaker is open, and `LLMProviderError` when the call fails.
+        """
+        # Convert messages format for Anthropic
+        system_message = ""
+        conversation_messages = []
+        
+        # Filter out system messages and extract system content
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            elif msg["role"] in ["user", "assistant"]:
+                conversation_messages.append(msg)
+        
+        # Anthropic requires at least one message
+        if not conversation_messages:
+            conversation_messages = [{"role": "user", "content": "Continue the conversation."}]
+        
+        # Create the request parameters
+        model = self.economy_model if usage_meter.budget_state() == BUDGET_ECONOMY else self.model
+        request_params = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": conversation_messages
+        }
+        
+        # Only add system if we have a system message
+        if system_message:
+            request_params["system"] = system_message
+        
+        # Resolved before the breaker: a missing key is a configuration error, not a provider failure
+        self.client
         try:
-            # Convert messages format for Anthropic
-            system_message = ""
-            conversation_messages = []
-            
-            # Filter out system messages and extract system content
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_message = msg["content"]
-                elif msg["role"] in ["user", "assistant"]:
-                    conversation_messages.append(msg)
-            
-            # Anthropic requires at least one message
-            if not conversation_messages:
-                conversation_messages = [{"role": "user", "content": "Continue the conversation."}]
-            
-            # Create the request parameters
-            request_params = {
-                "model": "claude-3-5-sonnet-20241022",
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "messages": conversation_messages
-            }
-            
-            # Only add system if we have a system message
-            if system_message:
-                request_params["system"] = system_message
-            
-            response = await self.client.messages.create(**request_params)
-            
-            return response.content[0].text.strip()
+            self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise LLMUnavailableError(e.retry_after) from None
+        self.inflight += 1
+        try:
+            async with self.scheduler.slot():
+                response = await self._create(request_params)
         except Exception as e:
-            return f"Erreur de génération: {str(e)}"
+            if _is_outage(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            logger.warning("LLM call failed: %s", e, extra={"breaker": self.breaker.state})
+            raise LLMProviderError(str(e)) from e
+        else:
+            self.breaker.record_success()
+        finally:
+            self.inflight -= 1
+            self.breaker.release()
+        
+        try:
+            return response.content[0].text.strip()
+        except (AttributeError, IndexError) as e:
+            raise LLMProviderError(f"Unexpected response: {e}") from e
         
 if __name__ == "__main__":
     # Simple test for LLMClient
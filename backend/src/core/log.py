@@ -0,0 +1,164 @@
+"""
+Structured logging for the API.
+
+Hot-path code logs through the standard `logging` module with lazy %-style
+arguments, so a disabled level costs one `isEnabledFor` check. Records are
+handed to a bounded in-process queue and formatted and written by a background
+listener thread, so enabled output never blocks the event loop; when the queue
+is full, records are dropped and counted instead.
+
+Every record carries the current game id (a context variable set by the game
+service), and DEBUG records are sampled per game so sampled games keep complete
+traces.
+
+Configuration (environment, read through `src.core.settings`):
+    LOG_LEVEL=INFO                  # root level for the app loggers ("src.*")
+    LOG_FORMAT=json                 # json (one object per line) or text
+    LOG_DEBUG_SAMPLE_RATE=1.0       # fraction of games whose DEBUG records are kept
+    LOG_QUEUE_SIZE=10000            # records buffered before dropping
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import zlib
+from typing import Optional
+from .settings import Settings
+
+game_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("game_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "game_id"}
+
+def bind_game(game_id: Optional[str]) -> contextvars.Token:
+    """Tag records logged from the current task (and the tasks it starts) with `game_id`"""
+    return game_id_var.set(game_id)
+
+class GameContextFilter(logging.Filter):
+    """Attach the current game id; runs in the logging task, before the record is queued"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "game_id"):
+            record.game_id = game_id_var.get()
+        return True
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep DEBUG records for a stable fraction of games (records without a game always pass)"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.threshold = int(max(0.0, min(rate, 1.0)) * 10000)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.threshold >= 10000:
+            return True
+        game_id = getattr(record, "game_id", None)
+        if game_id is None:
+            return True
+        return zlib.crc32(game_id.encode()) % 10000 < self.threshold
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "game_id", None):
+            entry["game_id"] = record.game_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(game)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        game_id = getattr(record, "game_id", None)
+        record.game = f" [{game_id[:8]}]" if game_id else ""
+        return super().format(record)
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers formatting to the listener and drops records when full"""
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process: pass the record as is and let the listener
+        # thread do the string formatting
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def configure_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    debug_sample_rate: Optional[float] = None,
+    stream=None,
+    settings: Optional[Settings] = None,
+) -> NonBlockingQueueHandler:
+    """Route the app loggers ("src.*") through the queued handler (idempotent).
+
+    Arguments left unset come from `settings` (default: the environment).
+    """
+    global _handler, _listener
+    settings = settings or Settings.from_env()
+    level = (level or settings.log_level).upper()
+    fmt = fmt or settings.log_format
+    if debug_sample_rate is None:
+        debug_sample_rate = settings.log_debug_sample_rate
+
+    shutdown_logging()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    _handler = NonBlockingQueueHandler(queue.Queue(settings.log_queue_size))
+    _handler.addFilter(GameContextFilter())
+    _handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+    _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=False)
+    _listener.start()
+
+    app_logger = logging.getLogger("src")
+    app_logger.setLevel(level)
+    app_logger.addHandler(_handler)
+    app_logger.propagate = False
+    return _handler
+
+def shutdown_logging() -> None:
+    """Flush queued records and detach the handler"""
+    global _handler, _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        app_logger = logging.getLogger("src")
+        app_logger.removeHandler(_handler)
+        app_logger.propagate = True
+        _handler = None
+
+def logging_stats() -> dict:
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "level": logging.getLevelName(logging.getLogger("src").getEffectiveLevel()),
+    }
+
+atexit.register(shutdown_logging)
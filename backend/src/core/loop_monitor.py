@@ -0,0 +1,198 @@
+"""
+Event-loop lag and stall monitor.
+
+Every game is served by one asyncio loop, so a blocking call (synchronous I/O,
+a long CPU-bound validation) anywhere freezes all of them. A heartbeat task
+wakes up every `interval` seconds and records how late it was as the loop lag
+(exported as a histogram). A watchdog thread notices when the heartbeat stops
+beating for longer than `stall_threshold` and, while the loop is still
+blocked, captures the loop thread's stack together with the game id and route
+of the task that is running. The stall is logged and kept for /debug/loop once
+the loop is responsive again.
+
+Tasks created after `start()` are attributed through a task factory that
+remembers each task's context (reading another task's context variables is
+otherwise impossible from a thread), so the overhead is one weak-dict insert
+per task. The factory wraps any factory already installed, which `stop()` puts
+back. Requests are tagged by `RequestScopeMiddleware`.
+"""
+
+import asyncio
+import collections
+import contextvars
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import Deque, Dict, List, Optional
+from .log import game_id_var
+from .metrics import Histogram, register_collector
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request the current task serves (the router adds the matched route to it)
+request_scope_var: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_scope", default=None)
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class RequestScopeMiddleware:
+    """ASGI middleware binding the request's scope, so stalls can be attributed to a route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+        token = request_scope_var.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope_var.reset(token)
+
+def route_of(scope: Optional[dict]) -> Optional[str]:
+    """'METHOD /route/{template}' once routed, else the raw path"""
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method', scope['type'].upper())} {path}"
+
+class LoopMonitor:
+    def __init__(self, interval: float = 0.05, stall_threshold: float = 0.25, max_stalls: int = 50, stack_depth: int = 30):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.stack_depth = stack_depth
+        self.lag = Histogram(LAG_BUCKETS)
+        self.stalls: Deque[Dict] = collections.deque(maxlen=max_stalls)
+        self.stats = {"stalls": 0, "stalled_seconds": 0.0, "max_lag_s": 0.0}
+        self._contexts: "weakref.WeakKeyDictionary[asyncio.Task, contextvars.Context]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._previous_factory = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = 0.0
+        self._pending: Optional[Dict] = None  # captured by the watchdog, completed by the heartbeat
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None
+
+    def start(self, interval: Optional[float] = None, stall_threshold: Optional[float] = None) -> None:
+        """Start monitoring the running loop (call from the loop, e.g. in the app lifespan)"""
+        if self.running:
+            return
+        if interval is not None:
+            self.interval = interval
+        if stall_threshold is not None:
+            self.stall_threshold = stall_threshold
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stopped.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat_task = None
+        if self._loop.get_task_factory() == self._task_factory:
+            self._loop.set_task_factory(self._previous_factory)
+        self._previous_factory = None
+        self._watchdog.join()
+
+    def _task_factory(self, loop, coro, context=None):
+        context = context if context is not None else contextvars.copy_context()
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, context=context)
+        else:
+            task = asyncio.Task(coro, loop=loop, context=context)
+        self._contexts[task] = context
+        return task
+
+    def context_of(self, task: asyncio.Task) -> Optional[contextvars.Context]:
+        """The context a task runs in, for tasks created while the monitor runs (safe to call from any thread)"""
+        return self._contexts.get(task)
+
+    async def _heartbeat(self) -> None:
+        expected = time.monotonic() + self.interval
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            previous_beat, self._last_beat = self._last_beat, now
+            self.lag.observe(lag)
+            self.stats["max_lag_s"] = max(self.stats["max_lag_s"], lag)
+            pending, self._pending = self._pending, None
+            # A capture that raced with this wake-up describes the loop after it recovered
+            if pending is not None and pending.pop("beat") == previous_beat:
+                self._record_stall(pending, lag)
+            expected = now + self.interval
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            if self._pending is None and time.monotonic() - beat > self.interval + self.stall_threshold:
+                self._pending = self._capture(beat)
+
+    def _capture(self, beat: float) -> Dict:
+        """Snapshot of what the (blocked) loop thread is running, taken from the watchdog thread"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-self.stack_depth:] if frame is not None else []
+        task = asyncio.current_task(self._loop)
+        context = self.context_of(task) if task is not None else None
+        scope = context.get(request_scope_var) if context is not None else None
+        game_id = context.get(game_id_var) if context is not None else None
+        if game_id is None and scope is not None:
+            game_id = scope.get("path_params", {}).get("game_id")
+        return {
+            "beat": beat,
+            "at": time.time(),
+            "game_id": game_id,
+            "route": route_of(scope),
+            "task": task.get_name() if task is not None else None,
+            "stack": [line.rstrip() for line in stack],
+        }
+
+    def _record_stall(self, stall: Dict, lag: float) -> None:
+        stall["duration_s"] = round(lag, 4)
+        self.stalls.append(stall)
+        self.stats["stalls"] += 1
+        self.stats["stalled_seconds"] += lag
+        logger.warning("Event loop blocked for %.3fs", lag, extra={
+            "game_id": stall["game_id"], "route": stall["route"], "task": stall["task"],
+            "stall_s": stall["duration_s"], "stack": "\n".join(stall["stack"]),
+        })
+
+    def stalls_for(self, game_id: str) -> List[Dict]:
+        return [stall for stall in self.stalls if stall["game_id"] == game_id]
+
+    def snapshot(self) -> Dict:
+        return {
+            "running": self.running,
+            "interval_s": self.interval,
+            "stall_threshold_s": self.stall_threshold,
+            **self.stats,
+            "recent_stalls": list(self.stalls),
+        }
+
+    def collect(self):
+        yield "impostor_event_loop_lag_seconds", "histogram", "Event loop wake-up delay, sampled every interval", self.lag.samples()
+        yield "impostor_event_loop_stalls_total", "counter", "Event loop stalls longer than the threshold", [({}, self.stats["stalls"])]
+
+loop_monitor = LoopMonitor()
+register_collector(loop_monitor.collect)
@@ -0,0 +1,54 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# A metric family: (name, type, help, [(labels, value), ...]); a sample may also be
+# (suffix, labels, value) for series named `name + suffix` (histogram _bucket/_sum/_count)
+MetricFamily = Tuple[str, str, str, List[Tuple]]
+
+_collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+def register_collector(collector: Callable[[], Iterable[MetricFamily]]) -> None:
+    """Add a function returning metric families to the /metrics output"""
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, rendered as a Prometheus histogram"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, labels: Optional[Dict[str, str]] = None) -> List[Tuple]:
+        labels = labels or {}
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            samples.append(("_bucket", {**labels, "le": "+Inf" if bound == float("inf") else repr(bound)}, cumulative))
+        samples.append(("_sum", labels, self.sum))
+        samples.append(("_count", labels, self.count))
+        return samples
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    lines = []
+    for collector in _collectors:
+        for name, metric_type, help_text, samples in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample in samples:
+                suffix, labels, value = sample if len(sample) == 3 else ("", *sample)
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                series = name + suffix
+                lines.append(f"{series}{{{label_text}}} {value}" if label_text else f"{series} {value}")
+    return "\n".join(lines) + "\n"
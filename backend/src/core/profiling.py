@@ -0,0 +1,267 @@
+"""
+On-demand profiling of single requests.
+
+A request with an `X-Profile` header holding the admin token (or with any
+`X-Profile` value and the token in `X-Admin-Token`) runs under a sampling
+profiler; every other request only pays for one attribute check. The token is
+never read from the URL, which ends up in access logs and browser history. While the profiled request runs, a
+sampler thread wakes up every `interval` seconds and records:
+
+  - running: the loop thread's stack when one of the request's tasks is
+    executing (CPU time: prompt building, parsing, serialization...)
+  - awaiting: for each of the request's suspended tasks, its chain of awaited
+    coroutines (wall-clock time waiting on the LLM, TTS, the state store...);
+    tasks that only wait for other tasks stay in the stacks but not in the
+    per-call breakdown
+
+Samples are attributed to the request through the task contexts kept by the
+loop monitor (`src.core.loop_monitor`), so concurrent requests do not pollute
+each other; without the monitor every task on the loop is sampled. The result
+keeps collapsed stacks ("frame;frame;frame count", the input format of
+flamegraph.pl, speedscope and inferno) and a breakdown of awaited time per
+call site. The last few results are kept for the admin endpoints, and the
+response carries their id in an `X-Profile-Id` header.
+"""
+
+import asyncio
+import collections
+import contextvars
+import gc
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from .loop_monitor import loop_monitor, route_of
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_APP_DIR = os.path.join(_BACKEND_DIR, "src") + os.sep
+
+# The profile of the request the current task serves (inherited by the tasks it starts)
+profile_var: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("profile", default=None)
+
+# asyncio functions that wait for other tasks
+_JOIN_FUNCTIONS = {"wait", "_wait", "gather", "as_completed"}
+# Future type returned by asyncio.gather, matched by name: no public API tells it from other futures
+_JOIN_FUTURES = {"_GatheringFuture"}
+# Attempts at listing the loop's tasks from the sampler thread before a tick is skipped
+_SNAPSHOT_ATTEMPTS = 3
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    if path.startswith(_BACKEND_DIR):
+        path = os.path.relpath(path, _BACKEND_DIR)
+    else:
+        path = os.sep.join(path.split(os.sep)[-2:])
+    return f"{path}:{code.co_qualname}"
+
+def _await_chain(coro) -> Tuple[List, Any]:
+    """Frames of a suspended coroutine and of everything it awaits (outermost first), and the awaited leaf object"""
+    frames = []
+    while coro is not None and len(frames) < 100:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames, coro
+
+def _awaited_future(leaf: Any) -> Any:
+    """The future behind the iterator a coroutine suspends on when it awaits a future"""
+    if isinstance(leaf, asyncio.Future):
+        return leaf
+    return next((ref for ref in gc.get_referents(leaf) if isinstance(ref, asyncio.Future)), leaf)
+
+def _joins_tasks(frames: List, leaf: Any) -> bool:
+    """Whether a task is only waiting for other tasks (whose own waits are sampled)"""
+    future = _awaited_future(leaf)
+    if isinstance(future, asyncio.Task) or type(future).__name__ in _JOIN_FUTURES:
+        return True
+    return bool(frames) and frames[-1].f_code.co_name in _JOIN_FUNCTIONS and \
+        frames[-1].f_code.co_filename.endswith(os.path.join("asyncio", "tasks.py"))
+
+def _task_frames(frame) -> List:
+    """Frames of the loop thread's stack above the event loop machinery, outermost first"""
+    frames = []
+    while frame is not None:
+        if frame.f_code.co_name == "_run" and frame.f_code.co_filename.endswith(os.path.join("asyncio", "events.py")):
+            break
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+class Profile:
+    """Samples of one request"""
+
+    def __init__(self, scope: dict, interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.scope = scope
+        self.method = scope.get("method")
+        self.path = scope.get("path")
+        self.interval = interval
+        self.started_at = time.time()
+        self.wall_s: Optional[float] = None
+        self.status: Optional[int] = None
+        self.attributed = loop_monitor.running
+        self.samples = 0
+        self.running_samples = 0
+        self.stacks: Dict[str, int] = collections.Counter()
+        self.awaiting: Dict[str, int] = collections.Counter()
+        self._started = time.perf_counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling the running loop from a thread (call from the loop)"""
+        loop = asyncio.get_running_loop()
+        loop_thread_id = threading.get_ident()
+
+        def sample():
+            while not self._stop.wait(self.interval):
+                self._sample(loop, loop_thread_id)
+
+        self._sampler = threading.Thread(target=sample, name=f"profile-{self.id}", daemon=True)
+        self._sampler.start()
+
+    @staticmethod
+    def _snapshot(loop: asyncio.AbstractEventLoop) -> Optional[Tuple[Optional[asyncio.Task], List[asyncio.Task]]]:
+        """The loop's running task and all its tasks, read from the sampler thread (None if the task set kept changing)"""
+        for _ in range(_SNAPSHOT_ATTEMPTS):
+            running = asyncio.current_task(loop)
+            try:
+                # The loop thread adds and removes tasks while this copies them
+                return running, list(asyncio.all_tasks(loop))
+            except RuntimeError:
+                continue
+        return None
+
+    def _sample(self, loop: asyncio.AbstractEventLoop, loop_thread_id: int) -> None:
+        snapshot = self._snapshot(loop)
+        if snapshot is None:
+            return
+        running, tasks = snapshot
+        self.samples += 1
+        for task in tasks:
+            if self.attributed:
+                context = loop_monitor.context_of(task)
+                if context is None or context.get(profile_var) is not self:
+                    continue
+            if task is running:
+                frames = _task_frames(sys._current_frames().get(loop_thread_id))
+                self.running_samples += 1
+                prefix = "[running]"
+            else:
+                frames, leaf = _await_chain(task.get_coro())
+                # Attribute the wait to the innermost app frame (the call site in our code)
+                app_frames = [frame for frame in frames if frame.f_code.co_filename.startswith(_APP_DIR)]
+                if frames and not _joins_tasks(frames, leaf):
+                    self.awaiting[_frame_label((app_frames or frames)[-1])] += 1
+                prefix = "[awaiting]"
+            if frames:
+                self.stacks[";".join([prefix] + [_frame_label(frame) for frame in frames])] += 1
+
+    def finish(self, status: Optional[int]) -> None:
+        self._stop.set()
+        self._sampler.join()
+        self.wall_s = time.perf_counter() - self._started
+        self.status = status
+
+    def folded(self) -> str:
+        """Collapsed stacks, one "frame;frame count" line per distinct stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def as_dict(self, stacks: bool = False) -> Dict:
+        # Samples are taken every `interval` of wall time; scale counts to the measured duration
+        seconds_per_sample = (self.wall_s / self.samples) if self.samples and self.wall_s else self.interval
+        profile = {
+            "id": self.id,
+            "method": self.method,
+            "route": route_of(self.scope),
+            "path": self.path,
+            "game_id": self.scope.get("path_params", {}).get("game_id"),
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_s": self.wall_s,
+            "samples": self.samples,
+            "attributed": self.attributed,
+            "running_s": round(self.running_samples * seconds_per_sample, 4),
+            # Task-seconds: concurrent awaits (e.g. one LLM call per agent) add up past wall time
+            "awaiting_s": {call: round(count * seconds_per_sample, 4) for call, count in self.awaiting.most_common()},
+        }
+        if stacks:
+            profile["folded"] = self.folded()
+        return profile
+
+class RequestProfiler:
+    def __init__(self, token: Optional[str] = None, interval: float = 0.005, keep: int = 20):
+        self.token = token
+        self.interval = interval
+        self.profiles: "collections.OrderedDict[str, Profile]" = collections.OrderedDict()
+        self.keep = keep
+
+    def configure(self, token: Optional[str], interval: float, keep: int) -> None:
+        """Apply the admin token and sampling settings (None disables profiling)"""
+        self.token = token or None
+        self.interval = interval
+        self.keep = keep
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        return self.token is not None and token is not None and hmac.compare_digest(token.encode(), self.token.encode())
+
+    def requested(self, scope: dict) -> bool:
+        profile = admin = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-profile":
+                profile = value.decode("latin-1")
+            elif name == b"x-admin-token":
+                admin = value.decode("latin-1")
+        return profile is not None and (self.is_admin(profile) or self.is_admin(admin))
+
+    def start(self, scope: dict) -> Profile:
+        profile = Profile(scope, self.interval)
+        profile.start()
+        return profile
+
+    def finish(self, profile: Profile, status: Optional[int]) -> None:
+        profile.finish(status)
+        self.profiles[profile.id] = profile
+        while len(self.profiles) > self.keep:
+            self.profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self.profiles.get(profile_id)
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests that ask for it with the admin token"""
+
+    def __init__(self, app, profiler: Optional[RequestProfiler] = None):
+        self.app = app
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if profiler.token is None or scope["type"] != "http" or not profiler.requested(scope):
+            return await self.app(scope, receive, send)
+
+        profile = profiler.start(scope)
+        status = None
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]}
+            await send(message)
+
+        token = profile_var.set(profile)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile_var.reset(token)
+            profiler.finish(profile, status)
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,116 @@
+"""
+Minimal asyncio client for the Redis protocol (RESP2).
+
+Only what the shared game-state store needs: commands, a small connection
+pool and dedicated connections for WATCH / MULTI / EXEC transactions. Works
+with Redis, Valkey, KeyDB and the local stand-in in benchmarks/stub_redis.py.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Optional
+from urllib.parse import urlparse
+
+class RedisError(Exception):
+    """An error reply from the server"""
+
+def encode_command(args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """One reply: str for simple strings, int, bytes or None for bulk strings, list for arrays"""
+    line = await reader.readuntil(b"\r\n")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return RedisError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Protocol error: unexpected reply {line!r}")
+
+class RedisConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def execute(self, *args) -> Any:
+        self.writer.write(encode_command(args))
+        await self.writer.drain()
+        reply = await read_reply(self.reader)
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    def close(self) -> None:
+        self.writer.close()
+
+class RedisClient:
+    """Pooled client. A connection whose user failed (error reply, cancellation) is discarded."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0, password: Optional[str] = None, pool_size: int = 16):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self._idle: List[RedisConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    @classmethod
+    def from_url(cls, url: str, pool_size: int = 16) -> "RedisClient":
+        """redis://[:password@]host[:port][/db]"""
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported state store URL scheme: {parsed.scheme!r} (expected redis://)")
+        db = int(parsed.path.lstrip("/") or 0)
+        return cls(parsed.hostname or "127.0.0.1", parsed.port or 6379, db, parsed.password, pool_size)
+
+    async def _connect(self) -> RedisConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        connection = RedisConnection(reader, writer)
+        if self.password:
+            await connection.execute("AUTH", self.password)
+        if self.db:
+            await connection.execute("SELECT", self.db)
+        return connection
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[RedisConnection]:
+        """A connection for the caller's exclusive use (needed for WATCH / MULTI / EXEC)"""
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                yield connection
+            except BaseException:
+                # The connection may hold an unread reply or a pending WATCH / MULTI
+                connection.close()
+                raise
+            else:
+                self._idle.append(connection)
+
+    async def execute(self, *args) -> Any:
+        async with self.connection() as connection:
+            return await connection.execute(*args)
+
+    async def close(self) -> None:
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
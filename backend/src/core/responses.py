@@ -0,0 +1,17 @@
+from typing import Any
+import pydantic_core
+from fastapi.responses import Response
+
+class ModelResponse(Response):
+    """JSON response that encodes pydantic models straight to bytes.
+
+    Returning a `Response` from a route makes FastAPI skip its `response_model`
+    round trip (dump to dict, re-validate, serialize again). The model is
+    encoded once by pydantic-core's serializer, which writes JSON bytes directly.
+    Only use it for models built from already-validated state.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
@@ -0,0 +1,155 @@
+"""
+Application settings, read from the environment in one place.
+
+`load_settings()` reads backend/.env (once, without overriding variables that
+are already set) and returns a `Settings` snapshot; the app builds one at
+startup and hands it to the services it creates. Services constructed without
+settings (tests, benchmarks, scripts) read the current environment through
+`Settings.from_env()`.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+@dataclass(frozen=True)
+class Settings:
+    # LLM provider (a base URL points at a local stand-in, which needs no real key)
+    anthropic_api_key: Optional[str] = None
+    anthropic_base_url: Optional[str] = None
+    llm_model: str = "claude-3-5-sonnet-20241022"
+    llm_economy_model: str = "claude-3-5-haiku-20241022"
+    llm_hedge_percentile: float = 0.0
+    llm_breaker_failure_rate: float = 0.5
+    llm_breaker_min_calls: int = 10
+    llm_breaker_window: int = 20
+    llm_breaker_open_s: float = 30.0
+    llm_max_concurrency: int = 0  # provider calls at once; past it calls queue by priority class (0 = unlimited)
+
+    # Text-to-speech
+    elevenlabs_api_key: Optional[str] = None
+    elevenlabs_base_url: Optional[str] = None
+    tts_max_concurrency: int = 0
+
+    # Game service
+    event_log_dir: Optional[str] = None  # per-game JSONL event logs, off unless a directory is set
+    event_log_retention_s: float = 7 * 86400.0  # logs not appended to for this long are deleted (0 = keep them)
+    max_active_agents: int = 4
+    step_deadline_s: float = 20.0
+    step_lease_s: float = 120.0
+    step_cache_size: int = 1024
+    state_cache_size: int = 1024  # games whose encoded state (per version) is kept for polling clients
+    spectator_buffer: int = 64  # frames a spectator may fall behind before the slow-viewer policy applies
+    spectator_slow_policy: str = "snapshot"  # "snapshot": skip ahead with a fresh state, "drop": disconnect
+    bulk_concurrency: int = 8  # steps run at once by the bulk endpoint, across all its requests
+    state_url: Optional[str] = None
+    state_pool_size: int = 16
+    state_prefix: str = "impostor"
+    history_hot_items: int = 16
+    history_segment_items: int = 32
+    history_spill_dir: Optional[str] = None
+
+    # Weights of the priority classes games are created in (see src.core.fair_queue)
+    priority_weights: str = "interactive=8,batch=1"
+
+    # Admission control (see src.core.admission); 0 disables a limit
+    max_games: int = 0  # active games per worker
+    game_idle_s: float = 1800.0  # an active game not stepped for this long no longer counts as resident
+    max_concurrent_steps: int = 0
+    max_llm_inflight: int = 0
+    client_rate: float = 0.0  # /init and /step requests per second per client
+    client_burst: int = 10
+    client_api_keys: str = ""  # comma-separated API keys limited per key; other clients are limited per address
+
+    # Usage and budgets
+    game_budget_usd: float = 0.0
+    budget_tts_cutoff: float = 0.8
+    tts_cost_per_1k_chars: float = 0.30
+
+    # Logging
+    log_level: str = "INFO"
+    log_format: str = "json"
+    log_debug_sample_rate: float = 1.0
+    log_queue_size: int = 10000
+
+    # Event-loop monitor (see src.core.loop_monitor)
+    loop_monitor_interval_s: float = 0.05  # heartbeat period; 0 disables the monitor
+    loop_stall_s: float = 0.25  # lag past which the loop thread's stack is captured
+
+    # Admin endpoints and on-demand request profiling (see src.core.profiling)
+    admin_token: Optional[str] = None  # unset disables both
+    profile_interval_s: float = 0.005
+    profile_keep: int = 20
+
+    # Server
+    port: int = 8000
+    warmup: bool = False  # create services and open pools during startup instead of on first request
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        env = os.environ if environ is None else environ
+        return cls(
+            anthropic_api_key=env.get("ANTHROPIC_API_KEY") or None,
+            anthropic_base_url=env.get("ANTHROPIC_BASE_URL") or None,
+            llm_model=env.get("LLM_MODEL", cls.llm_model),
+            llm_economy_model=env.get("LLM_ECONOMY_MODEL", cls.llm_economy_model),
+            llm_hedge_percentile=float(env.get("LLM_HEDGE_PERCENTILE", cls.llm_hedge_percentile)),
+            llm_breaker_failure_rate=float(env.get("LLM_BREAKER_FAILURE_RATE", cls.llm_breaker_failure_rate)),
+            llm_breaker_min_calls=int(env.get("LLM_BREAKER_MIN_CALLS", cls.llm_breaker_min_calls)),
+            llm_breaker_window=int(env.get("LLM_BREAKER_WINDOW", cls.llm_breaker_window)),
+            llm_breaker_open_s=float(env.get("LLM_BREAKER_OPEN_S", cls.llm_breaker_open_s)),
+            llm_max_concurrency=int(env.get("LLM_MAX_CONCURRENCY", cls.llm_max_concurrency)),
+            elevenlabs_api_key=env.get("ELEVENLABS_API_KEY") or None,
+            elevenlabs_base_url=env.get("ELEVENLABS_BASE_URL") or None,
+            tts_max_concurrency=int(env.get("TTS_MAX_CONCURRENCY", cls.tts_max_concurrency)),
+            event_log_dir=env.get("IMPOSTOR_EVENT_LOG_DIR") or None,
+            event_log_retention_s=float(env.get("IMPOSTOR_EVENT_LOG_RETENTION_S", cls.event_log_retention_s)),
+            max_active_agents=int(env.get("IMPOSTOR_MAX_ACTIVE_AGENTS", cls.max_active_agents)),
+            step_deadline_s=float(env.get("IMPOSTOR_STEP_DEADLINE_S", cls.step_deadline_s)),
+            step_lease_s=float(env.get("IMPOSTOR_STEP_LEASE_S", cls.step_lease_s)),
+            step_cache_size=int(env.get("IMPOSTOR_STEP_CACHE_SIZE", cls.step_cache_size)),
+            state_cache_size=int(env.get("IMPOSTOR_STATE_CACHE_SIZE", cls.state_cache_size)),
+            spectator_buffer=int(env.get("IMPOSTOR_SPECTATOR_BUFFER", cls.spectator_buffer)),
+            spectator_slow_policy=env.get("IMPOSTOR_SPECTATOR_SLOW", cls.spectator_slow_policy),
+            bulk_concurrency=int(env.get("IMPOSTOR_BULK_CONCURRENCY", cls.bulk_concurrency)),
+            state_url=env.get("IMPOSTOR_STATE_URL") or None,
+            state_pool_size=int(env.get("IMPOSTOR_STATE_POOL_SIZE", cls.state_pool_size)),
+            state_prefix=env.get("IMPOSTOR_STATE_PREFIX", cls.state_prefix),
+            history_hot_items=int(env.get("IMPOSTOR_HISTORY_HOT_ITEMS", cls.history_hot_items)),
+            history_segment_items=int(env.get("IMPOSTOR_HISTORY_SEGMENT_ITEMS", cls.history_segment_items)),
+            history_spill_dir=env.get("IMPOSTOR_HISTORY_SPILL_DIR") or None,
+            priority_weights=env.get("IMPOSTOR_PRIORITY_WEIGHTS", cls.priority_weights),
+            max_games=int(env.get("IMPOSTOR_MAX_GAMES", cls.max_games)),
+            game_idle_s=float(env.get("IMPOSTOR_GAME_IDLE_S", cls.game_idle_s)),
+            max_concurrent_steps=int(env.get("IMPOSTOR_MAX_CONCURRENT_STEPS", cls.max_concurrent_steps)),
+            max_llm_inflight=int(env.get("IMPOSTOR_MAX_LLM_INFLIGHT", cls.max_llm_inflight)),
+            client_rate=float(env.get("IMPOSTOR_CLIENT_RATE", cls.client_rate)),
+            client_burst=int(env.get("IMPOSTOR_CLIENT_BURST", cls.client_burst)),
+            client_api_keys=env.get("IMPOSTOR_CLIENT_API_KEYS", cls.client_api_keys),
+            game_budget_usd=float(env.get("IMPOSTOR_GAME_BUDGET_USD", cls.game_budget_usd)),
+            budget_tts_cutoff=float(env.get("IMPOSTOR_BUDGET_TTS_CUTOFF", cls.budget_tts_cutoff)),
+            tts_cost_per_1k_chars=float(env.get("TTS_COST_PER_1K_CHARS", cls.tts_cost_per_1k_chars)),
+            log_level=env.get("LOG_LEVEL", cls.log_level).upper(),
+            log_format=env.get("LOG_FORMAT", cls.log_format),
+            log_debug_sample_rate=float(env.get("LOG_DEBUG_SAMPLE_RATE", cls.log_debug_sample_rate)),
+            log_queue_size=int(env.get("LOG_QUEUE_SIZE", cls.log_queue_size)),
+            loop_monitor_interval_s=float(env.get("IMPOSTOR_LOOP_MONITOR_INTERVAL_S", cls.loop_monitor_interval_s)),
+            loop_stall_s=float(env.get("IMPOSTOR_LOOP_STALL_S", cls.loop_stall_s)),
+            admin_token=env.get("IMPOSTOR_ADMIN_TOKEN") or None,
+            profile_interval_s=float(env.get("IMPOSTOR_PROFILE_INTERVAL_S", cls.profile_interval_s)),
+            profile_keep=int(env.get("IMPOSTOR_PROFILE_KEEP", cls.profile_keep)),
+            port=int(env.get("PORT", cls.port)),
+            warmup=_flag(env.get("IMPOSTOR_WARMUP")),
+        )
+
+def load_settings(env_file: Optional[str] = os.path.join(_BACKEND_DIR, ".env")) -> Settings:
+    """Settings from the environment, after loading `env_file` if it exists"""
+    if env_file and os.path.exists(env_file):
+        from dotenv import load_dotenv
+        load_dotenv(env_file, override=False)
+    return Settings.from_env()
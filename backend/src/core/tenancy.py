@@ -0,0 +1,49 @@
+import contextvars
+import hashlib
+from typing import FrozenSet, Optional
+
+# Tenant (API client) the current request is made for; usage and limits are tracked per tenant
+ANONYMOUS_TENANT = "anonymous"
+tenant_var: contextvars.ContextVar[str] = contextvars.ContextVar("tenant", default=ANONYMOUS_TENANT)
+
+def tenant_from_api_key(api_key: Optional[str]) -> str:
+    """Stable, non-reversible tenant label for an API key (raw keys are never stored)"""
+    if not api_key:
+        return ANONYMOUS_TENANT
+    return "key-" + hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+def tenants_of_keys(api_keys: str) -> FrozenSet[str]:
+    """Tenant labels of a comma-separated list of API keys (IMPOSTOR_CLIENT_API_KEYS)"""
+    return frozenset(tenant_from_api_key(key.strip()) for key in api_keys.split(",") if key.strip())
+
+class TenantMiddleware:
+    """ASGI middleware binding the request's tenant (from the X-API-Key header) for its handler.
+
+    Only configured keys get a tenant of their own: any other key is anonymous,
+    so clients cannot grow the per-tenant usage and metric series at will.
+    """
+
+    header = b"x-api-key"
+    # Set from IMPOSTOR_CLIENT_API_KEYS at startup (see `configure`)
+    known_tenants: FrozenSet[str] = frozenset()
+
+    def __init__(self, app):
+        self.app = app
+
+    @classmethod
+    def configure(cls, api_keys: str) -> None:
+        cls.known_tenants = tenants_of_keys(api_keys)
+
+    def tenant_of(self, api_key: Optional[str]) -> str:
+        tenant = tenant_from_api_key(api_key)
+        return tenant if tenant in self.known_tenants else ANONYMOUS_TENANT
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+        api_key = next((value.decode("latin-1") for name, value in scope.get("headers", []) if name == self.header), None)
+        token = tenant_var.set(self.tenant_of(api_key))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            tenant_var.reset(token)
@@ -1,22 +1,18 @@
-import os
-import requests
+import asyncio
 import base64
-from typing import Optional
+from typing import Callable, Optional
 import logging
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from .fair_queue import FairScheduler, parse_weights
+from .settings import Settings
+from .usage import usage_meter
 
 logger = logging.getLogger(__name__)
 
 class ElevenLabsTTSService:
     """ElevenLabs Text-to-Speech service for converting agent speech to audio."""
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.api_key = api_key or os.getenv("ELEVENLABS_API_KEY")
-        print(f"DEBUG - TTS Service init - ELEVENLABS_API_KEY: {self.api_key[:20] if self.api_key else 'NOT FOUND'}...")
-        self.base_url = "https://api.elevenlabs.io/v1"
+    def __init__(self, api_key: Optional[str] = None, settings: Optional[Settings] = None):
+        self.configure(settings or Settings.from_env(), api_key)
         
         # Default voice IDs for different agent personalities
         # These are some popular ElevenLabs voices with character-appropriate selections
@@ -48,6 +44,15 @@ class ElevenLabsTTSService:
         # Fallback voice if agent color not found
         self.default_voice = "21m00Tcm4TlvDq8ikWAM"  # Rachel
     
+    def configure(self, settings: Settings, api_key: Optional[str] = None) -> None:
+        """Apply endpoint and key settings (the app re-applies its settings at startup)"""
+        # A local stand-in (see benchmarks/stub_providers.py) needs no real key
+        custom_base_url = settings.elevenlabs_base_url
+        self.base_url = (custom_base_url or "https://api.elevenlabs.io/v1").rstrip("/")
+        self.api_key = api_key or settings.elevenlabs_api_key or ("local" if custom_base_url else None)
+        # Past TTS_MAX_CONCURRENCY requests, queue by the calling game's priority class and game
+        self.scheduler = FairScheduler(settings.tts_max_concurrency, parse_weights(settings.priority_weights))
+    
     def get_voice_for_agent(self, agent_color: str) -> str:
         """Get the appropriate voice ID for an agent based on their color."""
         # Normalize color name (handle both uppercase and lowercase)
@@ -69,10 +74,10 @@ class ElevenLabsTTSService:
             return voice_id
             
         # Fallback to default
-        logger.warning(f"No voice mapping found for agent color '{agent_color}', using default voice")
+        logger.warning("No voice mapping found for agent color %r, using default voice", agent_color)
         return self.default_voice
     
-    async def text_to_speech(self, text: str, agent_color: str, is_impostor: bool = False) -> Optional[str]:
+    async def text_to_speech(self, text: str, agent_color: str, is_impostor: bool = False, on_sent: Optional[Callable[[], None]] = None) -> Optional[str]:
         """
         Convert text to speech using ElevenLabs API.
         
@@ -80,12 +85,13 @@ class ElevenLabsTTSService:
             text: The text to convert to speech
             agent_color: The agent's color to determine voice
             is_impostor: Whether the agent is an impostor (affects voice settings)
+            on_sent: Called once the request is sent (it is billed from then on, even if cancelled)
             
         Returns:
             Base64 encoded audio data or None if failed
         """
         if not self.api_key:
-            logger.warning("ElevenLabs API key not found. TTS disabled.")
+            logger.debug("TTS disabled, skipping speech for %s", agent_color)
             return None
             
         if not text or not text.strip():
@@ -114,23 +120,34 @@ class ElevenLabsTTSService:
             "voice_settings": voice_settings
         }
         
+        import httpx  # deferred: only needed once speech is actually synthesized
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            async with self.scheduler.slot():
+                if on_sent:
+                    on_sent()
+                try:
+                    # Cancelling the step closes the connection; the provider has the text by then, so it is metered
+                    async with httpx.AsyncClient(timeout=30) as client:
+                        response = await client.post(url, json=data, headers=headers)
+                except asyncio.CancelledError:
+                    usage_meter.record_tts(len(data["text"]))
+                    raise
             
             if response.status_code == 200:
                 # Convert audio to base64 for easy transmission
                 audio_base64 = base64.b64encode(response.content).decode('utf-8')
-                logger.info(f"Successfully generated TTS for {agent_color} agent")
+                usage_meter.record_tts(len(data["text"]))
+                logger.debug("Generated TTS for %s agent", agent_color)
                 return audio_base64
             else:
-                logger.error(f"ElevenLabs API error: {response.status_code} - {response.text}")
+                logger.error("ElevenLabs API error: %s - %s", response.status_code, response.text)
                 return None
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for TTS: {e}")
+        except httpx.HTTPError as e:
+            logger.error("Request failed for TTS: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Unexpected error in TTS: {e}")
+            logger.exception("Unexpected error in TTS: %s", e)
             return None
 
 # Global TTS service instance
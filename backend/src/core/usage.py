@@ -0,0 +1,171 @@
+import logging
+from typing import Dict, Iterable, Optional
+from .log import game_id_var
+from .metrics import MetricFamily, register_collector
+from .settings import Settings
+from .tenancy import tenant_var
+
+logger = logging.getLogger(__name__)
+
+# USD per million input/output tokens; unknown models are priced like the default model
+LLM_PRICING = {
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+}
+DEFAULT_LLM_PRICE = LLM_PRICING["claude-3-5-sonnet-20241022"]
+
+# Budget states, in order of degradation
+BUDGET_OK = "ok"
+BUDGET_NO_TTS = "no_tts"  # past the soft limit: speech is no longer synthesized
+BUDGET_ECONOMY = "economy"  # past the budget: agents also switch to the economy model
+
+def llm_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = LLM_PRICING.get(model, DEFAULT_LLM_PRICE)
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+class Usage:
+    """Running totals of LLM and TTS usage and their estimated cost"""
+
+    __slots__ = ("llm_calls", "input_tokens", "output_tokens", "tts_calls", "tts_characters", "cost_usd")
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.tts_calls = 0
+        self.tts_characters = 0
+        self.cost_usd = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tts_calls": self.tts_calls,
+            "tts_characters": self.tts_characters,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+class UsageMeter:
+    """Usage per call, aggregated globally, per game, per tenant and per model.
+
+    Calls are attributed to the game and tenant bound in the current context
+    (see `src.core.log.bind_game` and `src.core.tenancy`). A game with a
+    budget degrades in two stages instead of failing: past `tts_cutoff` of its
+    budget it stops synthesizing speech, and past the budget its LLM calls use
+    the economy model.
+    """
+
+    def __init__(self, game_budget_usd: float = 0.0, tts_cutoff: float = 0.8, tts_cost_per_1k_chars: float = 0.30):
+        self.game_budget_usd = game_budget_usd
+        self.tts_cutoff = tts_cutoff
+        self.tts_cost_per_1k_chars = tts_cost_per_1k_chars
+        self.total = Usage()
+        self.games: Dict[str, Usage] = {}
+        self.tenants: Dict[str, Usage] = {}
+        self.models: Dict[str, Usage] = {}
+        self._budget_states: Dict[str, str] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "UsageMeter":
+        meter = cls()
+        meter.configure(settings)
+        return meter
+
+    def configure(self, settings: Settings) -> None:
+        """Apply budget settings (the app re-applies its settings at startup)"""
+        self.game_budget_usd = settings.game_budget_usd
+        self.tts_cutoff = settings.budget_tts_cutoff
+        self.tts_cost_per_1k_chars = settings.tts_cost_per_1k_chars
+
+    def _buckets(self, game_id: Optional[str], model: Optional[str] = None) -> Iterable[Usage]:
+        yield self.total
+        if game_id is not None:
+            yield self.games.setdefault(game_id, Usage())
+        yield self.tenants.setdefault(tenant_var.get(), Usage())
+        if model is not None:
+            yield self.models.setdefault(model, Usage())
+
+    def record_llm(self, model: str, input_tokens: int, output_tokens: int, game_id: Optional[str] = None) -> float:
+        game_id = game_id or game_id_var.get()
+        cost = llm_cost(model, input_tokens, output_tokens)
+        for usage in self._buckets(game_id, model):
+            usage.llm_calls += 1
+            usage.input_tokens += input_tokens
+            usage.output_tokens += output_tokens
+            usage.cost_usd += cost
+        self._check_budget(game_id)
+        return cost
+
+    def record_tts(self, characters: int, game_id: Optional[str] = None) -> float:
+        game_id = game_id or game_id_var.get()
+        cost = characters * self.tts_cost_per_1k_chars / 1000
+        for usage in self._buckets(game_id):
+            usage.tts_calls += 1
+            usage.tts_characters += characters
+            usage.cost_usd += cost
+        self._check_budget(game_id)
+        return cost
+
+    def forget_game(self, game_id: str) -> None:
+        """Drop a finished game's usage and budget state (tenant and model totals keep it)"""
+        self.games.pop(game_id, None)
+        self._budget_states.pop(game_id, None)
+
+    def game_usage(self, game_id: str) -> Usage:
+        return self.games.get(game_id) or Usage()
+
+    def budget_state(self, game_id: Optional[str] = None) -> str:
+        game_id = game_id or game_id_var.get()
+        return self._budget_states.get(game_id, BUDGET_OK) if game_id else BUDGET_OK
+
+    def allows_tts(self, game_id: Optional[str] = None) -> bool:
+        return self.budget_state(game_id) == BUDGET_OK
+
+    def _check_budget(self, game_id: Optional[str]) -> None:
+        if not game_id or self.game_budget_usd <= 0:
+            return
+        spent = self.games[game_id].cost_usd
+        if spent >= self.game_budget_usd:
+            state = BUDGET_ECONOMY
+        elif spent >= self.game_budget_usd * self.tts_cutoff:
+            state = BUDGET_NO_TTS
+        else:
+            state = BUDGET_OK
+        previous = self._budget_states.get(game_id, BUDGET_OK)
+        if state != previous:
+            self._budget_states[game_id] = state
+            logger.warning("Game budget state changed", extra={"game_id": game_id, "budget_state": state, "spent_usd": round(spent, 6), "budget_usd": self.game_budget_usd})
+
+    def budget(self, game_id: str) -> Dict:
+        return {
+            "budget_usd": self.game_budget_usd or None,
+            "spent_usd": round(self.game_usage(game_id).cost_usd, 6),
+            "state": self.budget_state(game_id),
+        }
+
+    def collect(self) -> Iterable[MetricFamily]:
+        fields = [
+            ("llm_calls", "impostor_llm_calls_total", "LLM calls"),
+            ("input_tokens", "impostor_llm_input_tokens_total", "LLM input tokens"),
+            ("output_tokens", "impostor_llm_output_tokens_total", "LLM output tokens"),
+            ("tts_calls", "impostor_tts_calls_total", "TTS calls"),
+            ("tts_characters", "impostor_tts_characters_total", "Characters sent to TTS"),
+            ("cost_usd", "impostor_cost_usd_total", "Estimated LLM and TTS cost in USD"),
+        ]
+        for field, name, help_text in fields:
+            samples = [({"tenant": tenant}, getattr(usage, field)) for tenant, usage in sorted(self.tenants.items())]
+            yield name, "counter", f"{help_text}, per tenant", samples
+        yield "impostor_llm_model_tokens_total", "counter", "LLM tokens per model and direction", [
+            ({"model": model, "direction": direction}, getattr(usage, field))
+            for model, usage in sorted(self.models.items())
+            for direction, field in (("input", "input_tokens"), ("output", "output_tokens"))
+        ]
+        states = list(self._budget_states.values())
+        yield "impostor_games_degraded", "gauge", "Games past their budget soft limit, per budget state", [
+            ({"state": state}, states.count(state)) for state in (BUDGET_NO_TTS, BUDGET_ECONOMY)
+        ]
+
+usage_meter = UsageMeter.from_settings(Settings.from_env())
+register_collector(usage_meter.collect)
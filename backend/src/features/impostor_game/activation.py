@@ -0,0 +1,92 @@
+from typing import Dict, List
+from .schema import Agent, ActionType, AgentMemory, AgentTurn, GameState
+
+class ActivationScheduler:
+    """Decide which alive agents actually "think" (get an LLM call) in a step.
+
+    Only one speaker is chosen per step, so most agent calls are wasted in big
+    lobbies. Agents are scored on how much the step concerns them:
+    - addressed by name/color or accused (voted against) in the recent public history
+    - time since their last activation (agents idle for `max_idle_steps` are forced in)
+    - vote-relevant moments (meeting start, pending votes, last steps), where agents
+      who have not voted recently are needed to reach a majority
+    At most `max_active` agents are activated per step (0 disables the cap).
+
+    Games are created from the fixed roster of data/game-master.json (4 agents,
+    one of them dead) whatever `num_players` asks for, so with the default cap of
+    4 every alive agent is activated and the scheduler only skips agents when
+    IMPOSTOR_MAX_ACTIVE_AGENTS is set below 3.
+    """
+
+    def __init__(self, max_active: int = 4, max_idle_steps: int = 3, lookback: int = 6):
+        self.max_active = max_active
+        self.max_idle_steps = max_idle_steps
+        self.lookback = lookback
+
+    def is_vote_moment(self, game: GameState) -> bool:
+        return game.step_number == 25 or bool(game.current_votes) or game.step_number >= game.max_steps - 2
+
+    def score_agents(self, game: GameState, alive_agents: List[Agent]) -> Dict[str, float]:
+        recent = game.public_action_history[-self.lookback:]
+        last_speaker = next((a.agent_id for a in reversed(recent) if a.action_type == ActionType.SPEAK), None)
+        vote_moment = self.is_vote_moment(game)
+
+        scores: Dict[str, float] = {}
+        for agent in alive_agents:
+            score = 0.0
+            names = {agent.id.lower(), agent.name.lower(), agent.color.lower()}
+
+            # Addressed or accused in the recent conversation
+            for action in recent:
+                if action.agent_id == agent.id:
+                    continue
+                if action.action_type == ActionType.VOTE and action.target_agent_id == agent.id:
+                    score += 4
+                elif action.action_type == ActionType.SPEAK and any(name in action.content.lower() for name in names):
+                    score += 3
+            score += 2 * game.current_votes.get(agent.id, 0)
+
+            # Time since last activation
+            idle_steps = game.step_number - game.last_active_step.get(agent.id, 0)
+            score += min(idle_steps, self.max_idle_steps)
+            if idle_steps > self.max_idle_steps:
+                score += 100
+
+            # Vote-relevant moment: agents who have not voted recently are needed for a majority
+            if vote_moment and not any(a.agent_id == agent.id and a.action_type == ActionType.VOTE for a in recent):
+                score += 2
+
+            # Whoever just spoke has the least new to react to
+            if agent.id == last_speaker:
+                score -= 1
+
+            scores[agent.id] = score
+        return scores
+
+    def select(self, game: GameState, alive_agents: List[Agent]) -> List[Agent]:
+        """Return the agents to activate this step, in game order"""
+        if self.max_active <= 0 or len(alive_agents) <= self.max_active:
+            return list(alive_agents)
+
+        scores = self.score_agents(game, alive_agents)
+        order = {agent.id: index for index, agent in enumerate(alive_agents)}
+        ranked = sorted(alive_agents, key=lambda a: (-scores[a.id], game.last_active_step.get(a.id, 0), order[a.id]))
+        chosen = {agent.id for agent in ranked[:self.max_active]}
+        return [agent for agent in alive_agents if agent.id in chosen]
+
+def carry_forward_turn(game: GameState, agent_data: Agent) -> AgentTurn:
+    """Turn for an agent that was not activated: no speech or vote, last hypothesis kept"""
+    return AgentTurn(
+        agent_id=agent_data.id,
+        think="Listening to the discussion...",
+        speak=None,
+        vote=None,
+        impostor_hypothesis=game.impostor_hypotheses.get(agent_data.id),
+        memory_update=AgentMemory(
+            step_number=game.step_number,
+            location=agent_data.location,
+            action=agent_data.action,
+            met=agent_data.met
+        ),
+        idle=True
+    )
@@ -1,72 +1,43 @@
 import re
 import json
+import logging
 from typing import List, Optional
 from src.core.llm_client import LLMClient
+from .conversation import RenderedConversation
+from .prompts import PromptTemplate
 from .schema import Agent, AgentAction, ActionType, AgentTurn, AgentMemory
 
-class Crewmate:
-    def __init__(self, agent_data: Agent, llm_client: LLMClient):
-        self.data = agent_data
-        self.llm_client = llm_client
-    
-    def get_role_description(self) -> str:
-        return f"You are {self.data.name} ({self.data.color}), a CREWMATE detective. A dead body has been found and you're now investigating the murder to identify the impostor. Your goal is to analyze alibis, establish timelines, and deduce who had the opportunity to commit the murder. Each discussion turn, you must form and share your hypothesis about who the impostor is, gather evidence to support or refute theories, and work toward eliminating the killer."
-    
-    async def choose_action(self, context: str, public_action_history: List[AgentAction], private_thoughts: List[AgentAction], step_number: int, all_agents: List[Agent] = None) -> AgentTurn:
-        system_prompt = self.get_role_description()
-        
-        # Format public chat history (what everyone can see)
-        public_chat = []
-        print(f"DEBUG - {self.data.color} sees {len(public_action_history)} conversation messages")
-        for action in public_action_history[-15:]:
-            # agent_id is now the color directly
-            agent_color = action.agent_id
-            action_text = f"{agent_color} {action.action_type.value}: {action.content}"
-            if action.target_agent_id is not None:
-                action_text += f" (targeting {action.target_agent_id})"
-            public_chat.append(action_text)
-            print(f"DEBUG - Conversation: {action_text}")
-        
-        # Format private thoughts (only this agent's thoughts)
-        private_chat = []
-        for thought in private_thoughts[-10:]:
-            private_chat.append(f"You thought: {thought.content}")
-        
-        # Format memory history for better context
-        memory_context = self._format_memory_context()
-        
-        public_context = "\\n".join(public_chat) if public_chat else "No public discussion yet."
-        private_context = "\\n".join(private_chat) if private_chat else "No private thoughts yet."
-        
-        # Add detailed meeting participants information
-        meeting_info = ""
-        if all_agents:
-            alive_agents = [agent for agent in all_agents if agent.is_alive]
-            dead_agents = [agent for agent in all_agents if not agent.is_alive]
-            
-            alive_list = [agent.color for agent in alive_agents]
-            meeting_info = f"MEETING PARTICIPANTS: {', '.join(alive_list)} are present in this investigation."
-            
-            if dead_agents:
-                dead_list = [agent.color for agent in dead_agents]
-                meeting_info += f" ELIMINATED: {', '.join(dead_list)} have been eliminated and are not in the meeting."
-            
-            meeting_info += f" Total alive: {len(alive_agents)}/8 players remaining."
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "system", "content": f"Game context: {context}"},
-            {"role": "system", "content": f"Your memory from previous steps:\\n{memory_context} \\n{meeting_info}"},
-            {"role": "system", "content": f"RECENT CONVERSATION (READ CAREFULLY - others may have asked you questions!):\\n{public_context}"},
-            {"role": "system", "content": f"Your private thoughts (only you can see):\\n{private_context}"},
-            {"role": "user", "content": f"""MURDER INVESTIGATION: A dead body has been found and you're investigating to identify the impostor. This is your detective analysis turn.
+logger = logging.getLogger(__name__)
+
+# Prompt templates, parsed once. Agent-specific slots are filled when the agent is
+# created; only the conversation, thoughts and memory are filled every step.
+RESPONSE_FORMAT = """{
+  "think": "your detective analysis - alibis, timelines, opportunity, evidence (always required)",
+  "speak": "what you tell the group - share your alibi, question others, or present theories (optional, null if silent)",
+  "impostor_hypothesis": "color of agent you currently suspect as the impostor (red, blue, green, or yellow)",
+  "vote": "color of agent to eliminate (red, blue, green, yellow) or null if you don't vote this turn"
+}
+
+Examples:
+{"think": "Someone just asked me about my card swipe task. I need to explain that I was actually doing it properly and wasn't faking it.", "speak": "Blue, you asked about my card swipe - I was having trouble with the reader, that's why it took multiple attempts. I can confirm I was in Cafeteria the whole time with you, red, and green.", "impostor_hypothesis": "yellow", "vote": null}
+{"think": "No one questioned me directly, so I can share my observations. Yellow's behavior seemed suspicious when they were near the exit.", "speak": "I was doing wires in Cafeteria with everyone. Yellow, I noticed you near the exit several times - did you leave at any point?", "impostor_hypothesis": "yellow", "vote": null}
+
+CRITICAL REQUIREMENTS:
+- CHECK: Did someone ask YOU a direct question? Answer it first!
+- CHECK: Were YOU accused of something? Defend yourself with your alibi!
+- You MUST always have an "impostor_hypothesis" - your current best guess
+- Build on the conversation - don't ignore what others just said
+- Focus on WHO HAD OPPORTUNITY to commit the murder
+- Respond with valid JSON only!"""
+
+INSTRUCTIONS = PromptTemplate("""MURDER INVESTIGATION: A dead body has been found and you're investigating to identify the impostor. This is your detective analysis turn.
 
-YOU ARE: {self.data.color} ({self.data.name})
-YOUR ALIBI: You were in {self.data.location} doing '{self.data.action}' and you encountered: {', '.join(self.data.met) if self.data.met else 'no one'}
+YOU ARE: {color} ({name})
+YOUR ALIBI: You were in {location} doing '{action}' and you encountered: {met}
 
 CONVERSATION ANALYSIS (CRITICAL - READ THE RECENT CONVERSATION ABOVE):
-- Scan the RECENT CONVERSATION for your color name ({self.data.color}) - were you directly questioned?
-- Did someone say "{self.data.color}, [question]" or accuse you of something?
+- Scan the RECENT CONVERSATION for your color name ({color}) - were you directly questioned?
+- Did someone say "{color}, [question]" or accuse you of something?
 - If YES: Your response MUST address that question/accusation first
 - If NO direct questions: Then share your alibi or ask new questions
 
@@ -77,30 +48,83 @@ INVESTIGATION PRIORITIES:
 4. ALWAYS: State who you currently suspect and why
 
 IMPORTANT: 
-- Remember you are {self.data.color} - don't question yourself!
+- Remember you are {color} - don't question yourself!
 - Be responsive to the conversation - answer before asking new questions
 - If accused, defend yourself with facts about your alibi
 
-""" + """{
-  "think": "your detective analysis - alibis, timelines, opportunity, evidence (always required)",
-  "speak": "what you tell the group - share your alibi, question others, or present theories (optional, null if silent)",
-  "impostor_hypothesis": "color of agent you currently suspect as the impostor (red, blue, green, or yellow)",
-  "vote": "color of agent to eliminate (red, blue, green, yellow) or null if you don't vote this turn"
-}
+{response_format}""").partial(response_format=RESPONSE_FORMAT)
 
-Examples:
-{"think": "Someone just asked me about my card swipe task. I need to explain that I was actually doing it properly and wasn't faking it.", "speak": "Blue, you asked about my card swipe - I was having trouble with the reader, that's why it took multiple attempts. I can confirm I was in Cafeteria the whole time with you, red, and green.", "impostor_hypothesis": "yellow", "vote": null}
-{"think": "No one questioned me directly, so I can share my observations. Yellow's behavior seemed suspicious when they were near the exit.", "speak": "I was doing wires in Cafeteria with everyone. Yellow, I noticed you near the exit several times - did you leave at any point?", "impostor_hypothesis": "yellow", "vote": null}
+CONTEXT = PromptTemplate("Game context: {context}")
+MEMORY = PromptTemplate("Your memory from previous steps:\\n{memory} \\n{meeting_info}")
+CONVERSATION = PromptTemplate("RECENT CONVERSATION (READ CAREFULLY - others may have asked you questions!):\\n{conversation}")
+PRIVATE_THOUGHTS = PromptTemplate("Your private thoughts (only you can see):\\n{thoughts}")
 
-CRITICAL REQUIREMENTS:
-- CHECK: Did someone ask YOU a direct question? Answer it first!
-- CHECK: Were YOU accused of something? Defend yourself with your alibi!
-- You MUST always have an "impostor_hypothesis" - your current best guess
-- Build on the conversation - don't ignore what others just said
-- Focus on WHO HAD OPPORTUNITY to commit the murder
-- Respond with valid JSON only!"""}
-        ]
+class Crewmate:
+    role_template = PromptTemplate("You are {name} ({color}), a CREWMATE detective. A dead body has been found and you're now investigating the murder to identify the impostor. Your goal is to analyze alibis, establish timelines, and deduce who had the opportunity to commit the murder. Each discussion turn, you must form and share your hypothesis about who the impostor is, gather evidence to support or refute theories, and work toward eliminating the killer.")
+
+    def __init__(self, agent_data: Agent, llm_client: LLMClient):
+        self.data = agent_data
+        self.llm_client = llm_client
+        # Static prompt segments: the service keeps one agent per game and reuses it every step
+        self.role_description = self.role_template.render(name=agent_data.name, color=agent_data.color)
+        self.instructions = INSTRUCTIONS.render(
+            color=agent_data.color,
+            name=agent_data.name,
+            location=agent_data.location,
+            action=agent_data.action,
+            met=', '.join(agent_data.met) if agent_data.met else 'no one'
+        )
+        self._meeting_info = (None, "")
+        self._memory_context = (0, "")
+    
+    def get_role_description(self) -> str:
+        return self.role_description
+    
+    def _format_meeting_info(self, all_agents: Optional[List[Agent]]) -> str:
+        """Meeting participants line, re-rendered only when someone is eliminated"""
+        if not all_agents:
+            return ""
+        alive_list = tuple(agent.color for agent in all_agents if agent.is_alive)
+        dead_list = tuple(agent.color for agent in all_agents if not agent.is_alive)
+        if self._meeting_info[0] == (alive_list, dead_list):
+            return self._meeting_info[1]
         
+        meeting_info = f"MEETING PARTICIPANTS: {', '.join(alive_list)} are present in this investigation."
+        if dead_list:
+            meeting_info += f" ELIMINATED: {', '.join(dead_list)} have been eliminated and are not in the meeting."
+        meeting_info += f" Total alive: {len(alive_list)}/8 players remaining."
+        self._meeting_info = ((alive_list, dead_list), meeting_info)
+        return meeting_info
+    
+    def build_messages(self, context: str, public_action_history: List[AgentAction], private_thoughts: List[AgentAction], all_agents: List[Agent] = None, conversation: Optional[RenderedConversation] = None) -> List[dict]:
+        """Fill the per-step slots of this agent's prompt.
+
+        `conversation` is the game's shared rendered window; without it the
+        window is rendered from `public_action_history` for this call only.
+        """
+        # Public chat history (what everyone can see), rendered once per step for all agents
+        if conversation is None:
+            conversation = RenderedConversation.of(public_action_history)
+        logger.debug("%s sees %d conversation messages", self.data.color, conversation.length)
+        
+        # Format private thoughts (only this agent's thoughts)
+        private_chat = []
+        for thought in private_thoughts[-10:]:
+            private_chat.append(f"You thought: {thought.content}")
+        
+        private_context = "\\n".join(private_chat) if private_chat else "No private thoughts yet."
+        
+        return [
+            {"role": "system", "content": self.role_description},
+            {"role": "system", "content": CONTEXT.render(context=context)},
+            {"role": "system", "content": MEMORY.render(memory=self._format_memory_context(), meeting_info=self._format_meeting_info(all_agents))},
+            {"role": "system", "content": conversation.render(CONVERSATION, separator="\\n", empty="No public discussion yet.")},
+            {"role": "system", "content": PRIVATE_THOUGHTS.render(thoughts=private_context)},
+            {"role": "user", "content": self.instructions}
+        ]
+    
+    async def choose_action(self, context: str, public_action_history: List[AgentAction], private_thoughts: List[AgentAction], step_number: int, all_agents: List[Agent] = None, conversation: Optional[RenderedConversation] = None) -> AgentTurn:
+        messages = self.build_messages(context, public_action_history, private_thoughts, all_agents, conversation)
         response = await self.llm_client.generate_response(messages, max_tokens=300, temperature=0.7)
         return self._parse_turn(response, step_number)
     
@@ -108,6 +132,9 @@ CRITICAL REQUIREMENTS:
         """Format agent's memory history for context"""
         if not self.data.memory_history:
             return "No previous memories."
+        # Memory history is append-only, so its length identifies the rendered text
+        if self._memory_context[0] == len(self.data.memory_history):
+            return self._memory_context[1]
         
         memory_lines = []
         for memory in self.data.memory_history[-5:]:  # Last 5 steps
@@ -116,11 +143,12 @@ CRITICAL REQUIREMENTS:
                 lines.append(f"  Met: {', '.join(memory.met)}")
             memory_lines.extend(lines)
         
-        return "\\n".join(memory_lines)
+        memory_context = "\\n".join(memory_lines)
+        self._memory_context = (len(self.data.memory_history), memory_context)
+        return memory_context
     
     def _parse_turn(self, response: str, step_number: int) -> AgentTurn:
-        # Debug: print what LLM actually responds
-        print(f"DEBUG - {self.data.name} LLM response: {response}")
+        logger.debug("%s LLM response: %s", self.data.name, response)
         
         # Try to parse JSON response with new format
         try:
@@ -187,7 +215,7 @@ CRITICAL REQUIREMENTS:
                     memory_update=memory_update
                 )
         except (json.JSONDecodeError, KeyError, ValueError) as e:
-            print(f"DEBUG - JSON parsing error for {self.data.name}: {e}")
+            logger.warning("JSON parsing error for %s: %s", self.data.name, e)
         
         # Fallback: try to extract meaningful content
         response_lower = response.lower()
@@ -233,13 +261,12 @@ CRITICAL REQUIREMENTS:
         )
 
 class Impostor(Crewmate):
-    def get_role_description(self) -> str:
-        return f"You are {self.data.name} ({self.data.color}), the IMPOSTOR who committed the murder. You're now being investigated by the other crewmates who are trying to identify you. Your goal is to avoid detection and elimination. Provide convincing alibis, act innocent, deflect suspicion toward innocent crewmates, and create doubt about others. When forced to give an impostor hypothesis, accuse someone else strategically. Never reveal your true identity."
+    role_template = PromptTemplate("You are {name} ({color}), the IMPOSTOR who committed the murder. You're now being investigated by the other crewmates who are trying to identify you. Your goal is to avoid detection and elimination. Provide convincing alibis, act innocent, deflect suspicion toward innocent crewmates, and create doubt about others. When forced to give an impostor hypothesis, accuse someone else strategically. Never reveal your true identity.")
     
-    async def choose_action(self, context: str, public_action_history: List[AgentAction], private_thoughts: List[AgentAction], step_number: int, all_agents: List[Agent] = None) -> AgentTurn:
+    def _parse_turn(self, response: str, step_number: int) -> AgentTurn:
         # Impostors might be more strategic in their actions
         # They could analyze who's being suspected and deflect
-        turn = await super().choose_action(context, public_action_history, private_thoughts, step_number, all_agents)
+        turn = super()._parse_turn(response, step_number)
         
         # Make impostor thoughts more strategic
         if "I'm processing the situation..." in turn.think or "I'm analyzing the situation..." in turn.think:
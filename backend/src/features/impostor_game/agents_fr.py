@@ -1,19 +1,41 @@
+import logging
 import re
 from typing import List, Optional
 from src.core.llm_client import LLMClient
+from .prompts import PromptTemplate
 from .schema import Agent, AgentAction, ActionType
 
+logger = logging.getLogger(__name__)
+
+# French prompt templates, parsed once (see agents.py)
+INSTRUCTIONS = """Tu dois choisir UNE action parmi:
+- THINK|tes pensées sur la situation
+- SPEAK|ce que tu veux dire aux autres
+- VOTE|accusation contre quelqu'un|ID_du_suspect
+
+Exemples:
+THINK|Je trouve Red suspect, il était près d'Electrical
+SPEAK|Je pense que Blue agit bizarrement depuis le début
+VOTE|Green est l'imposteur, je l'accuse|2
+
+IMPORTANT: Réponds EXACTEMENT dans ce format, rien d'autre!"""
+
+CONTEXT = PromptTemplate("Contexte du jeu: {context}")
+ACTION_HISTORY = PromptTemplate("Historique des actions:\\n{actions}")
+
 class Crewmate:
+    role_template = PromptTemplate("Tu es {name} ({color}), un CREWMATE dans ce vaisseau spatial. Une réunion d'urgence a été déclenchée. Il y a un imposteur parmi vous et ton objectif est de le découvrir avant qu'il ne vous élimine tous. Analyse les comportements suspects, pose des questions pertinentes, et vote pour éliminer l'imposteur.")
+
     def __init__(self, agent_data: Agent, llm_client: LLMClient):
         self.data = agent_data
         self.llm_client = llm_client
+        # Rendered once per agent, reused every step
+        self.role_description = self.role_template.render(name=agent_data.name, color=agent_data.color)
     
     def get_role_description(self) -> str:
-        return f"Tu es {self.data.name} ({self.data.color}), un CREWMATE dans ce vaisseau spatial. Une réunion d'urgence a été déclenchée. Il y a un imposteur parmi vous et ton objectif est de le découvrir avant qu'il ne vous élimine tous. Analyse les comportements suspects, pose des questions pertinentes, et vote pour éliminer l'imposteur."
+        return self.role_description
     
     def choose_action(self, context: str, action_history: List[AgentAction], step_number: int) -> AgentAction:
-        system_prompt = self.get_role_description()
-        
         # Format action history for context
         recent_actions = []
         for action in action_history[-20:]:
@@ -23,28 +45,17 @@ class Crewmate:
         action_context = "\\n".join(recent_actions) if recent_actions else "No previous actions."
         
         messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "system", "content": f"Contexte du jeu: {context}"},
-            {"role": "system", "content": f"Historique des actions:\\n{action_context}"},
-            {"role": "user", "content": """Tu dois choisir UNE action parmi:
-- THINK|tes pensées sur la situation
-- SPEAK|ce que tu veux dire aux autres
-- VOTE|accusation contre quelqu'un|ID_du_suspect
-
-Exemples:
-THINK|Je trouve Red suspect, il était près d'Electrical
-SPEAK|Je pense que Blue agit bizarrement depuis le début
-VOTE|Green est l'imposteur, je l'accuse|2
-
-IMPORTANT: Réponds EXACTEMENT dans ce format, rien d'autre!"""}
+            {"role": "system", "content": self.role_description},
+            {"role": "system", "content": CONTEXT.render(context=context)},
+            {"role": "system", "content": ACTION_HISTORY.render(actions=action_context)},
+            {"role": "user", "content": INSTRUCTIONS}
         ]
         
         response = self.llm_client.generate_response(messages, max_tokens=150, temperature=0.7)
         return self._parse_action(response)
     
     def _parse_action(self, response: str) -> AgentAction:
-        # Debug: print what LLM actually responds
-        print(f"DEBUG - {self.data.name} LLM response: {response}")
+        logger.debug("%s LLM response: %s", self.data.name, response)
         
         # Parse response - be more flexible
         try:
@@ -75,7 +86,7 @@ IMPORTANT: Réponds EXACTEMENT dans ce format, rien d'autre!"""}
                         target_agent_id=target_id
                     )
         except Exception as e:
-            print(f"DEBUG - Parsing error for {self.data.name}: {e}")
+            logger.warning("Parsing error for %s: %s", self.data.name, e)
         
         # Fallback: try to detect action type from content
         response_lower = response.lower()
@@ -105,8 +116,7 @@ IMPORTANT: Réponds EXACTEMENT dans ce format, rien d'autre!"""}
             )
 
 class Impostor(Crewmate):
-    def get_role_description(self) -> str:
-        return f"Tu es {self.data.name} ({self.data.color}), l'IMPOSTEUR dans ce vaisseau spatial. Une réunion d'urgence a été déclenchée. Ton objectif est de ne pas te faire découvrir. Tu dois agir comme un crewmate innocent, nier toute accusation, et essayer de rediriger les soupçons vers les autres. Sois subtil et convaincant. Ne révèle JAMAIS que tu es l'imposteur."
+    role_template = PromptTemplate("Tu es {name} ({color}), l'IMPOSTEUR dans ce vaisseau spatial. Une réunion d'urgence a été déclenchée. Ton objectif est de ne pas te faire découvrir. Tu dois agir comme un crewmate innocent, nier toute accusation, et essayer de rediriger les soupçons vers les autres. Sois subtil et convaincant. Ne révèle JAMAIS que tu es l'imposteur.")
     
     def choose_action(self, context: str, action_history: List[AgentAction], step_number: int) -> AgentAction:
         # Impostors might be more strategic in their actions
@@ -0,0 +1,70 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Tuple
+from .prompts import PromptTemplate
+from .schema import AgentAction
+
+# Actions of the public conversation that prompts show
+CONVERSATION_WINDOW = 15
+
+def format_action(action: AgentAction) -> str:
+    """One line of the public conversation as agents see it"""
+    action_text = f"{action.agent_id} {action.action_type.value}: {action.content}"
+    if action.target_agent_id is not None:
+        action_text += f" (targeting {action.target_agent_id})"
+    return action_text
+
+class RenderedConversation:
+    """The public conversation window, rendered once per step for every reader.
+
+    `sync` formats only the actions appended to the history since the last
+    sync (each action is formatted once) into a bounded window of lines.
+    Joined windows and whole prompt messages built from them are cached until
+    the next sync, so agents of the same step share one string instead of each
+    re-walking and re-formatting the history.
+    """
+
+    def __init__(self, size: int = CONVERSATION_WINDOW):
+        self.size = size
+        self.lines: Deque[str] = deque(maxlen=size)
+        self.history = None
+        self.length = 0
+        self._rendered: Dict[Tuple, str] = {}
+
+    @classmethod
+    def of(cls, history: Iterable[AgentAction], size: int = CONVERSATION_WINDOW) -> "RenderedConversation":
+        conversation = cls(size)
+        conversation.sync(history)
+        return conversation
+
+    def sync(self, history) -> "RenderedConversation":
+        """Catch up with `history` (an append-only History, or any sequence)"""
+        length = len(history)
+        if history is not self.history or length < self.length:
+            # A different history (fork, rebuilt game): start over from its window
+            self.history, self.length = history, 0
+            self.lines.clear()
+            self._rendered.clear()
+        if length == self.length:
+            return self
+        start = max(self.length, length - self.size)
+        self.lines.extend(format_action(action) for action in history[start:length])
+        self.length = length
+        self._rendered.clear()
+        return self
+
+    def text(self, separator: str = "\n", empty: str = "") -> str:
+        key = (separator, empty)
+        text = self._rendered.get(key)
+        if text is None:
+            text = separator.join(self.lines) if self.lines else empty
+            self._rendered[key] = text
+        return text
+
+    def render(self, template: PromptTemplate, slot: str = "conversation", separator: str = "\n", empty: str = "") -> str:
+        """Fill `template`'s conversation slot, shared by every agent until the next sync"""
+        key = (id(template), slot, separator, empty)
+        text = self._rendered.get(key)
+        if text is None:
+            text = template.render(**{slot: self.text(separator, empty)})
+            self._rendered[key] = text
+        return text
@@ -0,0 +1,369 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional
+from .history import History
+from .schema import (
+    ActionType, AgentAction, AgentTurn, GamePhase, GameState, GameStatus, StepCheckpoint
+)
+
+logger = logging.getLogger(__name__)
+
+# State transitions. step_game decides what happens in a step; these functions are
+# the only code that applies it, both live and when rebuilding a game from its log.
+
+def apply_step(
+    game: GameState,
+    step_number: int,
+    turns: List[AgentTurn],
+    public_actions: List[AgentAction],
+    eliminated_id: Optional[str],
+    votes: Dict[str, int],
+    winner: Optional[str],
+) -> None:
+    """Commit a completed step to the game state"""
+    agents_by_id = {agent.id: agent for agent in game.agents}
+    for turn in turns:
+        agent_data = agents_by_id.get(turn.agent_id)
+        # Save memory updates to persistent agent data (if not already added by agent)
+        if agent_data and turn.memory_update and (not agent_data.memory_history or agent_data.memory_history[-1] != turn.memory_update):
+            agent_data.memory_history.append(turn.memory_update)
+
+        # Idle agents and agents whose call missed the deadline did not really think this step
+        if turn.idle or turn.degraded:
+            continue
+        game.last_active_step[turn.agent_id] = step_number
+        if turn.impostor_hypothesis:
+            game.impostor_hypotheses[turn.agent_id] = turn.impostor_hypothesis
+        # Store thinks privately
+        game.private_thoughts.setdefault(turn.agent_id, History()).append(AgentAction(
+            agent_id=turn.agent_id,
+            action_type=ActionType.THINK,
+            content=turn.think,
+            target_agent_id=None
+        ))
+
+    game.public_action_history.extend(public_actions)
+    game.current_votes = votes
+    if eliminated_id and eliminated_id in agents_by_id:
+        agents_by_id[eliminated_id].is_alive = False
+    if winner:
+        _finish(game, winner)
+    game.step_number = step_number + 1
+    game.version += 1
+    record_checkpoint(game)
+
+def apply_game_over(game: GameState, winner: str) -> None:
+    _finish(game, winner)
+    game.version += 1
+
+def _finish(game: GameState, winner: str) -> None:
+    game.winner = winner
+    game.status = GameStatus.FINISHED
+    game.phase = GamePhase.GAME_OVER
+
+def record_checkpoint(game: GameState) -> None:
+    """Record the state at the start of `game.step_number` so the game can be forked there"""
+    game.checkpoints.append(StepCheckpoint(
+        public_len=len(game.public_action_history),
+        thought_lens={agent_id: len(thoughts) for agent_id, thoughts in game.private_thoughts.items()},
+        memory_lens={agent.id: len(agent.memory_history) for agent in game.agents},
+        alive={agent.id: agent.is_alive for agent in game.agents},
+        current_votes=dict(game.current_votes),
+        last_active_step=dict(game.last_active_step),
+        impostor_hypotheses=dict(game.impostor_hypotheses),
+        status=game.status,
+        phase=game.phase,
+        winner=game.winner
+    ))
+
+def fork_state(game: GameState, new_game_id: str, at_step: int) -> GameState:
+    """Copy-on-write fork of `game` as it was at the start of step `at_step`.
+
+    Histories are forked (O(1) each) and only the per-agent fields are copied,
+    so the cost does not depend on how long the game has been running.
+    """
+    if not 1 <= at_step <= len(game.checkpoints):
+        raise ValueError(f"Cannot fork at step {at_step}: game has checkpoints for steps 1-{len(game.checkpoints)}")
+    checkpoint = game.checkpoints[at_step - 1]
+
+    agents = [
+        agent.model_copy(update={
+            "is_alive": checkpoint.alive.get(agent.id, agent.is_alive),
+            "memory_history": History.fork_of(agent.memory_history, checkpoint.memory_lens.get(agent.id, 0)),
+        })
+        for agent in game.agents
+    ]
+    return game.model_copy(update={
+        "game_id": new_game_id,
+        "step_number": at_step,
+        "agents": agents,
+        "public_action_history": History.fork_of(game.public_action_history, checkpoint.public_len),
+        "private_thoughts": {
+            agent_id: History.fork_of(thoughts, checkpoint.thought_lens[agent_id])
+            for agent_id, thoughts in game.private_thoughts.items()
+            if agent_id in checkpoint.thought_lens
+        },
+        "current_votes": dict(checkpoint.current_votes),
+        "last_active_step": dict(checkpoint.last_active_step),
+        "impostor_hypotheses": dict(checkpoint.impostor_hypotheses),
+        "status": checkpoint.status,
+        "phase": checkpoint.phase,
+        "winner": checkpoint.winner,
+        "counters": {},
+        "version": 0,  # the fork's own log starts over (see GameEventLog)
+        "checkpoints": History.fork_of(game.checkpoints, at_step),
+        "forked_from": game.game_id,
+    })
+
+def apply_event(game: GameState, event: Dict) -> None:
+    """Apply a logged event to a game rebuilt from its `game_created` event"""
+    if event["type"] == "step":
+        apply_step(
+            game,
+            event["step"],
+            [AgentTurn.model_validate(turn) for turn in event["turns"]],
+            [AgentAction.model_validate(action) for action in event["actions"]],
+            event.get("eliminated"),
+            event.get("votes", {}),
+            event.get("winner"),
+        )
+    elif event["type"] == "game_over":
+        apply_game_over(game, event["winner"])
+
+# Event encoding
+
+def game_created_event(game: GameState) -> Dict:
+    return {"type": "game_created", "state": game.model_dump(mode="json", exclude_none=True)}
+
+def step_event(
+    step_number: int,
+    turns: List[AgentTurn],
+    public_actions: List[AgentAction],
+    eliminated_id: Optional[str],
+    votes: Dict[str, int],
+    winner: Optional[str],
+) -> Dict:
+    return {
+        "type": "step",
+        "step": step_number,
+        # The chosen speaker's audio is stored once, on its public SPEAK action
+        "turns": [turn.model_dump(mode="json", exclude_none=True, exclude={"audio_base64"}) for turn in turns],
+        "actions": [action.model_dump(mode="json", exclude_none=True) for action in public_actions],
+        "eliminated": eliminated_id,
+        "votes": votes,
+        "winner": winner,
+    }
+
+def game_over_event(step_number: int, winner: str) -> Dict:
+    return {"type": "game_over", "step": step_number, "winner": winner}
+
+def game_forked_event(parent_game_id: str, at_step: int) -> Dict:
+    # The fork's history lives in the parent's log, so forking never copies it
+    return {"type": "game_forked", "parent": parent_game_id, "at_step": at_step}
+
+class _EventWriter:
+    """Background thread appending queued log lines, shared by every event log of the process"""
+
+    def __init__(self):
+        self._pending: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Lines queued but not yet written, per path, so one game's log can be flushed on its own
+        self._queued: Dict[str, int] = {}
+        self._written = threading.Condition()
+
+    def queued(self, path: str) -> bool:
+        return path in self._queued
+
+    def put(self, path: str, line: str) -> None:
+        with self._written:
+            self._queued[path] = self._queued.get(path, 0) + 1
+        self._pending.put((path, line))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+                    self._thread.start()
+
+    def flush(self, path: Optional[str] = None) -> None:
+        """Wait until every queued line (or every line queued for `path`) is on disk"""
+        if path is not None:
+            with self._written:
+                self._written.wait_for(lambda: path not in self._queued)
+        elif self._thread is not None:
+            self._pending.join()
+
+    def close(self) -> None:
+        """Write the queued lines and stop the thread (the next put starts a new one)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._pending.put(None)
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            # Write everything queued so far in one pass, each game's lines with one open()
+            batch = [self._pending.get()]
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [item for item in batch if item is not None]
+            for path, group in groupby(lines, key=lambda item: item[0]):
+                group = [line for _, line in group]
+                try:
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write("".join(group))
+                except Exception:  # the writer must outlive a failed write, or flush() would wait forever
+                    logger.exception("Event log write failed", extra={"path": path})
+                with self._written:
+                    left = self._queued.pop(path) - len(group)
+                    if left:
+                        self._queued[path] = left
+                    self._written.notify_all()
+            for _ in batch:
+                self._pending.task_done()
+            if batch[-1] is None:
+                return
+
+_writer = _EventWriter()
+atexit.register(_writer.close)
+
+class GameEventLog:
+    """Append-only per-game event log, one compact JSON line per state transition.
+
+    Each line carries a sequence number and a wall-clock timestamp, so a game
+    can be rebuilt or replayed at its original pace without any LLM/TTS call.
+    The sequence number is the game's version after the transition (0 for its
+    created or forked event), so workers sharing a store agree on it without
+    reading the file.
+
+    Appends are queued and written by a background thread. Reads (`iter_events`,
+    `rebuild`, `replay_events`) block on the disk, so async code runs them with
+    `asyncio.to_thread`; they first wait for that game's queued lines, so a
+    process always reads back what it appended. Logs not appended to for
+    `retention_s` seconds are deleted when the log is opened (see `prune`).
+    """
+
+    def __init__(self, directory: Optional[str], retention_s: float = 0.0):
+        self.directory = directory or None
+        self.retention_s = retention_s
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self.prune()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def path(self, game_id: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        try:
+            # Game ids are UUIDs; anything else must never reach the filesystem
+            game_id = str(uuid.UUID(game_id))
+        except ValueError:
+            return None
+        return os.path.join(self.directory, f"{game_id}.jsonl")
+
+    def exists(self, game_id: str) -> bool:
+        path = self.path(game_id)
+        if path is None:
+            return False
+        return _writer.queued(path) or os.path.exists(path)
+
+    def append(self, game_id: str, event: Dict, seq: int) -> None:
+        """Queue `event` for writing; `seq` is the game's version once the event is applied"""
+        path = self.path(game_id)
+        if path is None:
+            return
+        record = {"seq": seq, "t": round(time.time(), 3), **event}
+        _writer.put(path, json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def flush(self) -> None:
+        """Wait until every event appended so far (by any log of this process) is on disk"""
+        _writer.flush()
+
+    def close(self) -> None:
+        """Write the queued events and stop the writer thread"""
+        _writer.close()
+
+    def iter_events(self, game_id: str) -> Iterator[Dict]:
+        if not self.exists(game_id):
+            return
+        path = self.path(game_id)
+        _writer.flush(path)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete the logs not appended to within the retention period; returns how many were deleted.
+
+        The logs of a kept fork's parents are kept too, since the fork is rebuilt from them.
+        """
+        if not self.enabled or self.retention_s <= 0:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.retention_s
+        expired, kept = set(), []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                game_id = entry.name[:-len(".jsonl")]
+                if not entry.name.endswith(".jsonl") or self.path(game_id) != entry.path:
+                    continue
+                if entry.stat().st_mtime < cutoff:
+                    expired.add(game_id)
+                else:
+                    kept.append(game_id)
+        while kept and expired:
+            parent = self._parent(kept.pop())
+            if parent in expired:
+                expired.discard(parent)
+                kept.append(parent)
+        for game_id in expired:
+            try:
+                os.remove(self.path(game_id))
+            except FileNotFoundError:
+                pass
+        return len(expired)
+
+    def _parent(self, game_id: str) -> Optional[str]:
+        first = next(self.iter_events(game_id), None)
+        return first["parent"] if first and first["type"] == "game_forked" else None
+
+    def rebuild(self, game_id: str) -> Optional[GameState]:
+        """Rebuild a game's current state from its log (and its parents' logs for forks)"""
+        game = None
+        for event in self.iter_events(game_id):
+            if event["type"] == "game_created":
+                game = GameState.model_validate(event["state"])
+            elif event["type"] == "game_forked":
+                parent = self.rebuild(event["parent"])
+                game = fork_state(parent, game_id, event["at_step"]) if parent else None
+            elif game is not None:
+                apply_event(game, event)
+        return game
+
+    def replay_events(self, game_id: str, until_step: Optional[int] = None) -> List[Dict]:
+        """A game's events in order, led by its parents' events up to the fork for forks.
+
+        With `until_step`, only the events before that step are returned.
+        """
+        events = []
+        for event in self.iter_events(game_id):
+            if until_step is not None and event.get("step", 0) >= until_step:
+                break
+            if event["type"] == "game_forked":
+                events.extend(self.replay_events(event["parent"], event["at_step"]))
+            events.append(event)
+        return events
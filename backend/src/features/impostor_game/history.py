@@ -0,0 +1,198 @@
+import os
+import pickle
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Generic, Iterable, Iterator, List, Optional, TypeVar, get_args
+from pydantic_core import core_schema
+
+T = TypeVar("T")
+
+class ColdStore:
+    """Storage for compacted history segments.
+
+    Segments are pickled and zlib-compressed. They stay in memory by default;
+    with a spill directory they are appended to an anonymous temporary file
+    there and only their (offset, length) is kept in memory.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None):
+        self._file = None
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._file = tempfile.TemporaryFile(dir=spill_dir)
+
+    @property
+    def spilling(self) -> bool:
+        return self._file is not None
+
+    def put(self, items: List[Any]) -> Any:
+        blob = zlib.compress(pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        if self._file is None:
+            return blob
+        with self._lock:
+            offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(blob)
+        return (offset, len(blob))
+
+    def get(self, ref: Any) -> List[Any]:
+        if isinstance(ref, tuple):
+            offset, length = ref
+            with self._lock:
+                self._file.seek(offset)
+                ref = self._file.read(length)
+        return pickle.loads(zlib.decompress(ref))
+
+class _Segment:
+    __slots__ = ("count", "ref", "store")
+
+    def __init__(self, count: int, ref: Any, store: ColdStore):
+        self.count = count
+        self.ref = ref
+        self.store = store
+
+# Recently decoded segments, so reading across a segment boundary (or iterating
+# the same old prefix of several forks) does not decompress it every time
+_DECODED_CACHE_SIZE = 16
+_decoded: "OrderedDict[_Segment, List[Any]]" = OrderedDict()
+_decoded_lock = threading.Lock()
+
+def _decode(segment: _Segment) -> List[Any]:
+    with _decoded_lock:
+        items = _decoded.get(segment)
+        if items is not None:
+            _decoded.move_to_end(segment)
+            return items
+    items = segment.store.get(segment.ref)
+    with _decoded_lock:
+        _decoded[segment] = items
+        while len(_decoded) > _DECODED_CACHE_SIZE:
+            _decoded.popitem(last=False)
+    return items
+
+class History(Generic[T]):
+    """Append-only list whose prefix can be shared between forks.
+
+    `fork(length)` is O(1): the fork keeps a reference to this history bounded
+    at `length` items and stores only what is appended to it afterwards. Items
+    already in a history are never modified, so forks diverge only on new writes.
+    Reads walk up the (short) chain of forks.
+
+    Only the newest `hot_items` items are kept as live objects; prompts only read
+    the last 15 or fewer, so those windows never leave the hot tail. Older items
+    are moved in blocks of `segment_items` to the cold store (compressed, or
+    spilled to disk), which keeps resident memory flat as a game goes on.
+    """
+
+    __slots__ = ("_parent", "_parent_len", "_cold", "_cold_len", "_items")
+
+    # Process-wide; the app applies IMPOSTOR_HISTORY_* at startup (see `configure`)
+    hot_items = 16
+    segment_items = 32
+    cold_store = ColdStore()
+
+    def __init__(self, items: Iterable[T] = (), _parent: Optional["History[T]"] = None, _parent_len: int = 0):
+        self._parent = _parent
+        self._parent_len = _parent_len
+        self._cold: List[_Segment] = []
+        self._cold_len = 0
+        self._items: List[T] = list(items)
+        self._compact()
+
+    @classmethod
+    def configure(cls, hot_items: int, segment_items: int, spill_dir: Optional[str] = None) -> None:
+        """Set the hot tail and segment sizes and where cold segments go, for histories compacted from now on"""
+        cls.hot_items = hot_items
+        cls.segment_items = segment_items
+        if spill_dir or cls.cold_store.spilling:
+            cls.cold_store = ColdStore(spill_dir)
+
+    def fork(self, length: Optional[int] = None) -> "History[T]":
+        """New history sharing the first `length` items (default: all of them)"""
+        length = len(self) if length is None else length
+        if not 0 <= length <= len(self):
+            raise IndexError(f"cannot fork history of length {len(self)} at {length}")
+        return History(_parent=self, _parent_len=length)
+
+    @classmethod
+    def fork_of(cls, items: Iterable[T], length: Optional[int] = None) -> "History[T]":
+        if isinstance(items, History):
+            return items.fork(length)
+        items = list(items)
+        return cls(items[:length] if length is not None else items)
+
+    def append(self, item: T) -> None:
+        self._items.append(item)
+        self._compact()
+
+    def extend(self, items: Iterable[T]) -> None:
+        self._items.extend(items)
+        self._compact()
+
+    def _compact(self) -> None:
+        hot, segment = max(self.hot_items, 0), max(self.segment_items, 1)
+        while len(self._items) >= hot + segment:
+            block = self._items[:segment]
+            self._cold.append(_Segment(len(block), self.cold_store.put(block), self.cold_store))
+            self._cold_len += len(block)
+            del self._items[:segment]
+
+    def __len__(self) -> int:
+        return self._parent_len + self._cold_len + len(self._items)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def _item(self, index: int) -> T:
+        history = self
+        while index < history._parent_len:
+            history = history._parent
+        index -= history._parent_len
+        if index >= history._cold_len:
+            return history._items[index - history._cold_len]
+        for segment in history._cold:
+            if index < segment.count:
+                return _decode(segment)[index]
+            index -= segment.count
+        raise IndexError("history index out of range")
+
+    def __getitem__(self, index):
+        length = len(self)
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(length))]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("history index out of range")
+        return self._item(index)
+
+    def __iter__(self) -> Iterator[T]:
+        if self._parent is not None:
+            for i, item in enumerate(self._parent):
+                if i >= self._parent_len:
+                    break
+                yield item
+        for segment in self._cold:
+            yield from _decode(segment)
+        yield from self._items
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (History, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"History({list(self)!r})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler):
+        args = get_args(source_type)
+        list_schema = handler.generate_schema(List[args[0]] if args else List[Any])
+        from_list = core_schema.no_info_after_validator_function(cls, list_schema)
+        return core_schema.json_or_python_schema(
+            json_schema=from_list,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_list]),
+            serialization=core_schema.plain_serializer_function_ser_schema(list, return_schema=list_schema),
+        )
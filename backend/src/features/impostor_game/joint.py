@@ -0,0 +1,139 @@
+import json
+import logging
+from typing import Callable, List, Dict, Optional
+from src.core.llm_client import LLMClient
+from .schema import Agent, AgentTurn, GameState
+from .agents import Crewmate
+from .conversation import RenderedConversation
+
+logger = logging.getLogger(__name__)
+
+class JointTurnGenerator:
+    """Generate every alive agent's turn with a single structured LLM request.
+
+    The fan-out engine sends one `choose_action` call per agent, each carrying
+    the same conversation window. Here the shared context is sent once and the
+    model answers with one JSON object per agent, keyed by color, so private
+    thoughts stay separated and can be split back into per-agent `AgentTurn`s.
+    """
+
+    max_tokens_per_agent = 300
+    max_tokens_cap = 4000
+
+    def __init__(self, llm_client: LLMClient, create_agent: Callable[[Agent, Optional[str]], Crewmate]):
+        self.llm_client = llm_client
+        self._create_agent = create_agent
+
+    def build_messages(self, game: GameState, agents: List[Agent], context: str, conversation: Optional[RenderedConversation] = None) -> List[Dict[str, str]]:
+        """Build the single request shared by all agents of this step"""
+        if conversation is None:
+            conversation = RenderedConversation.of(game.public_action_history)
+        public_context = conversation.text("\n", empty="No public discussion yet.")
+
+        alive_list = [a.color for a in game.agents if a.is_alive]
+        dead_list = [a.color for a in game.agents if not a.is_alive]
+        meeting_info = f"MEETING PARTICIPANTS: {', '.join(alive_list)} are present in this investigation."
+        if dead_list:
+            meeting_info += f" ELIMINATED: {', '.join(dead_list)} have been eliminated and are not in the meeting."
+
+        # Per-agent briefs: role, alibi, memory and private thoughts. Each brief is
+        # only to be used for that agent's own answer.
+        briefs = []
+        for agent_data in agents:
+            agent = self._create_agent(agent_data, game.game_id)
+            private = game.private_thoughts.get(agent_data.id, [])[-10:]
+            private_context = "\n".join(f"  - {t.content}" for t in private) if private else "  No private thoughts yet."
+            agent_context = context
+            if game.step_number == 25 and agent_data.id == game.reporter_id:
+                agent_context = f"{context} You are the one who called this meeting because: {game.meeting_reason}"
+            briefs.append(f"""### {agent_data.color}
+ROLE: {agent.get_role_description()}
+SITUATION: {agent_context}
+ALIBI: In {agent_data.location} doing '{agent_data.action}', encountered: {', '.join(agent_data.met) if agent_data.met else 'no one'}
+MEMORY:
+{agent._format_memory_context()}
+PRIVATE THOUGHTS (only {agent_data.color} knows these):
+{private_context}""")
+
+        colors = [a.color for a in agents]
+        example = {
+            color: {"think": "...", "speak": "... or null", "impostor_hypothesis": "color", "vote": "color or null"}
+            for color in colors
+        }
+
+        system_prompt = (
+            "You are simulating several independent players in a murder investigation (a social deduction game similar to Among Us). "
+            "Each player only knows the public conversation, their own role, alibi, memory and private thoughts. "
+            "Never let one player's private thoughts or role leak into another player's answer."
+        )
+        user_prompt = f"""{meeting_info}
+
+RECENT CONVERSATION (shared by everyone):
+{public_context}
+
+PLAYER BRIEFS:
+{chr(10).join(briefs)}
+
+For EACH player ({', '.join(colors)}) produce their turn exactly as they would:
+- "think": their private detective analysis (always required)
+- "speak": what they tell the group (null if silent); answer direct questions first
+- "impostor_hypothesis": color they currently suspect
+- "vote": color to eliminate or null
+
+Respond with valid JSON only, one entry per player keyed by color:
+{json.dumps({"turns": example})}"""
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def split_turns(self, response: str, agents: List[Agent], step_number: int, game_id: Optional[str] = None) -> List[AgentTurn]:
+        """Validate the joint response and split it into one `AgentTurn` per agent.
+
+        Entries are validated by each agent's own `_parse_turn`, so joint turns
+        go through the same normalization as fan-out turns. Agents missing from
+        the response get the `_parse_turn` fallback turn.
+        """
+        entries = self._extract_entries(response)
+        turns = []
+        for agent_data in agents:
+            agent = self._create_agent(agent_data, game_id)
+            entry = entries.get(agent_data.id.lower()) or entries.get(agent_data.color.lower())
+            if isinstance(entry, dict):
+                turns.append(agent._parse_turn(json.dumps(entry), step_number))
+            else:
+                turns.append(agent._parse_turn("", step_number))
+        return turns
+
+    def _extract_entries(self, response: str) -> Dict[str, dict]:
+        clean_response = response.strip()
+        start_idx = clean_response.find('{')
+        end_idx = clean_response.rfind('}')
+        if start_idx == -1 or end_idx <= start_idx:
+            return {}
+        try:
+            data = json.loads(clean_response[start_idx:end_idx + 1])
+        except json.JSONDecodeError as e:
+            logger.warning("Joint response JSON parsing error: %s", e)
+            return {}
+
+        turns = data.get("turns", data) if isinstance(data, dict) else data
+        entries: Dict[str, dict] = {}
+        if isinstance(turns, dict):
+            for key, value in turns.items():
+                if isinstance(value, dict):
+                    entries[str(key).lower()] = value
+        elif isinstance(turns, list):
+            for value in turns:
+                if isinstance(value, dict) and value.get("agent_id"):
+                    entries[str(value["agent_id"]).lower()] = value
+        return entries
+
+    async def generate_turns(self, game: GameState, agents: List[Agent], context: str, conversation: Optional[RenderedConversation] = None) -> List[AgentTurn]:
+        if not agents:
+            return []
+        messages = self.build_messages(game, agents, context, conversation)
+        max_tokens = min(self.max_tokens_per_agent * len(agents), self.max_tokens_cap)
+        response = await self.llm_client.generate_response(messages, max_tokens=max_tokens, temperature=0.7)
+        return self.split_turns(response, agents, game.step_number, game.game_id)
@@ -0,0 +1,63 @@
+from string import Formatter
+from typing import List, Optional, Tuple
+
+class PromptTemplate:
+    """Prompt text with `{slot}` placeholders, parsed once into static chunks and slots.
+
+    `partial(...)` fills some slots and returns a new template with the static
+    text around them merged, so segments that only depend on the language, the
+    game or the agent are rendered once and each step only joins the remaining
+    dynamic slots. Literal braces are written `{{` and `}}`, as with `str.format`.
+    """
+
+    __slots__ = ("_parts",)
+
+    def __init__(self, text: str = "", _parts: Optional[List[Tuple[str, Optional[str]]]] = None):
+        if _parts is None:
+            _parts = []
+            for literal, slot, format_spec, conversion in Formatter().parse(text):
+                if slot is not None and (not slot.isidentifier() or format_spec or conversion):
+                    raise ValueError(f"Unsupported prompt slot {{{slot}}}: only plain names are allowed")
+                _parts.append((literal, slot))
+        self._parts = self._merge(_parts)
+
+    @staticmethod
+    def _merge(parts: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, Optional[str]]]:
+        merged: List[Tuple[str, Optional[str]]] = []
+        pending = ""
+        for literal, slot in parts:
+            pending += literal
+            if slot is not None:
+                merged.append((pending, slot))
+                pending = ""
+        if pending or not merged:
+            merged.append((pending, None))
+        return merged
+
+    @property
+    def slots(self) -> List[str]:
+        return [slot for _, slot in self._parts if slot is not None]
+
+    def partial(self, **values: str) -> "PromptTemplate":
+        """Fill the given slots, keeping the others for later"""
+        parts = []
+        for literal, slot in self._parts:
+            if slot in values:
+                parts.append((literal + str(values[slot]), None))
+            else:
+                parts.append((literal, slot))
+        return PromptTemplate(_parts=parts)
+
+    def render(self, **values: str) -> str:
+        """Fill every remaining slot; raises KeyError for a missing one"""
+        if len(self._parts) == 1 and self._parts[0][1] is None:
+            return self._parts[0][0]
+        chunks = []
+        for literal, slot in self._parts:
+            chunks.append(literal)
+            if slot is not None:
+                chunks.append(str(values[slot]))
+        return "".join(chunks)
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate(slots={self.slots!r})"
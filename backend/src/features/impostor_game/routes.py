@@ -1,15 +1,73 @@
-from fastapi import APIRouter, HTTPException
-from .service import ImpostorGameService
-from .schema import InitGameResponse, StepResponse, GameStateResponse
+import asyncio
+import contextlib
+import json
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+from starlette.requests import HTTPConnection
+from src.core.admission import Overloaded
+from src.core.compression import choose_encoding
+from src.core.fair_queue import PRIORITY_CLASSES
+from src.core.log import logging_stats
+from src.core.loop_monitor import loop_monitor
+from src.core.responses import ModelResponse
+from src.core.tts_service import tts_service
+from src.core.usage import usage_meter
+from .service import ImpostorGameService, StaleStep, StepCancelled, StepInProgress, STEP_ENGINES
+from .state_store import StateConflict
+from .schema import InitGameResponse, StepResponse, GameStateResponse, ForkGameResponse, BulkStepRequest, BulkStepResponse
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/impostor-game", tags=["Impostor Game"])
 
-game_service = ImpostorGameService()
+def get_game_service(connection: HTTPConnection) -> ImpostorGameService:
+    """The app's game service, created with the app's settings on first use (or at startup, see src.main)"""
+    state = connection.app.state
+    service = getattr(state, "game_service", None)
+    if service is None:
+        service = state.game_service = ImpostorGameService(getattr(state, "settings", None))
+    return service
+
+# How often a running step checks whether its client is still connected (seconds)
+DISCONNECT_POLL_INTERVAL = 0.25
+
+async def _run_step_while_connected(game_service: ImpostorGameService, request: Request, game_id: str,
+                                    idempotency_key: Optional[str] = None, step_number: Optional[int] = None):
+    """Run a step, cancelling its in-flight LLM/TTS work if the client disconnects"""
+    step = asyncio.ensure_future(game_service.run_step(game_id, idempotency_key, step_number))
+    try:
+        while True:
+            done, _ = await asyncio.wait({step}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return step.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling step", extra={"game_id": game_id})
+                game_service.cancel_step(game_id)
+    except asyncio.CancelledError:
+        step.cancel()
+        raise
+
+def _admit(game_service: ImpostorGameService, admit, request: Request) -> None:
+    """Run an admission check for the request's client, refusing it fast (429/503 with Retry-After) when overloaded"""
+    try:
+        admit(game_service.admission.client_of(request.scope))
+    except Overloaded as e:
+        logger.info("Request refused: %s", e.reason, extra={"path": request.url.path})
+        detail = "Trop de requêtes pour ce client" if e.status_code == 429 else "Serveur surchargé, réessayez plus tard"
+        raise HTTPException(status_code=e.status_code, detail=detail, headers=e.headers)
 
 @router.post("/init", response_model=InitGameResponse)
-async def init_game(num_players: int = 4, max_steps: int = 30):
+async def init_game(request: Request, num_players: int = 4, max_steps: int = 30, engine: str = "fanout", priority: str = "interactive",
+                    game_service: ImpostorGameService = Depends(get_game_service)):
     """
-    Initialise un nouveau jeu de l'imposteur avec le nombre spécifié d'agents IA.
+    Initialise un nouveau jeu de l'imposteur. Les agents IA viennent du scénario
+    (data/game-master.json, 4 agents): `num_players` est validé mais pas encore utilisé.
+    `engine` choisit le moteur d'étape: "fanout" (un appel LLM par agent) ou
+    "joint" (un seul appel LLM pour tous les agents avant la réunion).
+    `priority` classe les appels LLM/TTS du jeu: "interactive" (parties en
+    direct) ou "batch" (évaluations, servies avec la capacité restante).
     """
     if num_players < 3 or num_players > 8:
         raise HTTPException(status_code=400, detail="Le nombre de joueurs doit être entre 3 et 8")
@@ -17,43 +75,279 @@ async def init_game(num_players: int = 4, max_steps: int = 30):
     if max_steps < 5 or max_steps > 100:
         raise HTTPException(status_code=400, detail="Le nombre maximum d'étapes doit être entre 5 et 100")
     
-    return game_service.create_game(num_players, max_steps)
+    if engine not in STEP_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Moteur inconnu: {engine}. Valeurs possibles: {', '.join(STEP_ENGINES)}")
+    
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Priorité inconnue: {priority}. Valeurs possibles: {', '.join(PRIORITY_CLASSES)}")
+    
+    _admit(game_service, game_service.admit_game, request)
+    result = game_service.create_game(num_players, max_steps, engine, priority)
+    await game_service.publish_game(result.game_id)
+    return result
 
 @router.post("/step/{game_id}", response_model=StepResponse)
-async def game_step(game_id: str):
+async def game_step(game_id: str, request: Request, step_number: Optional[int] = None,
+                    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+                    game_service: ImpostorGameService = Depends(get_game_service)):
     """
     Fait progresser le jeu d'une étape.
     Alterne entre phases de discussion et de vote.
+    L'étape est annulée (sans modifier le jeu) si le client se déconnecte.
+    Avec un en-tête `Idempotency-Key` ou `step_number` (l'étape à jouer), la
+    requête peut être réessayée sans risque: une étape déjà jouée renvoie la
+    réponse enregistrée, et une étape obsolète est refusée (409) sans rien jouer.
     """
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key doit faire entre 1 et 255 caractères")
+    replay = game_service.step_cache.get(game_id, idempotency_key, step_number)
+    if replay is not None:
+        return ModelResponse(replay, headers={"Idempotent-Replayed": "true"})
+    _admit(game_service, game_service.admit_step, request)
     try:
-        result = await game_service.step_game(game_id)
+        result = await _run_step_while_connected(game_service, request, game_id, idempotency_key, step_number)
         
         if not result:
             raise HTTPException(status_code=404, detail="Jeu non trouvé")
         
-        return result
+        return ModelResponse(result)
+    except HTTPException:
+        raise
+    except StaleStep as e:
+        raise HTTPException(status_code=409, detail=f"Étape {e.step_number} obsolète: le jeu est à l'étape {e.current_step}")
+    except StepCancelled:
+        raise HTTPException(status_code=409, detail="Étape annulée avant d'être terminée")
+    except StepInProgress:
+        raise HTTPException(status_code=409, detail="Une étape est déjà en cours pour ce jeu")
+    except StateConflict:
+        raise HTTPException(status_code=409, detail="Le jeu a été modifié pendant l'étape, réessayez")
     except Exception as e:
-        print(f"Error in game_step: {e}")
+        logger.exception("Error in game_step", extra={"game_id": game_id})
         raise HTTPException(status_code=500, detail=f"Erreur lors du traitement de l'étape: {str(e)}")
+    finally:
+        game_service.release_step()
 
-@router.get("/game/{game_id}", response_model=GameStateResponse)
-async def get_game_state(game_id: str):
+# Most games a single bulk request may advance
+MAX_BULK_GAMES = 100
+
+@router.post("/bulk-step", response_model=BulkStepResponse)
+async def bulk_step(body: BulkStepRequest, request: Request, stream: bool = False,
+                    game_service: ImpostorGameService = Depends(get_game_service)):
     """
-    Récupère l'état actuel d'un jeu.
+    Fait progresser plusieurs jeux (ou un jeu de plusieurs étapes) en une requête.
+    Les jeux avancent en parallèle, chacun dans l'ordre de ses étapes, et chaque
+    étape est résumée (orateur, votes, élimination) sans l'historique complet.
+    `until="game_over"` joue chaque jeu jusqu'à sa fin. Avec `stream=true`, les
+    résumés sont envoyés en NDJSON au fil des étapes.
     """
-    result = game_service.get_game_state_response(game_id)
+    if not 0 < len(body.game_ids) <= MAX_BULK_GAMES:
+        raise HTTPException(status_code=400, detail=f"Entre 1 et {MAX_BULK_GAMES} jeux par requête")
+    if len(set(body.game_ids)) != len(body.game_ids):
+        raise HTTPException(status_code=400, detail="Un jeu ne peut apparaître qu'une fois par requête")
+    if body.until not in (None, "game_over"):
+        raise HTTPException(status_code=400, detail=f"Valeur de until inconnue: {body.until}. Valeur possible: game_over")
+    if body.until is None and not 1 <= body.steps <= 100:
+        raise HTTPException(status_code=400, detail="Le nombre d'étapes doit être entre 1 et 100")
+    
+    _admit(game_service, game_service.admit_bulk_step, request)
+    summaries = game_service.step_games(body.game_ids, body.steps, body.until == "game_over")
+    if stream:
+        async def stream_summaries():
+            async with contextlib.aclosing(summaries):
+                async for summary in summaries:
+                    yield summary.model_dump_json(exclude_defaults=True) + "\n"
+        
+        return StreamingResponse(stream_summaries(), media_type="application/x-ndjson")
+    
+    async def collect():
+        async with contextlib.aclosing(summaries):
+            return [summary async for summary in summaries]
+    
+    # As for a single step: a client that goes away stops paying for the remaining steps
+    steps = asyncio.ensure_future(collect())
+    try:
+        while True:
+            done, _ = await asyncio.wait({steps}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                break
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling bulk step", extra={"games": len(body.game_ids)})
+                steps.cancel()
+    except asyncio.CancelledError:
+        steps.cancel()
+        raise
+    if steps.cancelled():
+        raise HTTPException(status_code=409, detail="Étapes annulées avant d'être terminées")
+    results = steps.result()
+    errors = sum(1 for summary in results if summary.error is not None)
+    return BulkStepResponse(summaries=results, steps_run=len(results) - errors, errors=errors)
+
+@router.post("/fork/{game_id}", response_model=ForkGameResponse)
+async def fork_game(game_id: str, request: Request, at_step: Optional[int] = None, game_service: ImpostorGameService = Depends(get_game_service)):
+    """
+    Crée une branche d'un jeu au début de l'étape `at_step` (par défaut l'étape courante).
+    La branche partage l'historique du jeu parent et ne diverge qu'à ses nouvelles étapes.
+    """
+    _admit(game_service, game_service.admit_game, request)
+    await game_service.sync_game(game_id)
+    try:
+        result = game_service.fork_game(game_id, at_step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not result:
         raise HTTPException(status_code=404, detail="Jeu non trouvé")
     
+    await game_service.publish_game(result.game_id)
     return result
 
+@router.post("/cancel/{game_id}")
+async def cancel_step(game_id: str, game_service: ImpostorGameService = Depends(get_game_service)):
+    """
+    Annule l'étape en cours d'un jeu (appels LLM et TTS en vol).
+    Le jeu reste à sa dernière étape terminée.
+    """
+    game = await game_service.sync_game(game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Jeu non trouvé")
+    
+    step = game_service.inflight_steps.get(game_id)
+    cancelled = game_service.cancel_step(game_id)
+    if cancelled:
+        # Wait for the task to unwind so the reported stats include this step
+        await asyncio.wait({step})
+    
+    return {
+        "game_id": game_id,
+        "cancelled": cancelled,
+        "step_number": game.step_number,
+        "stats": game_service.cancellation_stats
+    }
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`"""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip() == "*" or tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+@router.get("/game/{game_id}", response_model=GameStateResponse)
+async def get_game_state(game_id: str, request: Request, game_service: ImpostorGameService = Depends(get_game_service)):
+    """
+    Récupère l'état actuel d'un jeu.
+    La réponse porte un ETag (la version du jeu): avec `If-None-Match`, un jeu
+    inchangé répond 304 sans corps. Le corps est encodé (et compressé en gzip
+    ou brotli selon `Accept-Encoding`) une seule fois par version.
+    """
+    game = await game_service.sync_game(game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Jeu non trouvé")
+    
+    etag = f'W/"{game.version}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    body, encoding = game_service.encoded_state(game_id, choose_encoding(request.headers.get("accept-encoding")))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+# Longest pause between two replayed events, whatever the original pace (seconds)
+MAX_REPLAY_DELAY = 5.0
+
+@router.get("/replay/{game_id}")
+async def replay_game(game_id: str, speed: float = 1.0, game_service: ImpostorGameService = Depends(get_game_service)):
+    """
+    Rejoue le journal d'événements d'un jeu (NDJSON, un événement par ligne).
+    Un fork rejoue d'abord les événements de son parent jusqu'au point de fork.
+    `speed` multiplie la vitesse d'origine (0 = sans pause). Aucun appel LLM/TTS.
+    """
+    if speed < 0 or speed > 100:
+        raise HTTPException(status_code=400, detail="La vitesse doit être entre 0 et 100")
+    
+    # Reading the log (and a fork's parent logs) blocks on the disk: keep it off the event loop
+    events = await asyncio.to_thread(game_service.event_log.replay_events, game_id)
+    if not events:
+        raise HTTPException(status_code=404, detail="Journal du jeu non trouvé")
+    
+    async def stream_events():
+        previous_t = None
+        for event in events:
+            if speed > 0 and previous_t is not None:
+                await asyncio.sleep(min(max(0.0, event["t"] - previous_t) / speed, MAX_REPLAY_DELAY))
+            previous_t = event["t"]
+            yield json.dumps(event, separators=(",", ":"), ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(stream_events(), media_type="application/x-ndjson")
+
+# Comment line sent to idle SSE spectators so proxies keep the connection open (seconds)
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+@router.get("/watch/{game_id}")
+async def watch_game(game_id: str, game_service: ImpostorGameService = Depends(get_game_service)):
+    """
+    Suit un jeu en direct (Server-Sent Events): un instantané de l'état, puis
+    chaque événement (étape, fin de partie) dès qu'il est enregistré. Un
+    spectateur trop lent reçoit un nouvel instantané au lieu des événements manqués.
+    Aussi disponible en WebSocket sur la même URL.
+    """
+    if not await game_service.sync_game(game_id):
+        raise HTTPException(status_code=404, detail="Jeu non trouvé")
+    
+    async def stream_frames():
+        subscriber = game_service.spectators.subscribe(game_id)
+        try:
+            while True:
+                try:
+                    frame = await subscriber.next(SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if frame is None:
+                    return
+                yield frame.sse
+        finally:
+            game_service.spectators.unsubscribe(subscriber)
+    
+    return StreamingResponse(stream_frames(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.websocket("/watch/{game_id}")
+async def watch_game_websocket(websocket: WebSocket, game_id: str, game_service: ImpostorGameService = Depends(get_game_service)):
+    """Suit un jeu en direct par WebSocket: mêmes messages JSON que le flux SSE"""
+    if not await game_service.sync_game(game_id):
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    subscriber = game_service.spectators.subscribe(game_id)
+    
+    async def forward_frames():
+        try:
+            while (frame := await subscriber.next()) is not None:
+                await websocket.send_text(frame.data)
+            # Dropped as a slow consumer: the client may reconnect for a fresh snapshot
+            await websocket.close(code=1013)
+        except WebSocketDisconnect:
+            pass
+    
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    tasks = [asyncio.ensure_future(forward_frames()), asyncio.ensure_future(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        game_service.spectators.unsubscribe(subscriber)
+
 @router.get("/debug/{game_id}")
-async def debug_game(game_id: str):
+async def debug_game(game_id: str, game_service: ImpostorGameService = Depends(get_game_service)):
     """
     Debug endpoint to check game state
     """
-    game = game_service.get_game(game_id)
+    game = await game_service.sync_game(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
@@ -69,6 +363,28 @@ async def debug_game(game_id: str):
         "total_agents": len(game.agents),
         "votes": game.current_votes,
         "winner": game.winner,
+        "engine": game.engine,
+        "priority": game.priority,
+        "forked_from": game.forked_from,
+        "counters": game.counters,
+        "llm": game_service.llm_client.stats,
+        "llm_breaker": game_service.llm_client.breaker.snapshot(),
+        "llm_scheduler": game_service.llm_client.scheduler.snapshot(),
+        "tts_scheduler": tts_service.scheduler.snapshot(),
+        "cancellation": game_service.cancellation_stats,
+        "bulk": game_service.bulk_stats,
+        "version": game.version,
+        "state_cache": {**game_service.state_bodies.stats, "cached": len(game_service.state_bodies)},
+        "spectators": {**game_service.spectators.stats, "watching": game_service.spectators.subscriber_count(game_id)},
+        "admission": {**game_service.admission.stats, "active_games": game_service.active_game_count(),
+                      "steps_in_flight": game_service.admission.steps_reserved, "llm_inflight": game_service.llm_client.inflight},
+        "idempotency": {**game_service.idempotency_stats, **game_service.step_cache.stats, "cached": len(game_service.step_cache)},
+        "state_store": game_service.state_store.stats if game_service.state_store else None,
+        "logging": logging_stats(),
+        # Stacks only go to admins, on /debug/loop
+        "loop_stalls": [{key: value for key, value in stall.items() if key != "stack"} for stall in loop_monitor.stalls_for(game_id)],
+        "usage": usage_meter.game_usage(game_id).as_dict(),
+        "budget": usage_meter.budget(game_id),
         "can_continue": game.status == "active" and game.step_number < game.max_steps
     }
 
@@ -1,6 +1,8 @@
+import sys
 from typing import List, Dict, Optional, TYPE_CHECKING
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+from .history import History
 
 if TYPE_CHECKING:
     from typing import ForwardRef
@@ -23,6 +25,22 @@ class MeetingTrigger(str, Enum):
     DEAD_BODY = "dead_body"
     EMERGENCY_BUTTON = "emergency_button"
 
+class AgentMemory(BaseModel):
+    step_number: int
+    location: str  # Where they were
+    action: str  # What they were doing
+    met: List[str] = []  # Who they met (agent colors/names)
+
+    @field_validator("location")
+    @classmethod
+    def _intern_location(cls, value: str) -> str:
+        return sys.intern(value)
+
+    @field_validator("met")
+    @classmethod
+    def _intern_met(cls, value: List[str]) -> List[str]:
+        return [sys.intern(agent_id) for agent_id in value]
+
 class Agent(BaseModel):
     id: str  # Use color as ID: "red", "blue", "green", "yellow"
     name: str
@@ -30,7 +48,7 @@ class Agent(BaseModel):
     is_impostor: bool = False
     is_alive: bool = True
     votes_received: int = 0
-    memory_history: List['AgentMemory'] = []  # Agent's memory across all steps
+    memory_history: History[AgentMemory] = Field(default_factory=History)  # Agent's memory across all steps (fork-shared)
     location: str = ""  # Current location from game-master.json
     action: str = ""  # Current action from game-master.json
     met: List[str] = []  # Agents met in current step
@@ -42,12 +60,12 @@ class AgentAction(BaseModel):
     target_agent_id: Optional[str] = None  # Target agent color
     audio_base64: Optional[str] = None  # Optional - TTS audio data as base64
 
-class AgentMemory(BaseModel):
-    step_number: int
-    location: str  # Where they were
-    action: str  # What they were doing
-    met: List[str] = []  # Who they met (agent colors/names)
-    
+    @field_validator("agent_id", "target_agent_id")
+    @classmethod
+    def _intern_agent_id(cls, value: Optional[str]) -> Optional[str]:
+        # A handful of ids repeated across thousands of actions: share one string each
+        return sys.intern(value) if value is not None else None
+
 class AgentTurn(BaseModel):
     agent_id: str  # Agent color: "red", "blue", "green", "yellow"
     think: str  # Always required - agent's private thoughts
@@ -56,6 +74,21 @@ class AgentTurn(BaseModel):
     impostor_hypothesis: Optional[str] = None  # Agent's current suspicion (agent color)
     memory_update: Optional['AgentMemory'] = None  # Memory from this step
     audio_base64: Optional[str] = None  # Optional - TTS audio data as base64
+    idle: bool = False  # True when the agent was not activated this step (last hypothesis carried forward)
+    degraded: bool = False  # True when the agent's LLM call missed the step deadline
+
+class StepCheckpoint(BaseModel):
+    """History lengths and small per-step fields, enough to fork a game at the start of a step"""
+    public_len: int
+    thought_lens: Dict[str, int] = {}
+    memory_lens: Dict[str, int] = {}
+    alive: Dict[str, bool] = {}
+    current_votes: Dict[str, int] = {}
+    last_active_step: Dict[str, int] = {}
+    impostor_hypotheses: Dict[str, str] = {}
+    status: GameStatus
+    phase: GamePhase
+    winner: Optional[str] = None
 
 class GameState(BaseModel):
     game_id: str
@@ -64,14 +97,28 @@ class GameState(BaseModel):
     step_number: int
     max_steps: int = 30
     agents: List[Agent]
-    public_action_history: List[AgentAction]  # Only SPEAK and VOTE actions
-    private_thoughts: Dict[str, List[AgentAction]] = {}  # THINK actions per agent (by color)
+    public_action_history: History[AgentAction]  # Only SPEAK and VOTE actions
+    private_thoughts: Dict[str, History[AgentAction]] = {}  # THINK actions per agent (by color)
     current_votes: Dict[str, int] = {}  # votes for each agent color
     winner: Optional[str] = None
     impostor_id: str  # impostor agent color
     meeting_trigger: MeetingTrigger
     reporter_id: str  # reporter agent color
     meeting_reason: str
+    engine: str = "fanout"  # Step engine: "fanout" (one call per agent) or "joint" (one call per step)
+    priority: str = "interactive"  # Priority class of the game's LLM/TTS calls: "interactive" or "batch"
+    last_active_step: Dict[str, int] = {}  # Last step each agent was activated (by color)
+    impostor_hypotheses: Dict[str, str] = {}  # Latest impostor hypothesis per agent (by color)
+    counters: Dict[str, int] = {}  # Operational counters (deadline misses, ...)
+    checkpoints: History[StepCheckpoint] = Field(default_factory=History)  # checkpoints[k - 1]: state at the start of step k
+    forked_from: Optional[str] = None  # Parent game id when this game is a fork
+    version: int = 0  # Bumped by every committed state transition (ETag of the game state)
+
+class ForkGameResponse(BaseModel):
+    game_id: str
+    parent_game_id: str
+    step_number: int
+    message: str
 
 class InitGameResponse(BaseModel):
     game_id: str
@@ -88,12 +135,35 @@ class StepResponse(BaseModel):
     step_number: int
     max_steps: int
     turns: List[AgentTurn]  # Each agent's turn with think/speak/vote
-    conversation_history: List[AgentAction]  # Public conversation history (SPEAK and VOTE actions)
+    conversation_history: History[AgentAction]  # Public conversation history (SPEAK and VOTE actions)
     eliminated: Optional[str] = None
     winner: Optional[str] = None
     game_over: bool = False
     message: str
 
+class BulkStepRequest(BaseModel):
+    game_ids: List[str]  # Games to advance, concurrently
+    steps: int = 1  # Steps per game
+    until: Optional[str] = None  # "game_over": step each game until it ends (ignores `steps`)
+
+class StepSummary(BaseModel):
+    game_id: str
+    step_number: Optional[int] = None  # The step that just completed
+    phase: Optional[GamePhase] = None
+    speaker: Optional[str] = None  # Agent color of the selected speaker
+    speech: Optional[str] = None
+    votes: Dict[str, str] = {}  # Voter color -> target color
+    degraded: int = 0  # Turns that fell back to a degraded turn
+    eliminated: Optional[str] = None
+    winner: Optional[str] = None
+    game_over: bool = False
+    error: Optional[str] = None  # Why the game stopped early: not_found, step_in_progress, cancelled, conflict, failed
+
+class BulkStepResponse(BaseModel):
+    summaries: List[StepSummary]  # In completion order (steps of one game are in order)
+    steps_run: int
+    errors: int
+
 class GameStateResponse(BaseModel):
     game_id: str
     status: GameStatus
@@ -101,7 +171,7 @@ class GameStateResponse(BaseModel):
     step_number: int
     max_steps: int
     agents: List[Agent]
-    public_action_history: List[AgentAction]  # Only public actions (SPEAK/VOTE)
+    public_action_history: History[AgentAction]  # Only public actions (SPEAK/VOTE)
     current_votes: Dict[str, int]
     winner: Optional[str] = None
     alive_count: int
@@ -3,21 +3,144 @@ import uuid
 import json
 import os
 import asyncio
+import logging
+import time
+import pydantic_core
 
-from typing import List, Dict, Optional
-from src.core.llm_client import LLMClient
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from src.core.admission import AdmissionController
+from src.core.fair_queue import INTERACTIVE, bind_priority
+from src.core.llm_client import LLMClient, LLMError
+from src.core.log import bind_game
+from src.core.settings import Settings
 from src.core.tts_service import tts_service
+from src.core.usage import usage_meter
 from .schema import (
     Agent, GameState, GameStatus, GamePhase, ActionType, AgentAction, AgentTurn, MeetingTrigger,
-    InitGameResponse, StepResponse, GameStateResponse, AgentMemory
+    InitGameResponse, StepResponse, GameStateResponse, AgentMemory, ForkGameResponse, StepSummary
 )
 from .agents import Crewmate, Impostor
+from .conversation import RenderedConversation
+from .joint import JointTurnGenerator
+from .state_store import RedisGameStore, StateConflict
+from .spectators import SpectatorHub
+from .state_cache import EncodedStateCache
+from .step_cache import StepResponseCache
+from .activation import ActivationScheduler, carry_forward_turn
+from .event_log import (
+    GameEventLog, apply_step, apply_game_over, record_checkpoint, fork_state,
+    game_created_event, step_event, game_over_event, game_forked_event
+)
+
+logger = logging.getLogger(__name__)
+
+# "fanout": one choose_action call per alive agent; "joint": one structured call for all agents (pre-meeting steps)
+STEP_ENGINES = ("fanout", "joint")
+
+class StepCancelled(Exception):
+    """Raised when an in-flight step is cancelled before it committed"""
+
+class StepInProgress(Exception):
+    """Raised when another worker holds the game's step lease, or a retried step is still running"""
+
+class StaleStep(Exception):
+    """Raised when a step request names a step the game is no longer (or not yet) at"""
+
+    def __init__(self, game_id: str, step_number: int, current_step: int):
+        super().__init__(f"Game {game_id} is at step {current_step}, not {step_number}")
+        self.step_number = step_number
+        self.current_step = current_step
+
+def step_summary(result: StepResponse) -> StepSummary:
+    """The compact form of a step response: who spoke and voted, without thoughts or the conversation history"""
+    votes = {turn.agent_id: turn.vote for turn in result.turns if turn.vote is not None}
+    speaker = speech = None
+    if any(turn.speak is not None for turn in result.turns):
+        # The step appended its speech, then its votes, to the public history
+        action = result.conversation_history[-1 - len(votes)]
+        speaker, speech = action.agent_id, action.content
+    return StepSummary(
+        game_id=result.game_id,
+        step_number=result.step_number,
+        phase=result.phase,
+        speaker=speaker,
+        speech=speech,
+        votes=votes,
+        degraded=sum(1 for turn in result.turns if turn.degraded),
+        eliminated=result.eliminated,
+        winner=result.winner,
+        game_over=result.game_over,
+    )
+
+# Error codes of bulk step summaries, by the exception that stopped the game
+BULK_STEP_ERRORS = ((StepInProgress, "step_in_progress"), (StepCancelled, "cancelled"), (StateConflict, "conflict"))
 
 class ImpostorGameService:
-    def __init__(self):
+    def __init__(self, settings: Optional[Settings] = None):
+        settings = settings or Settings.from_env()
         self.games: Dict[str, GameState] = {}
-        self.llm_client = LLMClient()
-        self.game_master_data = self._load_game_master_data()
+        # Agent objects per game, reused across steps (see _create_agent)
+        self.game_agents: Dict[str, Dict[str, Crewmate]] = {}
+        # Rendered public conversation window per game, shared by every agent's prompt
+        self.conversations: Dict[str, RenderedConversation] = {}
+        self.llm_client = LLMClient(settings)
+        self._game_master_data: Optional[List[Dict]] = None
+        # Shared game states for multi-worker deployments (IMPOSTOR_STATE_URL, None = this process only)
+        self.state_store = RedisGameStore.from_settings(settings)
+        self.game_versions: Dict[str, int] = {}
+        self.step_lease_seconds = settings.step_lease_s
+        # Events of shared steps not yet committed to the store, per game: (version, event)
+        self.pending_events: Dict[str, List[Tuple[int, Dict]]] = {}
+        self.event_log = GameEventLog(settings.event_log_dir, retention_s=settings.event_log_retention_s)
+        self.joint_generator = JointTurnGenerator(self.llm_client, self._create_agent)
+        # Bounds agent LLM calls per step regardless of lobby size (0 = every alive agent)
+        self.activation_scheduler = ActivationScheduler(max_active=settings.max_active_agents)
+        # Agents still waiting on the LLM after this many seconds get a degraded turn (0 = no deadline)
+        self.step_deadline = settings.step_deadline_s or None
+        # In-flight step tasks and their LLM/TTS progress, so abandoned steps can be cancelled
+        self.inflight_steps: Dict[str, asyncio.Task] = {}
+        self.step_progress: Dict[str, Dict[str, int]] = {}
+        # Responses of recent steps, replayed to clients retrying with the same idempotency key or step number
+        self.step_cache = StepResponseCache(settings.step_cache_size)
+        self.idempotency_stats = {"stale_rejected": 0, "duplicates_in_flight": 0}
+        # Steps run at once by bulk requests (all of them together), so one batch cannot starve the others
+        self.bulk_slots = asyncio.Semaphore(max(1, settings.bulk_concurrency))
+        self.bulk_stats = {"requests": 0, "steps": 0, "errors": 0}
+        # Encoded (and compressed) state bodies of each game's current version, for polling clients
+        self.state_bodies = EncodedStateCache(settings.state_cache_size)
+        # Live events of watched games, encoded once per event for all their spectators
+        self.spectators = SpectatorHub(self._encode_state, self._game_version, settings.spectator_buffer, settings.spectator_slow_policy)
+        # Caps on resident games, concurrent steps and LLM calls, and per-client rate limits
+        self.admission = AdmissionController.from_settings(settings)
+        self.game_idle_seconds = settings.game_idle_s
+        self.last_active: Dict[str, float] = {}  # game id -> when it was created or last stepped here
+        self.cancellation_stats = {
+            "cancelled_steps": 0,
+            "llm_calls_wasted": 0,
+            "llm_calls_saved": 0,
+            "tts_calls_wasted": 0,
+            "tts_calls_saved": 0,
+        }
+    
+    @property
+    def game_master_data(self) -> List[Dict]:
+        """Scenario data, read on first use"""
+        if self._game_master_data is None:
+            self._game_master_data = self._load_game_master_data()
+        return self._game_master_data
+    
+    async def warmup(self) -> None:
+        """Do the first-use work now: read the scenario, create the LLM client, open a state store connection"""
+        self.game_master_data
+        if self.llm_client.api_key:
+            self.llm_client.client
+        if self.state_store is not None:
+            await self.state_store.ping()
+    
+    async def close(self) -> None:
+        await asyncio.to_thread(self.event_log.close)
+        if self.state_store is not None:
+            await self.state_store.close()
     
     def _load_game_master_data(self) -> List[Dict]:
         """Load game master data from JSON file"""
@@ -28,32 +151,40 @@ class ImpostorGameService:
             backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))
             game_master_path = os.path.join(backend_dir, "data", "game-master.json")
             
-            print(f"Attempting to load game-master.json from: {game_master_path}")
-            print(f"File exists: {os.path.exists(game_master_path)}")
+            logger.debug("Loading game-master.json from %s", game_master_path)
             
             with open(game_master_path, 'r') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"Error loading game-master.json: {e}")
-            print(f"Current file: {current_file}")
-            print(f"Backend dir: {backend_dir}")
-            print(f"Game master path: {game_master_path}")
+            logger.error("Error loading game-master.json from %s: %s", game_master_path, e)
             return []
     
-    def _create_agent(self, agent_data: Agent):
-        """Create appropriate agent type based on role"""
+    def _create_agent(self, agent_data: Agent, game_id: Optional[str] = None):
+        """Create appropriate agent type based on role.
+
+        With a game id the agent is kept and reused for every step of that game,
+        so its static prompt segments are rendered once.
+        """
+        if game_id is not None:
+            agent = self.game_agents.get(game_id, {}).get(agent_data.id)
+            if agent is not None and agent.data is agent_data and agent.llm_client is self.llm_client:
+                return agent
         if agent_data.is_impostor:
-            return Impostor(agent_data, self.llm_client)
+            agent = Impostor(agent_data, self.llm_client)
         else:
-            return Crewmate(agent_data, self.llm_client)
+            agent = Crewmate(agent_data, self.llm_client)
+        if game_id is not None:
+            self.game_agents.setdefault(game_id, {})[agent_data.id] = agent
+        return agent
     
-    def create_game(self, num_players: int = 4, max_steps: int = 30) -> InitGameResponse:
+    def create_game(self, num_players: int = 4, max_steps: int = 30, engine: str = "fanout", priority: str = INTERACTIVE) -> InitGameResponse:
         game_id = str(uuid.uuid4())
         
         if not self.game_master_data:
             raise FileNotFoundError("game-master.json is required but not available. Cannot create game without scenario data.")
         
-        # Create agents based on game-master.json initial state
+        # Create agents based on game-master.json initial state (its roster is
+        # fixed, `num_players` is only validated by the route and not used here)
         first_step = self.game_master_data[0]
         agents = []
         impostor_id = None
@@ -102,10 +233,15 @@ class ImpostorGameService:
             impostor_id=impostor_id if impostor_id is not None else "yellow",
             meeting_trigger=meeting_trigger,
             reporter_id=reporter_id,
-            meeting_reason=meeting_reason
+            meeting_reason=meeting_reason,
+            engine=engine,
+            priority=priority
         )
         
+        record_checkpoint(game_state)
         self.games[game_id] = game_state
+        self.last_active[game_id] = time.monotonic()
+        self._record(game_state, game_created_event(game_state))
         
         return InitGameResponse(
             game_id=game_id,
@@ -118,8 +254,128 @@ class ImpostorGameService:
         )
     
     def get_game(self, game_id: str) -> Optional[GameState]:
+        """This worker's copy of a game (see `sync_game` for games not loaded yet)"""
         return self.games.get(game_id)
     
+    async def _load_logged_game(self, game_id: str) -> Optional[GameState]:
+        """A game from a previous run, rebuilt from its event log without any LLM call"""
+        game = self.games.get(game_id)
+        if game is None and self.event_log.exists(game_id):
+            # Reading and replaying the log blocks on the disk: keep it off the event loop
+            game = await asyncio.to_thread(self.event_log.rebuild, game_id)
+            if game is not None:
+                game = self.games.setdefault(game_id, game)
+        return game
+    
+    def fork_game(self, game_id: str, at_step: Optional[int] = None) -> Optional[ForkGameResponse]:
+        """Branch a game at the start of step `at_step` (default: its current step).
+        
+        The fork shares every history with its parent (copy-on-write), so forking
+        is O(1) in the game length and hundreds of branches can run side by side.
+        Raises ValueError if the game has no checkpoint for `at_step`.
+        """
+        game = self.get_game(game_id)
+        if not game:
+            return None
+        
+        at_step = game.step_number if at_step is None else at_step
+        fork_id = str(uuid.uuid4())
+        fork = fork_state(game, fork_id, at_step)
+        self.games[fork_id] = fork
+        self.last_active[fork_id] = time.monotonic()
+        self._record(fork, game_forked_event(game_id, at_step))
+        
+        return ForkGameResponse(
+            game_id=fork_id,
+            parent_game_id=game_id,
+            step_number=at_step,
+            message=f"Game {game_id} forked at step {at_step}"
+        )
+    
+    async def sync_game(self, game_id: str) -> Optional[GameState]:
+        """Latest committed state of a game, fetched from the shared store when its version changed"""
+        if self.state_store is None:
+            return await self._load_logged_game(game_id)
+        loaded = await self.state_store.load(game_id, self.game_versions.get(game_id))
+        if loaded is None:
+            # Unknown to the store: a game from a previous run's event log, if any
+            game = await self._load_logged_game(game_id)
+            if game is not None:
+                await self.publish_game(game_id)
+            return game
+        game, version = loaded
+        if game is not None:
+            self.games[game_id] = game
+            self.game_versions[game_id] = version
+        return self.games.get(game_id)
+    
+    async def publish_game(self, game_id: str) -> None:
+        """Make a game created or forked by this worker visible to the other workers"""
+        if self.state_store is not None:
+            self.game_versions[game_id] = await self.state_store.create(self.games[game_id])
+    
+    def _forget_game(self, game_id: str) -> None:
+        """Drop this worker's copy of a game; the next request reloads the committed state"""
+        self.games.pop(game_id, None)
+        self.game_versions.pop(game_id, None)
+        self.game_agents.pop(game_id, None)
+        self.conversations.pop(game_id, None)
+    
+    def _record(self, game: GameState, event: Dict) -> None:
+        """Append a state transition (already applied to `game`) to the game's event log and send it to its spectators"""
+        pending = self.pending_events.get(game.game_id)
+        if pending is not None:
+            # A shared step: held until the store accepts the new state (see _run_shared_step)
+            pending.append((game.version, event))
+            return
+        self._emit(game.game_id, game.version, event)
+    
+    def _emit(self, game_id: str, version: int, event: Dict) -> None:
+        self.event_log.append(game_id, event, version)
+        self.spectators.publish(game_id, event, version)
+        if event["type"] == "game_over" or event.get("winner"):
+            usage_meter.forget_game(game_id)
+    
+    def encoded_state(self, game_id: str, encoding: Optional[str] = None) -> Optional[Tuple[bytes, Optional[str]]]:
+        """The game state response as JSON bytes (compressed with `encoding` if large enough), encoded once per game version"""
+        game = self.get_game(game_id)
+        if not game:
+            return None
+        return self.state_bodies.body(game_id, game.version, lambda: pydantic_core.to_json(self.get_game_state_response(game_id)), encoding)
+    
+    def _encode_state(self, game_id: str) -> Optional[Tuple[str, bool]]:
+        encoded = self.encoded_state(game_id)
+        if encoded is None:
+            return None
+        return encoded[0].decode(), self.get_game(game_id).status == GameStatus.FINISHED
+    
+    def _game_version(self, game_id: str) -> Optional[int]:
+        game = self.get_game(game_id)
+        return game.version if game else None
+    
+    def active_game_count(self) -> int:
+        """Games resident on this worker that can still fan out LLM calls: active, and created or stepped recently"""
+        cutoff = time.monotonic() - self.game_idle_seconds
+        for game_id in [game_id for game_id, at in self.last_active.items() if at < cutoff
+                        or getattr(self.games.get(game_id), "status", None) != GameStatus.ACTIVE]:
+            del self.last_active[game_id]
+        return len(self.last_active)
+    
+    def admit_game(self, client: str) -> None:
+        """Raise Overloaded if `client` may not create a game now"""
+        self.admission.admit_game(client, self.active_game_count() if self.admission.max_games else 0)
+    
+    def admit_step(self, client: str, reserve: bool = True) -> None:
+        """Raise Overloaded if `client` may not start a step now; otherwise (with `reserve`) hold a step slot until `release_step`"""
+        self.admission.admit_step(client, self.llm_client.inflight, reserve)
+    
+    def admit_bulk_step(self, client: str) -> None:
+        """Raise Overloaded if `client` may not start a bulk step now (its steps hold their own slots while they run)"""
+        self.admit_step(client, reserve=False)
+    
+    def release_step(self) -> None:
+        self.admission.release_step()
+    
     def get_game_state_response(self, game_id: str) -> Optional[GameStateResponse]:
         game = self.get_game(game_id)
         if not game:
@@ -129,20 +385,32 @@ class ImpostorGameService:
         # Convert current votes to string keys
         current_votes_str = {str(k): v for k, v in game.current_votes.items()}
         
-        return GameStateResponse(
+        # Game state is already validated: skip re-validation and hand out an O(1) history snapshot
+        return GameStateResponse.model_construct(
             game_id=game.game_id,
             status=game.status,
             phase=game.phase,
             step_number=game.step_number,
             max_steps=game.max_steps,
             agents=game.agents,
-            public_action_history=game.public_action_history,
+            public_action_history=game.public_action_history.fork(),
             current_votes=current_votes_str,
             winner=game.winner,
             alive_count=len(alive_agents),
             impostor_alive=any(a.is_impostor for a in alive_agents)
         )
     
+    def _conversation(self, game: GameState) -> RenderedConversation:
+        """The game's rendered conversation window, caught up with its public history"""
+        conversation = self.conversations.get(game.game_id)
+        if conversation is None:
+            conversation = self.conversations[game.game_id] = RenderedConversation()
+        return conversation.sync(game.public_action_history)
+    
+    def _tts_allowed(self, game_id: str) -> bool:
+        """Speech is synthesized when TTS is configured and the game is within its budget"""
+        return bool(tts_service.api_key) and usage_meter.allows_tts(game_id)
+    
     def _get_alive_agents(self, game: GameState) -> List[Agent]:
         return [agent for agent in game.agents if agent.is_alive]
     
@@ -193,16 +461,10 @@ Respond with ONLY the agent's name (e.g., "Red", "Blue", etc.) - no explanation
                 temperature=0.3
             )
             
-            print(f"DEBUG - Raw LLM response for speaker selection: '{response}'")
-            
-            # Check if response contains error
-            if "Erreur de génération" in response or "Error code" in response:
-                print(f"DEBUG - LLM returned error: {response}")
-                raise Exception(f"LLM error: {response}")
+            logger.debug("Raw LLM response for speaker selection: %r", response)
             
             # Find matching agent by name or ID
             chosen_name = response.strip().strip('"').strip()
-            print(f"DEBUG - Cleaned chosen name: '{chosen_name}'")
             
             for turn in candidate_turns:
                 agent = next((agent for agent in alive_agents if agent.id == turn.agent_id), None)
@@ -211,43 +473,130 @@ Respond with ONLY the agent's name (e.g., "Red", "Blue", etc.) - no explanation
                     if (chosen_name.lower() == agent.name.lower() or 
                         chosen_name.lower() == agent.id.lower() or
                         chosen_name.lower() == agent.color.lower()):
-                        print(f"DEBUG - Found match: {agent.name} (ID: {agent.id}, Color: {agent.color})")
                         return turn
             
             # Fallback to first candidate if name not found
-            available_agents = []
-            for turn in candidate_turns:
-                agent = next((agent for agent in alive_agents if agent.id == turn.agent_id), None)
-                if agent:
-                    available_agents.append(f"{agent.name}(id:{agent.id},color:{agent.color})")
-            print(f"DEBUG - LLM chose '{chosen_name}' but no match found. Available: {available_agents}")
             # Use step-based selection as fallback
             selected_index = (step_number - 1) % len(candidate_turns)
-            print(f"DEBUG - Using fallback selection: index {selected_index}")
+            logger.debug("LLM chose %r but no candidate matches, using fallback index %d", chosen_name, selected_index)
             return candidate_turns[selected_index]
             
         except Exception as e:
             # Fallback to round-robin selection if LLM fails
-            print(f"DEBUG - LLM speaker selection failed: {e}, using step-based selection")
+            logger.warning("LLM speaker selection failed: %s, using step-based selection", e)
             # Use step number to rotate through speakers
             selected_index = (step_number - 1) % len(candidate_turns)
             return candidate_turns[selected_index]
     
+    def _build_step_context(self, game: GameState, alive_agents: List[Agent]) -> str:
+        """Build the game context shared by every agent for the current step"""
+        if game.step_number < 25:  # Normal conversation phase
+            context_base = f"Step {game.step_number}/{game.max_steps}. You are doing tasks around the ship with {len(alive_agents)} crewmates."
+            if game.step_number == 1:
+                context = f"{context_base} You just started your shift. Share your thoughts about the tasks or your fellow crewmates."
+            elif game.step_number < 10:
+                context = f"{context_base} Continue doing your tasks. You can chat casually with others or share observations."
+            elif game.step_number < 20:
+                context = f"{context_base} You've been working for a while. Share any suspicions or observations about other crewmates."
+            else:
+                context = f"{context_base} Something feels off. Be more alert and share any concerns you might have."
+        else:  # Emergency meeting phase
+            context_base = f"EMERGENCY MEETING! {game.meeting_reason}. Step {game.step_number}/{game.max_steps}. Alive crewmates: {len(alive_agents)}."
+            if game.step_number == 25:
+                context = f"{context_base} There is an impostor among you! Share what you know and discuss who seems suspicious."
+            else:
+                context = f"{context_base} Continue the discussion. Find the impostor before it's too late!"
+        return context
+    
+    async def _generate_turns_fanout(self, game: GameState, alive_agents: List[Agent], context: str) -> List[AgentTurn]:
+        """Run one `choose_action` LLM call per alive agent, in parallel"""
+        conversation = self._conversation(game)
+        
+        async def process_agent(agent_data: Agent) -> AgentTurn:
+            agent = self._create_agent(agent_data, game.game_id)
+            
+            # Get agent's private thoughts
+            private_thoughts = game.private_thoughts.get(agent_data.id, [])
+            
+            # Add special context for reporter when emergency meeting starts
+            agent_context = context
+            if game.step_number == 25 and agent_data.id == game.reporter_id:
+                agent_context = f"{context} You are the one who called this meeting because: {game.meeting_reason}"
+            
+            turn = await agent.choose_action(agent_context, game.public_action_history, private_thoughts, game.step_number, game.agents, conversation)
+            self._mark_call_done(game.game_id, "llm")
+            return turn
+        
+        # Execute all agent turns in parallel, bounded by the step deadline
+        logger.debug("Processing %d agents in parallel for step %d", len(alive_agents), game.step_number)
+        if not alive_agents:
+            return []
+        tasks = [asyncio.ensure_future(process_agent(agent_data)) for agent_data in alive_agents]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.step_deadline)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        for task in pending:
+            task.cancel()
+        
+        step_turns = []
+        for agent_data, task in zip(alive_agents, tasks):
+            if task in pending:
+                logger.warning("%s missed the %ss step deadline, using degraded turn", agent_data.name, self.step_deadline)
+                step_turns.append(self._degraded_turn(game, agent_data))
+            elif isinstance(task.exception(), LLMError):
+                logger.warning("%s LLM call failed (%s), using degraded turn", agent_data.name, task.exception())
+                step_turns.append(self._degraded_turn(game, agent_data))
+                self._mark_call_failed(game.game_id)
+            elif task.exception() is not None:
+                logger.error("Error during parallel agent processing: %s", task.exception())
+                raise task.exception()
+            else:
+                step_turns.append(task.result())
+        logger.debug("%d/%d agent turns completed before the deadline", len(done), len(tasks))
+        return step_turns
+    
+    async def _generate_turns_joint(self, game: GameState, alive_agents: List[Agent], context: str) -> List[AgentTurn]:
+        """Generate every agent's turn in one structured LLM call, bounded by the step deadline"""
+        logger.debug("Generating %d agent turns jointly for step %d", len(alive_agents), game.step_number)
+        try:
+            turns = await asyncio.wait_for(self.joint_generator.generate_turns(game, alive_agents, context, self._conversation(game)), timeout=self.step_deadline)
+            self._mark_call_done(game.game_id, "llm")
+            return turns
+        except asyncio.TimeoutError:
+            logger.warning("Joint generation missed the %ss step deadline, using degraded turns", self.step_deadline)
+            return [self._degraded_turn(game, agent_data) for agent_data in alive_agents]
+        except LLMError as e:
+            logger.warning("Joint generation failed (%s), using degraded turns", e)
+            self._mark_call_failed(game.game_id, len(alive_agents))
+            return [self._degraded_turn(game, agent_data) for agent_data in alive_agents]
+    
+    def _degraded_turn(self, game: GameState, agent_data: Agent) -> AgentTurn:
+        """Turn for an agent whose LLM call missed the step deadline or failed: parse fallback plus previous hypothesis"""
+        turn = self._create_agent(agent_data, game.game_id)._parse_turn("", game.step_number)
+        turn.impostor_hypothesis = game.impostor_hypotheses.get(agent_data.id)
+        turn.degraded = True
+        return turn
+    
     async def step_game(self, game_id: str) -> Optional[StepResponse]:
-        print(f"DEBUG - Starting step_game for {game_id}")
+        bind_game(game_id)
+        logger.debug("Starting step")
         game = self.get_game(game_id)
         if not game:
-            print(f"DEBUG - Game {game_id} not found")
+            logger.debug("Game not found")
             return None
+        bind_priority(game.priority)
         
         if game.status == GameStatus.FINISHED:
-            return StepResponse(
+            return StepResponse.model_construct(
                 game_id=game_id,
                 phase=game.phase,
                 step_number=game.step_number,
                 max_steps=game.max_steps,
                 turns=[],
-                conversation_history=game.public_action_history,
+                conversation_history=game.public_action_history.fork(),
                 winner=game.winner,
                 game_over=True,
                 message="Game over"
@@ -259,112 +608,99 @@ Respond with ONLY the agent's name (e.g., "Red", "Blue", etc.) - no explanation
             impostor_alive = any(a.is_impostor for a in alive_agents)
             
             if impostor_alive:
-                game.winner = "Imposteur"
+                winner = "Imposteur"
                 message = "Time's up! The impostor wins!"
             else:
-                game.winner = "Crewmates"
+                winner = "Crewmates"
                 message = "Time's up! The crewmates win!"
             
-            game.status = GameStatus.FINISHED
-            game.phase = GamePhase.GAME_OVER
+            apply_game_over(game, winner)
+            self._record(game, game_over_event(game.step_number, winner))
             
-            return StepResponse(
+            return StepResponse.model_construct(
                 game_id=game_id,
                 phase=game.phase,
                 step_number=game.step_number,
                 max_steps=game.max_steps,
                 turns=[],
-                conversation_history=game.public_action_history,
+                conversation_history=game.public_action_history.fork(),
                 winner=game.winner,
                 game_over=True,
                 message=message
             )
         
-        # All alive agents act in this step
+        # Only the agents picked by the activation scheduler think this step
         alive_agents = self._get_alive_agents(game)
-        step_turns = []
-        
-        # Generate turns for all alive agents
-        if game.step_number < 25:  # Normal conversation phase
-            context_base = f"Step {game.step_number}/{game.max_steps}. You are doing tasks around the ship with {len(alive_agents)} crewmates."
-            if game.step_number == 1:
-                context = f"{context_base} You just started your shift. Share your thoughts about the tasks or your fellow crewmates."
-            elif game.step_number < 10:
-                context = f"{context_base} Continue doing your tasks. You can chat casually with others or share observations."
-            elif game.step_number < 20:
-                context = f"{context_base} You've been working for a while. Share any suspicions or observations about other crewmates."
-            else:
-                context = f"{context_base} Something feels off. Be more alert and share any concerns you might have."
-        else:  # Emergency meeting phase
-            context_base = f"EMERGENCY MEETING! {game.meeting_reason}. Step {game.step_number}/{game.max_steps}. Alive crewmates: {len(alive_agents)}."
-            if game.step_number == 25:
-                context = f"{context_base} There is an impostor among you! Share what you know and discuss who seems suspicious."
-            else:
-                context = f"{context_base} Continue the discussion. Find the impostor before it's too late!"
-        
-        # Create async tasks for all agents to process in parallel
-        async def process_agent(agent_data: Agent) -> AgentTurn:
-            agent = self._create_agent(agent_data)
-            
-            # Get agent's private thoughts
-            private_thoughts = game.private_thoughts.get(agent_data.id, [])
-            
-            # Add special context for reporter when emergency meeting starts
-            agent_context = context
-            if game.step_number == 25 and agent_data.id == game.reporter_id:
-                agent_context = f"{context} You are the one who called this meeting because: {game.meeting_reason}"
-            
-            turn = await agent.choose_action(agent_context, game.public_action_history, private_thoughts, game.step_number, game.agents)
-            
-            # Save memory update to persistent agent data (if not already added by agent)
-            if turn.memory_update and (not agent_data.memory_history or agent_data.memory_history[-1] != turn.memory_update):
-                agent_data.memory_history.append(turn.memory_update)
-            
-            return turn
-        
-        # Execute all agent turns in parallel
-        print(f"DEBUG - Processing {len(alive_agents)} agents in parallel for step {game.step_number}")
-        tasks = [process_agent(agent_data) for agent_data in alive_agents]
-        try:
-            step_turns = await asyncio.gather(*tasks)
-            print(f"DEBUG - All {len(step_turns)} agent turns completed successfully")
-        except Exception as e:
-            print(f"DEBUG - Error during parallel agent processing: {e}")
-            raise
+        active_agents = self.activation_scheduler.select(game, alive_agents)
+        context = self._build_step_context(game, alive_agents)
+        uses_joint_engine = game.engine == "joint" and game.step_number < 25
+        # Expected calls: agent turns, speaker selection and one TTS request
+        self.step_progress[game_id] = {
+            "llm_planned": (1 if uses_joint_engine else len(active_agents)) + 1,
+            "llm_done": 0,
+            "tts_planned": 1 if self._tts_allowed(game_id) else 0,
+            "tts_sent": 0,
+            "tts_done": 0,
+            "llm_failed": 0,  # agent turns degraded because their LLM call failed
+        }
+        logger.debug("Activating %d/%d agents for step %d", len(active_agents), len(alive_agents), game.step_number)
+        
+        if uses_joint_engine:
+            # One structured request for every agent during pre-meeting steps
+            active_turns = await self._generate_turns_joint(game, active_agents, context)
+        else:
+            active_turns = await self._generate_turns_fanout(game, active_agents, context)
         
-        # Process all turns - store thinks privately
-        for turn in step_turns:
-            if turn.agent_id not in game.private_thoughts:
-                game.private_thoughts[turn.agent_id] = []
-            game.private_thoughts[turn.agent_id].append(AgentAction(
-                agent_id=turn.agent_id,
-                action_type=ActionType.THINK,
-                content=turn.think,
-                target_agent_id=None
-            ))
+        # Inactive agents carry their last hypothesis forward
+        turns_by_agent = {turn.agent_id: turn for turn in active_turns}
+        step_turns = [turns_by_agent.get(agent_data.id) or carry_forward_turn(game, agent_data) for agent_data in alive_agents]
         
         # After all agents have generated their turns, use LLM to intelligently select speaker
         agents_who_want_to_speak = [turn for turn in step_turns if turn.speak is not None]
-        print(f"DEBUG - {len(agents_who_want_to_speak)} agents want to speak in step {game.step_number}")
+        logger.debug("%d agents want to speak in step %d", len(agents_who_want_to_speak), game.step_number)
+        
+        progress = self.step_progress[game_id]
+        if len(agents_who_want_to_speak) <= 1:
+            progress["llm_planned"] -= 1
         
+        chosen_speaker = None
         if agents_who_want_to_speak:
-            print(f"DEBUG - Conversation history has {len(game.public_action_history)} entries")
             chosen_speaker = await self._select_next_speaker(agents_who_want_to_speak, game.public_action_history, alive_agents, game.step_number)
+            if len(agents_who_want_to_speak) > 1:
+                self._mark_call_done(game_id, "llm")
             chosen_agent_name = next((agent.name for agent in alive_agents if agent.id == chosen_speaker.agent_id), f"Agent{chosen_speaker.agent_id}")
-            print(f"DEBUG - Selected speaker: {chosen_agent_name} (ID: {chosen_speaker.agent_id})")
+            logger.debug("Selected speaker: %s", chosen_agent_name)
             
             # Generate TTS audio for the chosen speaker
             speaker_agent = next((a for a in game.agents if a.id == chosen_speaker.agent_id), None)
-            if speaker_agent and chosen_speaker.speak:
+            if speaker_agent and chosen_speaker.speak and self._tts_allowed(game_id):
                 # Pass impostor status for voice personality adjustment
                 audio_data = await tts_service.text_to_speech(
                     chosen_speaker.speak, 
                     speaker_agent.color,
-                    is_impostor=speaker_agent.is_impostor
+                    is_impostor=speaker_agent.is_impostor,
+                    on_sent=lambda: self._mark_call_sent(game_id, "tts")
                 )
                 chosen_speaker.audio_base64 = audio_data
-            
-            game.public_action_history.append(AgentAction(
+                self._mark_call_done(game_id, "tts")
+            else:
+                progress["tts_planned"] = 0
+        else:
+            progress["tts_planned"] = 0
+        
+        # Commit the step. Nothing below awaits, so a step cancelled while waiting on
+        # the LLM or TTS leaves the game exactly as it was after the last committed step.
+        self.step_progress.pop(game_id, None)
+        llm_failures = progress["llm_failed"]
+        deadline_misses = sum(1 for turn in active_turns if turn.degraded) - llm_failures
+        if deadline_misses:
+            game.counters["deadline_misses"] = game.counters.get("deadline_misses", 0) + deadline_misses
+        if llm_failures:
+            game.counters["llm_failures"] = game.counters.get("llm_failures", 0) + llm_failures
+        
+        public_actions = []
+        if chosen_speaker:
+            public_actions.append(AgentAction(
                 agent_id=chosen_speaker.agent_id,
                 action_type=ActionType.SPEAK,
                 content=chosen_speaker.speak,
@@ -373,10 +709,11 @@ Respond with ONLY the agent's name (e.g., "Red", "Blue", etc.) - no explanation
             ))
         
         # Now process all votes
+        votes = dict(game.current_votes)
         for turn in step_turns:
             if turn.vote is not None:
                 # turn.vote is now the color directly
-                game.public_action_history.append(AgentAction(
+                public_actions.append(AgentAction(
                     agent_id=turn.agent_id,
                     action_type=ActionType.VOTE,
                     content=f"I vote to eliminate {turn.vote}",
@@ -384,18 +721,15 @@ Respond with ONLY the agent's name (e.g., "Red", "Blue", etc.) - no explanation
                 ))
                 
                 # Count the vote
-                if turn.vote in game.current_votes:
-                    game.current_votes[turn.vote] += 1
-                else:
-                    game.current_votes[turn.vote] = 1
+                votes[turn.vote] = votes.get(turn.vote, 0) + 1
         
         # Check for elimination (if someone has majority votes)
         total_alive = len(alive_agents)
         majority_needed = (total_alive // 2) + 1
         
         eliminated_agent = None
-        for agent_id, votes in game.current_votes.items():
-            if votes >= majority_needed:
+        for agent_id, vote_count in votes.items():
+            if vote_count >= majority_needed:
                 eliminated_agent = next((a for a in game.agents if a.id == agent_id), None)
                 break
         
@@ -404,23 +738,16 @@ Respond with ONLY the agent's name (e.g., "Red", "Blue", etc.) - no explanation
         game_over = False
         
         if eliminated_agent:
-            eliminated_agent.is_alive = False
-            message += f" {eliminated_agent.name} ({eliminated_agent.color}) eliminated with {game.current_votes[eliminated_agent.id]} votes!"
+            message += f" {eliminated_agent.name} ({eliminated_agent.color}) eliminated with {votes[eliminated_agent.id]} votes!"
             
             if eliminated_agent.is_impostor:
-                game.winner = "Crewmates"
-                game.status = GameStatus.FINISHED
-                game.phase = GamePhase.GAME_OVER
                 winner = "Crewmates"
                 game_over = True
                 message += " The impostor was found! Crewmates win!"
             else:
                 # Check if imposteur can still win
-                remaining_alive = self._get_alive_agents(game)
+                remaining_alive = [a for a in alive_agents if a.id != eliminated_agent.id]
                 if len(remaining_alive) <= 2 and any(a.is_impostor for a in remaining_alive):
-                    game.winner = "Imposteur"
-                    game.status = GameStatus.FINISHED
-                    game.phase = GamePhase.GAME_OVER
                     winner = "Imposteur"
                     game_over = True
                     message += " The impostor wins!"
@@ -428,27 +755,228 @@ Respond with ONLY the agent's name (e.g., "Red", "Blue", etc.) - no explanation
                     message += f" {eliminated_agent.name} was innocent!"
             
             # Reset votes after elimination
-            game.current_votes = {}
+            votes = {}
         
-        # Increment step
-        game.step_number += 1
+        eliminated_id = eliminated_agent.id if eliminated_agent else None
+        apply_step(game, game.step_number, step_turns, public_actions, eliminated_id, votes, winner)
+        self._record(game, step_event(game.step_number - 1, step_turns, public_actions, eliminated_id, votes, winner))
         
-        print(f"DEBUG - Step {game.step_number - 1} completed. Game status: {game.status}, Phase: {game.phase}")
-        print(f"DEBUG - Alive agents: {len(alive_agents)}, Game over: {game_over}")
+        logger.info("Step completed", extra={"step": game.step_number - 1, "status": game.status.value, "alive": len(alive_agents), "game_over": game_over})
         
-        return StepResponse(
+        # Turns and history are already validated: skip re-validation and hand out an O(1) history snapshot
+        return StepResponse.model_construct(
             game_id=game_id,
             phase=game.phase,
             step_number=game.step_number - 1,  # Show the step that just completed
             max_steps=game.max_steps,
             turns=step_turns,
-            conversation_history=game.public_action_history,
+            conversation_history=game.public_action_history.fork(),
             eliminated=eliminated_agent.name if eliminated_agent else None,
             winner=winner,
             game_over=game_over,
             message=message
         )
     
+    def _mark_call_done(self, game_id: str, kind: str):
+        progress = self.step_progress.get(game_id)
+        if progress is not None:
+            progress[f"{kind}_done"] += 1
+    
+    def _mark_call_sent(self, game_id: str, kind: str):
+        progress = self.step_progress.get(game_id)
+        if progress is not None:
+            progress[f"{kind}_sent"] += 1
+    
+    def _mark_call_failed(self, game_id: str, turns: int = 1):
+        progress = self.step_progress.get(game_id)
+        if progress is not None:
+            progress["llm_failed"] += turns
+    
+    def _on_step_done(self, game_id: str, task: asyncio.Task):
+        if self.inflight_steps.get(game_id) is task:
+            del self.inflight_steps[game_id]
+        progress = self.step_progress.pop(game_id, None)
+        if not task.cancelled() or progress is None:
+            return
+        
+        # Completed calls were paid for and thrown away; the rest were never made or were cut short.
+        # A speech request is billed once sent, so one cancelled in flight is wasted too.
+        tts_billed = max(progress["tts_done"], progress["tts_sent"])
+        outcome = {
+            "llm_calls_wasted": progress["llm_done"],
+            "llm_calls_saved": max(0, progress["llm_planned"] - progress["llm_done"]),
+            "tts_calls_wasted": tts_billed,
+            "tts_calls_saved": max(0, progress["tts_planned"] - tts_billed),
+        }
+        self.cancellation_stats["cancelled_steps"] += 1
+        game = self.get_game(game_id)
+        if game:
+            game.counters["cancelled_steps"] = game.counters.get("cancelled_steps", 0) + 1
+        for key, value in outcome.items():
+            self.cancellation_stats[key] += value
+            if game:
+                game.counters[key] = game.counters.get(key, 0) + value
+        logger.info("Step cancelled", extra={"game_id": game_id, **outcome})
+    
+    async def run_step(self, game_id: str, idempotency_key: Optional[str] = None, step_number: Optional[int] = None) -> Optional[StepResponse]:
+        """Run `step_game` as an in-flight task that `cancel_step` can abort.
+        
+        State is only committed at the end of `step_game`, so a cancelled step
+        leaves the game at its last committed step.
+        
+        A request with an idempotency key or the step number it means to run is
+        safe to retry: if that step already ran, its stored response is returned;
+        if it is still running, StepInProgress is raised; and if the game is at
+        another step, StaleStep is raised without running anything.
+        """
+        replay = self.step_cache.get(game_id, idempotency_key, step_number)
+        if replay is not None:
+            return replay
+        if step_number is not None:
+            game = await self.sync_game(game_id)
+            if game is not None:
+                self._check_step_request(game, idempotency_key, step_number)
+        if self.state_store is not None:
+            result = await self._run_shared_step(game_id, idempotency_key, step_number)
+        else:
+            result = await self._run_step_task(game_id, idempotency_key, step_number)
+        if result is not None:
+            self.step_cache.put(result, idempotency_key)
+        return result
+    
+    def _check_step_request(self, game: GameState, idempotency_key: Optional[str], step_number: Optional[int]) -> None:
+        """Refuse a retryable step that must not run now (a plain step request is never refused)"""
+        if idempotency_key is None and step_number is None:
+            return
+        inflight = self.inflight_steps.get(game.game_id)
+        if inflight is not None and not inflight.done():
+            self.idempotency_stats["duplicates_in_flight"] += 1
+            raise StepInProgress(f"A step is already running for game {game.game_id}")
+        if step_number is not None and step_number != game.step_number:
+            self.idempotency_stats["stale_rejected"] += 1
+            raise StaleStep(game.game_id, step_number, game.step_number)
+    
+    async def _run_step_task(self, game_id: str, idempotency_key: Optional[str] = None, step_number: Optional[int] = None) -> Optional[StepResponse]:
+        game = await self._load_logged_game(game_id)
+        if game is not None:
+            self._check_step_request(game, idempotency_key, step_number)
+        started = time.monotonic()
+        task = asyncio.ensure_future(self.step_game(game_id))
+        self.inflight_steps[game_id] = task
+        task.add_done_callback(lambda t: self._on_step_done(game_id, t))
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            # The caller itself went away: stop paying for the step
+            task.cancel()
+            raise
+        if task.cancelled():
+            raise StepCancelled(f"Step for game {game_id} was cancelled")
+        result = task.result()
+        if result is not None:
+            self.last_active[game_id] = time.monotonic()
+            self.admission.record_step(self.last_active[game_id] - started)
+        return result
+    
+    async def _run_shared_step(self, game_id: str, idempotency_key: Optional[str] = None, step_number: Optional[int] = None) -> Optional[StepResponse]:
+        """Step a game held in the shared store: lease, load the latest version, step, compare-and-set.
+        
+        Raises StepInProgress if another step holds the lease, and StateConflict
+        if the game moved on (e.g. the lease expired mid-step) before the commit.
+        The step's events reach the event log and spectators only once committed.
+        """
+        lease = await self.state_store.acquire_lease(game_id, self.step_lease_seconds)
+        if lease is None:
+            raise StepInProgress(f"A step is already running for game {game_id}")
+        committed = False
+        self.pending_events[game_id] = []
+        try:
+            game = await self.sync_game(game_id)
+            if game is None:
+                committed = True
+                return None
+            started_at = game.version
+            result = await self._run_step_task(game_id, idempotency_key, step_number)
+            if game.version != started_at:
+                self.game_versions[game_id] = await self.state_store.commit(game, self.game_versions[game_id], lease)
+            committed = True
+            for version, event in self.pending_events.pop(game_id):
+                self._emit(game_id, version, event)
+            return result
+        finally:
+            # Events of a step the store never saw are dropped with it
+            self.pending_events.pop(game_id, None)
+            if not committed:
+                # This worker's copy may hold a step the store never saw
+                self._forget_game(game_id)
+            await self.state_store.release_lease(game_id, lease)
+    
+    async def step_games(self, game_ids: List[str], steps: int = 1, until_game_over: bool = False) -> AsyncIterator[StepSummary]:
+        """Advance several games, yielding a summary of each step as it completes.
+        
+        Games run concurrently and each game's steps run in order. Every step
+        takes one of the shared `bulk_slots`, so concurrent bulk requests
+        interleave instead of queueing behind each other. A game stops after
+        `steps` steps, at game over, or at its first error (reported as a
+        summary with `error` set). Closing the iterator cancels the steps
+        still running.
+        """
+        self.bulk_stats["requests"] += 1
+        summaries: asyncio.Queue = asyncio.Queue()
+        
+        async def drive(game_id: str) -> None:
+            try:
+                game = self.get_game(game_id)
+                # Until game over: every step left, plus the one that ends the game when time is up
+                remaining = game.max_steps + 1 if until_game_over and game else steps
+                while remaining > 0:
+                    remaining -= 1
+                    async with self.bulk_slots:
+                        self.admission.reserve_step()
+                        try:
+                            result = await self.run_step(game_id)
+                        finally:
+                            self.admission.release_step()
+                    if result is None:
+                        summaries.put_nowait(StepSummary(game_id=game_id, error="not_found"))
+                        return
+                    self.bulk_stats["steps"] += 1
+                    summaries.put_nowait(step_summary(result))
+                    if result.game_over:
+                        return
+            except Exception as e:
+                error = next((code for kind, code in BULK_STEP_ERRORS if isinstance(e, kind)), "failed")
+                if error == "failed":
+                    logger.exception("Bulk step failed", extra={"game_id": game_id})
+                summaries.put_nowait(StepSummary(game_id=game_id, error=error))
+            finally:
+                summaries.put_nowait(None)
+        
+        for game_id in game_ids:
+            await self.sync_game(game_id)
+        drivers = [asyncio.ensure_future(drive(game_id)) for game_id in game_ids]
+        try:
+            running = len(drivers)
+            while running:
+                summary = await summaries.get()
+                if summary is None:
+                    running -= 1
+                    continue
+                if summary.error is not None:
+                    self.bulk_stats["errors"] += 1
+                yield summary
+        finally:
+            for driver in drivers:
+                driver.cancel()
+    
+    def cancel_step(self, game_id: str) -> bool:
+        """Cancel the in-flight step of a game. Returns False if no step is running."""
+        task = self.inflight_steps.get(game_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+    
     async def process_step(self, game_id: str) -> Optional[StepResponse]:
         """Alias for step_game to maintain compatibility with tests"""
         return await self.step_game(game_id)
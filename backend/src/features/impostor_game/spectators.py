@@ -0,0 +1,183 @@
+"""
+Spectator broadcast hub: live game events for many viewers of one game.
+
+Each event a game records (step, game over...) is encoded once into a frame
+and the same frame is handed to every subscriber of the game; the SSE framing
+of a frame is also built once and shared by every SSE viewer. A new viewer
+first gets a snapshot of the game state (encoded once per game version,
+whatever the number of viewers joining), then the live frames. Frames and
+snapshots are numbered by the game version they bring the viewer to, so a
+viewer skips the frames its snapshot already includes.
+
+Every subscriber has a bounded buffer. A viewer that falls `buffer_size`
+frames behind either skips ahead with a fresh snapshot ("snapshot" policy,
+the default) or is disconnected ("drop"), so a slow connection never holds
+memory or delays the others. Streams end after the game-over event (or the
+snapshot of a finished game). Games without viewers pay one dictionary lookup
+per event, and the hub keeps nothing for them.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Set, Tuple
+from src.core.metrics import Histogram
+
+# Seconds between an event's publication and its hand-off to a viewer's connection
+FANOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+SLOW_POLICIES = ("snapshot", "drop")
+
+class Frame:
+    """One encoded event, shared by every subscriber"""
+
+    __slots__ = ("seq", "type", "data", "published_at", "final", "_sse")
+
+    def __init__(self, seq: int, type: str, data: str, published_at: float, final: bool = False):
+        self.seq = seq
+        self.type = type
+        self.data = data  # JSON text, sent as is over WebSockets
+        self.published_at = published_at
+        self.final = final  # the game is over: nothing follows this frame
+        self._sse: Optional[bytes] = None
+
+    @property
+    def sse(self) -> bytes:
+        """The frame as a Server-Sent Event, built for the first SSE viewer and reused for the others"""
+        if self._sse is None:
+            self._sse = f"id: {self.seq}\nevent: {self.type}\ndata: {self.data}\n\n".encode()
+        return self._sse
+
+class Subscriber:
+    """One viewer's bounded queue of frames"""
+
+    def __init__(self, hub: "SpectatorHub", game_id: str):
+        self.hub = hub
+        self.game_id = game_id
+        self.frames: Deque[Frame] = deque()
+        self.ready = asyncio.Event()
+        self.needs_snapshot = True
+        self.closed = False
+        self.seq = -1  # game version of the last frame or snapshot sent
+
+    def push(self, frame: Frame) -> None:
+        if len(self.frames) >= self.hub.buffer_size:
+            self.hub.on_overflow(self)
+        else:
+            self.frames.append(frame)
+        self.ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[Frame]:
+        """The next frame to send (a snapshot first), or None once the subscriber was dropped.
+
+        Raises asyncio.TimeoutError if nothing arrives within `timeout` seconds.
+        """
+        while not self.closed:
+            if self.needs_snapshot:
+                self.needs_snapshot = False
+                snapshot = self.hub.snapshot(self.game_id)
+                if snapshot is not None:
+                    # Frames published before the snapshot are already part of it
+                    while self.frames and self.frames[0].seq <= snapshot.seq:
+                        self.frames.popleft()
+                    self.seq = snapshot.seq
+                    self.closed = snapshot.final
+                    return snapshot
+            while self.frames:
+                frame = self.frames.popleft()
+                if frame.seq <= self.seq:
+                    continue  # already part of the snapshot (a shared step is published after its commit)
+                self.seq = frame.seq
+                self.hub.on_delivery(frame)
+                self.closed = frame.final
+                return frame
+            self.ready.clear()
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        return None
+
+class SpectatorHub:
+    def __init__(self, encode_state: Callable[[str], Optional[Tuple[str, bool]]], version_of: Callable[[str], Optional[int]],
+                 buffer_size: int = 64, slow_policy: str = "snapshot"):
+        # Return a game's current state as JSON text and whether the game is over, and
+        # its version (None for an unknown game)
+        self.encode_state = encode_state
+        self.version_of = version_of
+        self.buffer_size = max(1, buffer_size)
+        self.slow_policy = slow_policy if slow_policy in SLOW_POLICIES else "snapshot"
+        self.channels: Dict[str, Set[Subscriber]] = {}
+        self._snapshots: Dict[str, Frame] = {}  # latest snapshot per watched game
+        self.fanout_latency = Histogram(FANOUT_BUCKETS)
+        self.stats = {"published": 0, "frames_encoded": 0, "snapshots_encoded": 0, "delivered": 0, "resynced": 0, "dropped": 0}
+
+    def subscribe(self, game_id: str) -> Subscriber:
+        subscriber = Subscriber(self, game_id)
+        self.channels.setdefault(game_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self.channels.get(subscriber.game_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self.channels[subscriber.game_id]
+            self._snapshots.pop(subscriber.game_id, None)
+
+    def subscriber_count(self, game_id: Optional[str] = None) -> int:
+        if game_id is not None:
+            return len(self.channels.get(game_id, ()))
+        return sum(len(subscribers) for subscribers in self.channels.values())
+
+    def publish(self, game_id: str, event: Dict, seq: int) -> None:
+        """Encode `event` once and queue it for every viewer of the game; `seq` is the game's version once it is applied"""
+        self.stats["published"] += 1
+        subscribers = self.channels.get(game_id)
+        if not subscribers:
+            return
+        data = json.dumps({"seq": seq, **event}, separators=(",", ":"), ensure_ascii=False)
+        # A game ends on time (game_over event) or with a step that has a winner
+        final = event["type"] == "game_over" or event.get("winner") is not None
+        frame = Frame(seq, event["type"], data, time.perf_counter(), final=final)
+        self.stats["frames_encoded"] += 1
+        for subscriber in list(subscribers):
+            subscriber.push(frame)
+
+    def snapshot(self, game_id: str) -> Optional[Frame]:
+        """The game's current state as a frame, built once per game version"""
+        seq = self.version_of(game_id)
+        if seq is None:
+            return None
+        cached = self._snapshots.get(game_id)
+        if cached is not None and cached.seq == seq:
+            return cached
+        encoded = self.encode_state(game_id)
+        if encoded is None:
+            return None
+        state, finished = encoded
+        frame = Frame(seq, "snapshot", f'{{"seq":{seq},"type":"snapshot","state":{state}}}', time.perf_counter(), final=finished)
+        self.stats["snapshots_encoded"] += 1
+        if game_id in self.channels:
+            self._snapshots[game_id] = frame
+        return frame
+
+    def on_overflow(self, subscriber: Subscriber) -> None:
+        subscriber.frames.clear()
+        if self.slow_policy == "drop":
+            subscriber.closed = True
+            self.stats["dropped"] += 1
+            self.unsubscribe(subscriber)
+        else:
+            subscriber.needs_snapshot = True
+            self.stats["resynced"] += 1
+
+    def on_delivery(self, frame: Frame) -> None:
+        self.stats["delivered"] += 1
+        self.fanout_latency.observe(time.perf_counter() - frame.published_at)
+
+    def collect(self):
+        yield "impostor_spectators", "gauge", "Connected spectators", [({}, self.subscriber_count())]
+        yield "impostor_spectator_frames_total", "counter", "Spectator events published and encoded, frames delivered, and slow viewers resynced or dropped", [
+            ({"kind": kind}, count) for kind, count in self.stats.items()
+        ]
+        yield "impostor_spectator_fanout_seconds", "histogram", "Delay between an event and its hand-off to a spectator connection", self.fanout_latency.samples()
@@ -0,0 +1,42 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from src.core.compression import MIN_COMPRESS_SIZE, compress
+
+class EncodedStateCache:
+    """Encoded game state bodies, kept for each game's current version only.
+
+    The JSON body of a version is encoded on its first request, and each
+    content encoding of it is compressed on first use; every later poll of the
+    same version is served from here. The cache is bounded by game count and
+    evicts the least recently polled game.
+    """
+
+    def __init__(self, max_games: int = 1024, min_compress_size: int = MIN_COMPRESS_SIZE):
+        self.max_games = max_games
+        self.min_compress_size = min_compress_size
+        self._entries: "OrderedDict[str, Tuple[int, Dict[Optional[str], bytes]]]" = OrderedDict()
+        self.stats = {"hits": 0, "encoded": 0, "compressed": 0, "evicted": 0}
+
+    def body(self, game_id: str, version: int, encode: Callable[[], bytes], encoding: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+        """The body for `version` and the content encoding actually applied (None for small bodies)"""
+        entry = self._entries.get(game_id)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(game_id)
+            self.stats["hits"] += 1
+        else:
+            entry = self._entries[game_id] = (version, {None: encode()})
+            self._entries.move_to_end(game_id)
+            self.stats["encoded"] += 1
+            while len(self._entries) > self.max_games:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
+        bodies = entry[1]
+        if encoding is None or len(bodies[None]) < self.min_compress_size:
+            return bodies[None], None
+        if encoding not in bodies:
+            bodies[encoding] = compress(bodies[None], encoding)
+            self.stats["compressed"] += 1
+        return bodies[encoding], encoding
+
+    def __len__(self) -> int:
+        return len(self._entries)
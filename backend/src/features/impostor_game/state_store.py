@@ -0,0 +1,121 @@
+import uuid
+import zlib
+from typing import Optional, Tuple
+from pydantic_core import to_json
+from src.core.resp import RedisClient
+from src.core.settings import Settings
+from .schema import GameState
+
+class StateConflict(Exception):
+    """A commit lost a race: the stored game moved past the expected version, or the step lease was lost"""
+
+class RedisGameStore:
+    """Game states shared by every worker, in a Redis-protocol server.
+
+    Per game, three keys hold the compressed `GameState`, its version (bumped
+    by every commit) and the step lease. A step takes the lease (SET NX PX, so
+    only one worker steps a game at a time and a crashed worker's lease
+    expires), and its result is committed with WATCH / MULTI / EXEC only if
+    the version is still the one the step started from and the lease is still
+    held. Workers keep a decoded copy of each game and only fetch the state
+    again when its version changed.
+    """
+
+    def __init__(self, client: RedisClient, prefix: str = "impostor"):
+        self.client = client
+        self.prefix = prefix
+        self.stats = {"loads": 0, "cache_hits": 0, "commits": 0, "conflicts": 0, "leases_denied": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["RedisGameStore"]:
+        """The configured store, or None without IMPOSTOR_STATE_URL (no connection is opened here)"""
+        if not settings.state_url:
+            return None
+        return cls(RedisClient.from_url(settings.state_url, pool_size=settings.state_pool_size),
+                   prefix=settings.state_prefix)
+
+    async def ping(self) -> None:
+        """Open a pooled connection now rather than on the first request"""
+        await self.client.execute("PING")
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def _key(self, game_id: str, field: str) -> str:
+        return f"{self.prefix}:game:{{{game_id}}}:{field}"  # hash tag keeps a game's keys in one cluster slot
+
+    @staticmethod
+    def encode(game: GameState) -> bytes:
+        return zlib.compress(to_json(game), 1)
+
+    @staticmethod
+    def decode(blob: bytes) -> GameState:
+        return GameState.model_validate_json(zlib.decompress(blob))
+
+    async def create(self, game: GameState) -> int:
+        """Store a new game (created or forked by this worker) at version 1"""
+        async with self.client.connection() as connection:
+            await connection.execute("MULTI")
+            await connection.execute("SET", self._key(game.game_id, "state"), self.encode(game))
+            await connection.execute("SET", self._key(game.game_id, "version"), 1)
+            await connection.execute("EXEC")
+        return 1
+
+    async def load(self, game_id: str, cached_version: Optional[int] = None) -> Optional[Tuple[Optional[GameState], int]]:
+        """(state, version) of a stored game, with state None when `cached_version` is current; None if unknown"""
+        version = await self.client.execute("GET", self._key(game_id, "version"))
+        if version is None:
+            return None
+        version = int(version)
+        if version == cached_version:
+            self.stats["cache_hits"] += 1
+            return None, version
+        # A commit landing between the two reads leaves us with a newer state under an
+        # older version number, which only means one more fetch next time
+        blob = await self.client.execute("GET", self._key(game_id, "state"))
+        if blob is None:
+            return None
+        self.stats["loads"] += 1
+        return self.decode(blob), version
+
+    async def acquire_lease(self, game_id: str, seconds: float) -> Optional[str]:
+        """Take the game's step lease for `seconds`; returns its token, or None if another step holds it"""
+        token = uuid.uuid4().hex
+        acquired = await self.client.execute("SET", self._key(game_id, "lease"), token, "NX", "PX", int(seconds * 1000))
+        if acquired is None:
+            self.stats["leases_denied"] += 1
+            return None
+        return token
+
+    async def release_lease(self, game_id: str, token: str) -> None:
+        """Release the lease if it is still ours (it may have expired and been taken since)"""
+        key = self._key(game_id, "lease")
+        async with self.client.connection() as connection:
+            await connection.execute("WATCH", key)
+            if await connection.execute("GET", key) != token.encode():
+                await connection.execute("UNWATCH")
+                return
+            await connection.execute("MULTI")
+            await connection.execute("DEL", key)
+            await connection.execute("EXEC")
+
+    async def commit(self, game: GameState, expected_version: int, token: str) -> int:
+        """Store `game` as version `expected_version + 1`; raises StateConflict if another commit or lease got there first"""
+        version_key = self._key(game.game_id, "version")
+        lease_key = self._key(game.game_id, "lease")
+        blob = self.encode(game)
+        async with self.client.connection() as connection:
+            await connection.execute("WATCH", version_key, lease_key)
+            version, lease = await connection.execute("MGET", version_key, lease_key)
+            if version is None or int(version) != expected_version or lease != token.encode():
+                await connection.execute("UNWATCH")
+                self.stats["conflicts"] += 1
+                raise StateConflict(f"Game {game.game_id} is at version {version and int(version)}, expected {expected_version}")
+            await connection.execute("MULTI")
+            await connection.execute("SET", self._key(game.game_id, "state"), blob)
+            await connection.execute("SET", version_key, expected_version + 1)
+            if await connection.execute("EXEC") is None:
+                self.stats["conflicts"] += 1
+                raise StateConflict(f"Game {game.game_id} changed while committing version {expected_version + 1}")
+        self.stats["commits"] += 1
+        return expected_version + 1
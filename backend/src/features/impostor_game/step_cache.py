@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+from .schema import StepResponse
+
+class StepResponseCache:
+    """Recent step responses, found by idempotency key or by step number, so client retries replay them.
+
+    Responses hold a forked (copy-on-write) conversation history, so an entry
+    costs its turns plus the history written after the fork. The cache is
+    bounded by entry count and evicts the least recently used.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, StepResponse]" = OrderedDict()
+        self.stats = {"replays": 0, "stored": 0, "evicted": 0}
+
+    def get(self, game_id: str, idempotency_key: Optional[str] = None, step_number: Optional[int] = None) -> Optional[StepResponse]:
+        """The stored response for this key (or, without a key, for this step number), if any"""
+        if idempotency_key is not None:
+            entry = ("key", game_id, idempotency_key)
+        elif step_number is not None:
+            entry = ("step", game_id, step_number)
+        else:
+            return None
+        response = self._entries.get(entry)
+        if response is not None:
+            self._entries.move_to_end(entry)
+            self.stats["replays"] += 1
+        return response
+
+    def put(self, response: StepResponse, idempotency_key: Optional[str] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        entries = [("step", response.game_id, response.step_number)]
+        if idempotency_key is not None:
+            entries.append(("key", response.game_id, idempotency_key))
+        for entry in entries:
+            self._entries[entry] = response
+            self._entries.move_to_end(entry)
+        self.stats["stored"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,15 +1,71 @@
-import os
-from fastapi import FastAPI
+import time
+
+_import_started = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, PlainTextResponse
+from src.core.log import configure_logging
+from src.core.loop_monitor import RequestScopeMiddleware, loop_monitor
+from src.core.metrics import register_collector, render_metrics
+from src.core.profiling import ProfilingMiddleware, request_profiler
+from src.core.settings import load_settings
+from src.core.tenancy import TenantMiddleware
+from src.core.tts_service import tts_service
+from src.core.usage import usage_meter
+from src.features.impostor_game.history import History
 from src.features.impostor_game.routes import router as impostor_router
+from src.features.impostor_game.service import ImpostorGameService
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent importing the app and in each startup phase (exported by /ready and /metrics)
+startup_timings = {"import": 0.0}
 
-load_dotenv()  # Load from current directory (backend/.env)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Read the settings, configure the process-wide services and, with IMPOSTOR_WARMUP, create the game service"""
+    started = time.perf_counter()
+    settings = load_settings()
+    configure_logging(settings=settings)
+    usage_meter.configure(settings)
+    TenantMiddleware.configure(settings.client_api_keys)
+    tts_service.configure(settings)
+    request_profiler.configure(settings.admin_token, settings.profile_interval_s, settings.profile_keep)
+    History.configure(settings.history_hot_items, settings.history_segment_items, settings.history_spill_dir)
+    app.state.settings = settings
+    app.state.ready = False
+    startup_timings["configure"] = time.perf_counter() - started
+    if not tts_service.api_key:
+        logger.warning("ElevenLabs API key not found. TTS disabled.")
+    if settings.loop_monitor_interval_s > 0:
+        loop_monitor.start(settings.loop_monitor_interval_s, settings.loop_stall_s)
+
+    if settings.warmup:
+        warmup_started = time.perf_counter()
+        app.state.game_service = ImpostorGameService(settings)
+        await app.state.game_service.warmup()
+        startup_timings["warmup"] = time.perf_counter() - warmup_started
+    startup_timings["startup"] = time.perf_counter() - started
+    app.state.ready = True
+    logger.info("Startup complete", extra={f"{phase}_s": round(seconds, 4) for phase, seconds in startup_timings.items()})
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await loop_monitor.stop()
+        service = getattr(app.state, "game_service", None)
+        if service is not None:
+            await service.close()
 
 app = FastAPI(
     title="Agentic Gaming API",
     description="API pour des jeux d'agents IA - Incluant le jeu de l'imposteur",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -19,6 +75,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TenantMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestScopeMiddleware)
 
 app.include_router(impostor_router)
 
@@ -29,6 +88,9 @@ async def root():
         "available_endpoints": {
             "impostor_game": "/impostor-game/",
             "health": "/impostor-game/health",
+            "ready": "/ready",
+            "loop": "/debug/loop",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -37,7 +99,88 @@ async def root():
 async def health():
     return {"status": "healthy", "api": "agentic-gaming"}
 
+@app.get("/ready")
+async def ready():
+    """Prêt à recevoir du trafic une fois le démarrage (et l'éventuel préchauffage) terminé"""
+    timings = {phase: round(seconds, 4) for phase, seconds in startup_timings.items()}
+    if not getattr(app.state, "ready", False):
+        return JSONResponse({"status": "starting", "startup_s": timings}, status_code=503)
+    return {"status": "ready", "startup_s": timings}
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if request_profiler.token is None:
+        raise HTTPException(status_code=404, detail="Endpoints d'administration désactivés (IMPOSTOR_ADMIN_TOKEN)")
+    if not request_profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Jeton d'administration invalide")
+
+@app.get("/debug/loop", dependencies=[Depends(require_admin)])
+async def debug_loop():
+    """Retard de la boucle d'événements et derniers blocages (avec la pile, le jeu et la route en cause)"""
+    return loop_monitor.snapshot()
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Derniers profils de requêtes (demandés avec l'en-tête X-Profile), du plus récent au plus ancien"""
+    return [profile.as_dict() for profile in reversed(request_profiler.profiles.values())]
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str, format: str = "json"):
+    """
+    Profil d'une requête: temps CPU, temps d'attente par appel et piles échantillonnées.
+    `format=folded` renvoie les piles au format flamegraph (flamegraph.pl, speedscope).
+    """
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    if format == "folded":
+        return PlainTextResponse(profile.folded())
+    return profile.as_dict(stacks=True)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Compteurs d'usage (tokens, TTS, coût) au format Prometheus"""
+    return render_metrics()
+
+def _collect_startup_metrics():
+    yield "impostor_startup_seconds", "gauge", "Seconds spent importing the app and in each startup phase", [
+        ({"phase": phase}, seconds) for phase, seconds in startup_timings.items()
+    ]
+
+def _collect_service_metrics():
+    service = getattr(app.state, "game_service", None)
+    if service is None:
+        return
+    yield from service.admission.collect()
+    yield from service.spectators.collect()
+    yield "impostor_load", "gauge", "Work resident on this worker, against the admission limits", [
+        ({"resource": "active_games"}, service.active_game_count()),
+        ({"resource": "steps_in_flight"}, service.admission.steps_reserved),
+        ({"resource": "llm_inflight"}, service.llm_client.inflight),
+    ]
+
+def _collect_scheduler_metrics():
+    schedulers = [("tts", tts_service.scheduler)]
+    service = getattr(app.state, "game_service", None)
+    if service is not None:
+        schedulers.insert(0, ("llm", service.llm_client.scheduler))
+    yield "impostor_provider_calls_total", "counter", "Provider calls per priority class", [
+        ({"provider": provider, "priority": priority}, stats["calls"])
+        for provider, scheduler in schedulers for priority, stats in scheduler.stats.items()
+    ]
+    yield "impostor_provider_queue_wait_seconds_total", "counter", "Seconds provider calls waited for a slot, per priority class", [
+        ({"provider": provider, "priority": priority}, stats["wait_s"])
+        for provider, scheduler in schedulers for priority, stats in scheduler.stats.items()
+    ]
+    yield "impostor_provider_queued", "gauge", "Provider calls waiting for a slot", [
+        ({"provider": provider}, scheduler.queued) for provider, scheduler in schedulers
+    ]
+
+register_collector(_collect_startup_metrics)
+register_collector(_collect_service_metrics)
+register_collector(_collect_scheduler_metrics)
+
+startup_timings["import"] = time.perf_counter() - _import_started
+
 if __name__ == "__main__":
     import uvicorn
-    port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=load_settings().port)
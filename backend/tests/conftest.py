@@ -0,0 +1,25 @@
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture(autouse=True)
+def no_event_logs(monkeypatch):
+    """Keep event logs off unless a test points them at its tmp_path (an empty value also wins over backend/.env)"""
+    monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+
+
+@pytest.fixture
+def mock_llm():
+    """Stand-in for `generate_response`: the moderator picks Red, every agent asks Blue where they were"""
+    async def generate_response(messages, **kwargs):
+        if "moderating" in messages[-1]["content"]:
+            return "Red"
+        return '{"think": "thinking", "speak": "Blue, where were you?", "impostor_hypothesis": "blue", "vote": null}'
+    return generate_response
+
+
+@pytest.fixture
+def no_tts():
+    """Speech synthesis returns no audio"""
+    with patch('src.core.tts_service.tts_service.text_to_speech', return_value=None):
+        yield
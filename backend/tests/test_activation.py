@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import patch
+from src.features.impostor_game.service import ImpostorGameService
+from src.features.impostor_game.activation import ActivationScheduler, carry_forward_turn
+from src.features.impostor_game.schema import (
+    Agent, AgentAction, ActionType, GameState, GameStatus, GamePhase, MeetingTrigger
+)
+
+COLORS = ["red", "blue", "green", "yellow", "orange", "pink", "purple", "cyan"]
+
+
+def make_game(step_number: int = 5, max_steps: int = 30) -> GameState:
+    agents = [Agent(id=c, name=c.capitalize(), color=c, is_impostor=(c == "yellow")) for c in COLORS]
+    return GameState(
+        game_id="test",
+        status=GameStatus.ACTIVE,
+        phase=GamePhase.ACTIVE,
+        step_number=step_number,
+        max_steps=max_steps,
+        agents=agents,
+        public_action_history=[],
+        impostor_id="yellow",
+        meeting_trigger=MeetingTrigger.DEAD_BODY,
+        reporter_id="red",
+        meeting_reason="Red found Green's body in Electrical",
+        last_active_step={c: step_number - 1 for c in COLORS},
+    )
+
+
+class TestActivationScheduler:
+    """Test selective agent activation"""
+
+    def test_bounds_active_agents(self):
+        """No more than max_active agents think per step in an 8 player lobby"""
+        game = make_game()
+        active = ActivationScheduler(max_active=3).select(game, game.agents)
+        assert len(active) == 3
+
+    def test_unbounded_when_cap_disabled(self):
+        game = make_game()
+        assert len(ActivationScheduler(max_active=0).select(game, game.agents)) == 8
+
+    def test_addressed_and_accused_agents_are_activated(self):
+        """Agents named or voted against in recent history get priority"""
+        game = make_game()
+        game.public_action_history = [
+            AgentAction(agent_id="red", action_type=ActionType.SPEAK, content="Cyan, where were you?"),
+            AgentAction(agent_id="blue", action_type=ActionType.VOTE, content="I vote to eliminate pink", target_agent_id="pink"),
+        ]
+        active_ids = [a.id for a in ActivationScheduler(max_active=2).select(game, game.agents)]
+        assert set(active_ids) == {"cyan", "pink"}
+
+    def test_idle_agents_are_eventually_activated(self):
+        """An agent idle for longer than max_idle_steps is forced in"""
+        game = make_game(step_number=10)
+        game.last_active_step["purple"] = 2
+        game.public_action_history = [
+            AgentAction(agent_id="red", action_type=ActionType.SPEAK, content="Blue and cyan, explain yourselves"),
+        ]
+        active_ids = [a.id for a in ActivationScheduler(max_active=2, max_idle_steps=3).select(game, game.agents)]
+        assert "purple" in active_ids
+
+    def test_carry_forward_keeps_last_hypothesis(self):
+        game = make_game()
+        game.impostor_hypotheses["blue"] = "yellow"
+        turn = carry_forward_turn(game, game.agents[1])
+        assert turn.idle
+        assert turn.impostor_hypothesis == "yellow"
+        assert turn.speak is None and turn.vote is None
+        assert turn.memory_update.step_number == game.step_number
+
+
+class TestActivationInStep:
+    """Test that step_game only calls the LLM for activated agents"""
+
+    @pytest.fixture
+    def game_service(self):
+        service = ImpostorGameService()
+        service.activation_scheduler = ActivationScheduler(max_active=2)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_inactive_agents_skip_llm_call(self, game_service):
+        game_id = game_service.create_game().game_id
+        calls = []
+
+        async def mock_llm(messages, **kwargs):
+            calls.append(messages)
+            return '{"think": "thinking", "speak": null, "impostor_hypothesis": "yellow", "vote": null}'
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+            result = await game_service.step_game(game_id)
+
+        game = game_service.get_game(game_id)
+        assert len(calls) == 2
+        assert len(result.turns) == 3
+        idle_turns = [t for t in result.turns if t.idle]
+        assert len(idle_turns) == 1
+        # Idle agents keep memory continuity but do not get a new private thought
+        assert idle_turns[0].agent_id not in game.private_thoughts
+        assert all(len(a.memory_history) == 1 for a in game.agents if a.is_alive)
+        assert set(game.impostor_hypotheses.values()) == {"yellow"}
+
+    @pytest.mark.asyncio
+    async def test_default_roster_activates_everyone(self):
+        """At the default settings the scenario's roster fits under the cap: no agent is skipped"""
+        service = ImpostorGameService()
+        game_id = service.create_game(num_players=8).game_id
+        calls = []
+
+        async def mock_llm(messages, **kwargs):
+            calls.append(messages)
+            return '{"think": "thinking", "speak": null, "impostor_hypothesis": "yellow", "vote": null}'
+
+        with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+            result = await service.step_game(game_id)
+
+        game = service.get_game(game_id)
+        assert len(game.agents) == 4 and service.activation_scheduler.max_active == 4
+        assert len(calls) == 3
+        assert len(result.turns) == 3 and not any(t.idle for t in result.turns)
@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.core.admission import AdmissionController, Overloaded
+from src.core.settings import Settings
+from src.features.impostor_game.service import ImpostorGameService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdmissionController:
+    """Test the per-client rate limit and the capacity limits"""
+
+    def test_client_rate_limit(self):
+        clock = FakeClock()
+        admission = AdmissionController(client_rate=2.0, client_burst=3, clock=clock)
+        for _ in range(3):
+            admission.check_client("a")
+        with pytest.raises(Overloaded) as refused:
+            admission.check_client("a")
+        assert refused.value.status_code == 429 and refused.value.headers == {"Retry-After": "1"}
+        admission.check_client("b")  # buckets are per client
+
+        clock.now = 0.5
+        admission.check_client("a")
+        assert admission.stats["rate_limited"] == 1
+
+    def test_capacity_limits(self):
+        admission = AdmissionController(max_games=2, max_steps=1, max_llm_inflight=4)
+        admission.admit_game("a", active_games=1)
+        with pytest.raises(Overloaded) as refused:
+            admission.admit_game("a", active_games=2)
+        assert refused.value.status_code == 503 and refused.value.reason == "games_full"
+
+        admission.record_step(12.2)
+        admission.admit_step("a", llm_inflight=0)
+        with pytest.raises(Overloaded) as refused:
+            admission.admit_step("b", llm_inflight=0)  # the first step's slot is held from admission
+        assert refused.value.headers == {"Retry-After": "13"}
+        admission.release_step()
+        with pytest.raises(Overloaded):
+            admission.admit_step("a", llm_inflight=4)
+        admission.admit_step("a", llm_inflight=3)
+        assert admission.steps_reserved == 1
+        assert admission.stats == {"admitted": 3, "rate_limited": 0, "games_full": 1, "steps_full": 1, "llm_full": 1}
+
+    def test_made_up_keys_share_their_address_bucket(self):
+        from src.core.tenancy import tenant_from_api_key, tenant_var
+        admission = AdmissionController(client_rate=1.0, client_burst=1, known_tenants=frozenset({tenant_from_api_key("real")}))
+        scope = {"client": ("10.0.0.1", 1234)}
+        for key, client in (("real", tenant_from_api_key("real")), ("random-1", "ip-10.0.0.1"), ("random-2", "ip-10.0.0.1"), (None, "ip-10.0.0.1")):
+            token = tenant_var.set(tenant_from_api_key(key))
+            assert admission.client_of(scope) == client
+            tenant_var.reset(token)
+
+
+class TestServiceAdmission:
+    """Test what the service counts against the limits"""
+
+    @pytest.mark.asyncio
+    async def test_finished_and_idle_games_free_their_slot(self, mock_llm, no_tts):
+        service = ImpostorGameService(Settings(event_log_dir=None, max_games=2, game_idle_s=60))
+        first = service.create_game(max_steps=5).game_id
+        service.create_game()
+        with pytest.raises(Overloaded):
+            service.admit_game("a")
+
+        with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+            async for _ in service.step_games([first], until_game_over=True):
+                assert service.admission.steps_reserved <= 1
+        assert service.admission.steps_reserved == 0  # each bulk step held a slot only while it ran
+        service.admit_game("a")
+
+        service.create_game()
+        with patch('src.features.impostor_game.service.time.monotonic', return_value=10 ** 9):
+            assert service.active_game_count() == 0
+
+
+class TestAdmissionEndpoints:
+    """Test fast refusals with Retry-After"""
+
+    def test_refusals(self, monkeypatch, mock_llm):
+        from src.main import app
+        from src.core.tenancy import TenantMiddleware, tenants_of_keys
+        from src.features.impostor_game import routes
+        monkeypatch.setattr(TenantMiddleware, "known_tenants", tenants_of_keys("other"))
+        service = ImpostorGameService(Settings(event_log_dir=None, max_games=1, max_llm_inflight=2, client_rate=0.001, client_burst=2, client_api_keys="other"))
+        app.dependency_overrides[routes.get_game_service] = lambda: service
+        client = TestClient(app)
+        try:
+            game_id = client.post("/impostor-game/init").json()["game_id"]
+            full = client.post("/impostor-game/init", headers={"X-API-Key": "other"})
+            assert full.status_code == 503 and int(full.headers["Retry-After"]) >= 1
+
+            service.llm_client.inflight = 2
+            busy = client.post(f"/impostor-game/step/{game_id}")
+            assert busy.status_code == 503 and service.get_game(game_id).step_number == 1
+            service.llm_client.inflight = 0
+
+            with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+                limited = client.post(f"/impostor-game/step/{game_id}")
+            assert limited.status_code == 429 and "Retry-After" in limited.headers
+            assert client.get(f"/impostor-game/debug/{game_id}").json()["admission"]["rate_limited"] == 1
+            assert service.admission.steps_reserved == 0  # refused and finished steps gave their slot back
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.core.settings import Settings
+from src.features.impostor_game.service import ImpostorGameService
+
+
+pytestmark = pytest.mark.usefixtures("no_tts")
+
+
+def make_service(**settings):
+    return ImpostorGameService(Settings(event_log_dir=None, **settings))
+
+
+class TestStepGames:
+    """Test advancing several games in one call"""
+
+    @pytest.mark.asyncio
+    async def test_steps_per_game_in_order(self, mock_llm):
+        service = make_service()
+        game_ids = [service.create_game().game_id for _ in range(3)]
+        with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+            summaries = [s async for s in service.step_games(game_ids + ["missing"], steps=2)]
+
+        for game_id in game_ids:
+            assert [s.step_number for s in summaries if s.game_id == game_id] == [1, 2]
+            assert service.get_game(game_id).step_number == 3
+        step = next(s for s in summaries if s.game_id == game_ids[0])
+        assert step.speaker == "red" and step.speech == "Blue, where were you?" and step.votes == {}
+        assert [s.error for s in summaries if s.game_id == "missing"] == ["not_found"]
+        assert service.bulk_stats == {"requests": 1, "steps": 6, "errors": 1}
+
+    @pytest.mark.asyncio
+    async def test_until_game_over(self, mock_llm):
+        service = make_service()
+        game_id = service.create_game(max_steps=5).game_id
+        with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+            summaries = [s async for s in service.step_games([game_id], until_game_over=True)]
+        assert [s.game_over for s in summaries] == [False] * 4 + [True]
+        assert summaries[-1].winner == "Imposteur"
+
+    @pytest.mark.asyncio
+    async def test_shared_concurrency_limit(self, mock_llm):
+        service = make_service(bulk_concurrency=2)
+        game_ids = [service.create_game().game_id for _ in range(4)]
+        peak = 0
+
+        async def slow_llm(messages, **kwargs):
+            nonlocal peak
+            peak = max(peak, len(service.inflight_steps))
+            await asyncio.sleep(0.01)
+            return await mock_llm(messages)
+
+        async def drain(summaries):
+            return [summary async for summary in summaries]
+
+        # Two bulk requests of two games each share the two slots
+        with patch.object(service.llm_client, 'generate_response', side_effect=slow_llm):
+            await asyncio.gather(drain(service.step_games(game_ids[:2])), drain(service.step_games(game_ids[2:])))
+        assert peak == 2
+        assert all(service.get_game(game_id).step_number == 2 for game_id in game_ids)
+
+
+class TestBulkStepEndpoint:
+    """Test the bulk step endpoint, buffered and streamed"""
+
+    def test_bulk_and_streamed(self, mock_llm):
+        from src.main import app
+        from src.features.impostor_game import routes
+        service = make_service()
+        app.dependency_overrides[routes.get_game_service] = lambda: service
+        client = TestClient(app)
+        try:
+            game_ids = [client.post("/impostor-game/init").json()["game_id"] for _ in range(2)]
+            with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+                body = client.post("/impostor-game/bulk-step", json={"game_ids": game_ids, "steps": 2}).json()
+                assert body["steps_run"] == 4 and body["errors"] == 0
+                assert "conversation_history" not in body["summaries"][0]
+
+                streamed = client.post("/impostor-game/bulk-step?stream=true", json={"game_ids": game_ids[:1], "until": "game_over"})
+            assert streamed.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in streamed.text.splitlines()]
+            assert lines[0]["step_number"] == 3 and lines[-1]["game_over"]
+
+            assert client.post("/impostor-game/bulk-step", json={"game_ids": []}).status_code == 400
+            assert client.post("/impostor-game/bulk-step", json={"game_ids": game_ids, "until": "forever"}).status_code == 400
+            assert client.post("/impostor-game/bulk-step", json={"game_ids": [game_ids[0]] * 2}).status_code == 400
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.features.impostor_game.service import ImpostorGameService, StepCancelled
+
+
+class TestStepCancellation:
+    """Test cancelling in-flight steps and rolling back to the last committed step"""
+
+    @pytest.fixture
+    def game_service(self):
+        return ImpostorGameService()
+
+    @pytest.mark.asyncio
+    async def test_cancel_rolls_back_and_reports_calls(self, game_service):
+        game_id = game_service.create_game().game_id
+        game = game_service.get_game(game_id)
+
+        async def mock_llm(messages, **kwargs):
+            # Red answers immediately, everyone else hangs
+            if messages[0]["content"].startswith("You are Red"):
+                return '{"think": "quick", "speak": "hi", "vote": "yellow"}'
+            await asyncio.sleep(10)
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+            step = asyncio.ensure_future(game_service.run_step(game_id))
+            await asyncio.sleep(0.1)
+            assert game_service.cancel_step(game_id)
+            with pytest.raises(StepCancelled):
+                await step
+
+        # Nothing from the abandoned step was committed
+        assert game.step_number == 1
+        assert game.public_action_history == []
+        assert game.private_thoughts == {}
+        assert game.current_votes == {}
+        assert all(len(a.memory_history) == 0 for a in game.agents)
+        assert game_id not in game_service.inflight_steps
+
+        stats = game_service.cancellation_stats
+        assert stats["cancelled_steps"] == 1
+        assert stats["llm_calls_wasted"] == 1
+        # Two hanging agent calls plus the speaker selection that never happened
+        assert stats["llm_calls_saved"] == 3
+        assert game.counters["cancelled_steps"] == 1
+
+    @pytest.mark.asyncio
+    async def test_caller_cancellation_cancels_step(self, game_service):
+        game_id = game_service.create_game().game_id
+        started = asyncio.Event()
+
+        async def mock_llm(messages, **kwargs):
+            started.set()
+            await asyncio.sleep(10)
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+            caller = asyncio.ensure_future(game_service.run_step(game_id))
+            await started.wait()
+            inflight = game_service.inflight_steps[game_id]
+            caller.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+            await asyncio.sleep(0)
+
+        assert inflight.cancelled()
+        assert game_service.get_game(game_id).step_number == 1
+
+    @pytest.mark.asyncio
+    async def test_speech_cancelled_in_flight_is_wasted(self, game_service, monkeypatch, mock_llm):
+        from src.core.tts_service import tts_service
+        from src.core.usage import UsageMeter
+        meter = UsageMeter()
+        monkeypatch.setattr("src.core.tts_service.usage_meter", meter)
+        monkeypatch.setattr(tts_service, "api_key", "test")
+        game_id = game_service.create_game().game_id
+        sent = asyncio.Event()
+
+        async def hanging_post(self, url, **kwargs):
+            sent.set()
+            await asyncio.sleep(10)
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm), \
+             patch("httpx.AsyncClient.post", hanging_post):
+            step = asyncio.ensure_future(game_service.run_step(game_id))
+            await sent.wait()
+            assert game_service.cancel_step(game_id)
+            with pytest.raises(StepCancelled):
+                await step
+
+        # The request reached the provider: billed, not saved
+        stats = game_service.cancellation_stats
+        assert stats["tts_calls_wasted"] == 1 and stats["tts_calls_saved"] == 0
+        assert meter.total.tts_characters == len("Blue, where were you?")
+
+    @pytest.mark.asyncio
+    async def test_cancel_without_running_step(self, game_service):
+        game_id = game_service.create_game().game_id
+        assert not game_service.cancel_step(game_id)
+
+    @pytest.mark.asyncio
+    async def test_run_step_returns_result(self, game_service):
+        game_id = game_service.create_game().game_id
+
+        async def mock_llm(messages, **kwargs):
+            return '{"think": "thinking", "speak": null, "vote": null}'
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+            result = await game_service.run_step(game_id)
+        assert result.step_number == 1
+        assert game_service.get_game(game_id).step_number == 2
+        assert game_service.cancellation_stats["cancelled_steps"] == 0
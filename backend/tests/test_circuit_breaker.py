@@ -0,0 +1,136 @@
+import time
+import httpx
+import anthropic
+import pytest
+from unittest.mock import patch
+from src.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from src.core.llm_client import LLMClient, LLMProviderError, LLMUnavailableError
+from src.features.impostor_game.service import ImpostorGameService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def status_error(status: int) -> anthropic.APIStatusError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    return anthropic.APIStatusError("error", response=httpx.Response(status, request=request), body=None)
+
+
+class TestCircuitBreaker:
+    """Test the closed / open / half-open transitions"""
+
+    def test_opens_when_failure_rate_trips(self):
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, window=4, clock=FakeClock())
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED  # not enough calls yet
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.stats == {"opened": 1, "rejected": 1, "probes": 0}
+
+    def test_half_open_lets_one_probe_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(min_calls=1, open_seconds=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # only one probe at a time
+
+        breaker.record_failure()  # probe failed: open again for a full period
+        assert breaker.state == OPEN
+        clock.now = 15
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        clock.now = 20
+        breaker.before_call()
+        breaker.record_success()
+        breaker.release()
+        assert breaker.state == CLOSED
+        breaker.before_call()
+
+    def test_cancelled_probe_frees_the_slot(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(min_calls=1, open_seconds=1, clock=clock)
+        breaker.record_failure()
+        clock.now = 1
+        breaker.before_call()
+        breaker.release()
+        breaker.before_call()
+        assert breaker.stats["probes"] == 2
+
+
+class TestLLMClientErrors:
+    """Test typed LLM failures and failing fast while the circuit is open"""
+
+    @pytest.fixture
+    def client(self):
+        client = LLMClient()
+        client.breaker = CircuitBreaker(min_calls=2, window=2, open_seconds=60)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_outages_open_the_circuit_and_calls_fail_fast(self, client):
+        calls = []
+
+        async def create(**params):
+            calls.append(params)
+            raise status_error(529)
+
+        client.client.messages.create = create
+        for _ in range(2):
+            with pytest.raises(LLMProviderError) as excinfo:
+                await client.generate_response([{"role": "user", "content": "hi"}])
+            assert isinstance(excinfo.value.__cause__, anthropic.APIStatusError)
+
+        with pytest.raises(LLMUnavailableError):
+            await client.generate_response([{"role": "user", "content": "hi"}])
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_requests_do_not_open_the_circuit(self, client):
+        async def create(**params):
+            raise status_error(400)
+
+        client.client.messages.create = create
+        for _ in range(3):
+            with pytest.raises(LLMProviderError):
+                await client.generate_response([{"role": "user", "content": "hi"}])
+        assert client.breaker.state == CLOSED
+
+
+class TestStepDuringOutage:
+    """Test that steps stay fast and deterministic while the provider is down"""
+
+    @pytest.mark.asyncio
+    async def test_failed_calls_get_degraded_turns(self, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        service = ImpostorGameService()
+        game_id = service.create_game().game_id
+        game = service.get_game(game_id)
+        game.impostor_hypotheses["blue"] = "yellow"
+
+        async def unavailable(messages, **kwargs):
+            raise LLMUnavailableError(30)
+
+        start = time.monotonic()
+        with patch('src.core.tts_service.tts_service.text_to_speech', return_value=None), \
+             patch.object(service.llm_client, 'generate_response', side_effect=unavailable):
+            result = await service.step_game(game_id)
+        assert time.monotonic() - start < 1
+
+        assert result is not None and all(turn.degraded for turn in result.turns)
+        assert next(t for t in result.turns if t.agent_id == "blue").impostor_hypothesis == "yellow"
+        assert game.counters["llm_failures"] == len(result.turns)
+        assert "deadline_misses" not in game.counters
+        assert game.step_number == 2
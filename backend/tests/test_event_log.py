@@ -0,0 +1,181 @@
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.main import app
+from src.features.impostor_game import routes
+from src.features.impostor_game.event_log import GameEventLog
+from src.features.impostor_game.service import ImpostorGameService
+
+
+async def voting_llm(messages, **kwargs):
+    """Everyone suspects and votes yellow (the impostor); the moderator picks Red"""
+    if "moderating" in messages[-1]["content"]:
+        return "Red"
+    return '{"think": "Yellow faked the card swipe", "speak": "It is yellow", "impostor_hypothesis": "yellow", "vote": "yellow"}'
+
+
+class TestEventLog:
+    """Test the per-game event log and rebuilding games from it"""
+
+    @pytest.fixture
+    def game_service(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", str(tmp_path))
+        return ImpostorGameService()
+
+    @pytest.mark.asyncio
+    async def test_log_records_every_transition(self, game_service):
+        game_id = game_service.create_game().game_id
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=voting_llm):
+            result = await game_service.step_game(game_id)
+        assert result.game_over
+
+        events = list(game_service.event_log.iter_events(game_id))
+        assert [e["type"] for e in events] == ["game_created", "step"]
+        assert [e["seq"] for e in events] == [0, 1]
+        step = events[1]
+        assert step["eliminated"] == "yellow"
+        assert step["winner"] == "Crewmates"
+        assert [a["action_type"] for a in step["actions"]] == ["speak", "vote", "vote", "vote"]
+        # Compact encoding: no whitespace, no null fields
+        path = game_service.event_log.path(game_id)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert ": " not in lines[1] and "null" not in lines[0]
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_live_state(self, game_service, tmp_path):
+        game_id = game_service.create_game(max_steps=5).game_id
+        quiet = '{"think": "Hmm", "speak": "Where was everyone?", "impostor_hypothesis": "blue", "vote": null}'
+
+        async def quiet_llm(messages, **kwargs):
+            return "Blue" if "moderating" in messages[-1]["content"] else quiet
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=quiet_llm):
+            for _ in range(2):
+                await game_service.step_game(game_id)
+        live = game_service.get_game(game_id)
+
+        # A new process (no games in memory) rebuilds the game from its log
+        other = ImpostorGameService()
+        calls = []
+        with patch.object(other.llm_client, 'generate_response', side_effect=lambda *a, **k: calls.append(a)):
+            assert other.get_game(game_id) is None
+            rebuilt = await other.sync_game(game_id)
+        assert calls == []
+        assert rebuilt.model_dump(exclude={"counters"}) == live.model_dump(exclude={"counters"})
+
+    @pytest.mark.asyncio
+    async def test_logged_games_are_read_off_the_event_loop(self, game_service):
+        import threading
+        game_id = game_service.create_game().game_id
+        other = ImpostorGameService()
+        rebuild, readers = other.event_log.rebuild, []
+
+        def tracking_rebuild(game_id):
+            readers.append(threading.current_thread() is threading.main_thread())
+            return rebuild(game_id)
+
+        with patch.object(other.event_log, 'rebuild', side_effect=tracking_rebuild):
+            assert (await other.sync_game(game_id)).game_id == game_id
+            await other.sync_game(game_id)
+        assert readers == [False]
+
+    def test_invalid_game_ids_never_touch_the_filesystem(self, game_service):
+        assert game_service.event_log.path("../../etc/passwd") is None
+        assert not game_service.event_log.exists("../secret")
+
+    def test_appends_are_written_by_the_writer_thread(self, tmp_path):
+        import builtins, threading
+        log = GameEventLog(str(tmp_path))
+        game_id = "00000000-0000-0000-0000-000000000001"
+        real_open, writers = builtins.open, []
+
+        def tracking_open(path, mode="r", *args, **kwargs):
+            if mode == "a":
+                writers.append(threading.current_thread().name)
+            return real_open(path, mode, *args, **kwargs)
+
+        with patch("builtins.open", side_effect=tracking_open):
+            for seq in range(3):
+                log.append(game_id, {"type": "game_created" if seq == 0 else "step", "step": seq}, seq)
+            log.flush()
+        assert writers and set(writers) == {"event-log-writer"}
+        assert [e["seq"] for e in log.iter_events(game_id)] == [0, 1, 2]
+        log.close()
+
+    def test_retention_keeps_recent_logs_and_their_parents(self, tmp_path):
+        import os
+        log = GameEventLog(str(tmp_path), retention_s=3600)
+        old, parent, fork = "00000000-0000-0000-0000-00000000000%d", "10000000-0000-0000-0000-000000000000", "20000000-0000-0000-0000-000000000000"
+        for game_id in (old % 1, old % 2, parent):
+            log.append(game_id, {"type": "game_created", "state": {}}, 0)
+        log.append(fork, {"type": "game_forked", "parent": parent, "at_step": 1}, 0)
+        log.flush()
+        (tmp_path / "notes.jsonl").write_text("")
+        stale = os.path.getmtime(log.path(fork)) - 7200
+        for game_id in (old % 1, old % 2, parent):
+            os.utime(log.path(game_id), (stale, stale))
+
+        assert GameEventLog(str(tmp_path), retention_s=3600).prune() == 0  # pruned on opening already
+        assert sorted(os.listdir(tmp_path)) == sorted(["notes.jsonl", f"{parent}.jsonl", f"{fork}.jsonl"])
+        assert GameEventLog(str(tmp_path)).prune() == 0  # no retention: keep everything
+
+    def test_disabled_log(self):
+        log = GameEventLog("")
+        assert not log.enabled
+        log.append("00000000-0000-0000-0000-000000000000", {"type": "game_over"}, 1)
+        assert list(log.iter_events("00000000-0000-0000-0000-000000000000")) == []
+
+
+class TestReplayEndpoint:
+    """Test streaming a finished game back from its log"""
+
+    def test_replay_streams_events(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", str(tmp_path))
+        service = ImpostorGameService()
+        app.dependency_overrides[routes.get_game_service] = lambda: service
+        client = TestClient(app)
+        try:
+            game_id = client.post("/impostor-game/init").json()["game_id"]
+            with patch.object(service.llm_client, 'generate_response', side_effect=voting_llm):
+                client.post(f"/impostor-game/step/{game_id}")
+
+            with patch.object(service.llm_client, 'generate_response') as llm:
+                response = client.get(f"/impostor-game/replay/{game_id}?speed=0")
+                assert llm.call_count == 0
+            assert response.status_code == 200
+            events = [json.loads(line) for line in response.text.splitlines()]
+            assert [e["type"] for e in events] == ["game_created", "step"]
+
+            assert client.get(f"/impostor-game/replay/{game_id}?speed=-1").status_code == 400
+            missing = client.get("/impostor-game/replay/00000000-0000-0000-0000-000000000000")
+            assert missing.status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_fork_replay_starts_with_its_parent(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", str(tmp_path))
+        service = ImpostorGameService()
+        app.dependency_overrides[routes.get_game_service] = lambda: service
+        client = TestClient(app)
+        quiet = '{"think": "Hmm", "speak": "Where was everyone?", "impostor_hypothesis": "blue", "vote": null}'
+
+        async def quiet_llm(messages, **kwargs):
+            return "Blue" if "moderating" in messages[-1]["content"] else quiet
+
+        try:
+            game_id = client.post("/impostor-game/init").json()["game_id"]
+            with patch.object(service.llm_client, 'generate_response', side_effect=quiet_llm):
+                client.post(f"/impostor-game/step/{game_id}")
+                client.post(f"/impostor-game/step/{game_id}")
+                fork_id = client.post(f"/impostor-game/fork/{game_id}?at_step=2").json()["game_id"]
+                client.post(f"/impostor-game/step/{fork_id}")
+
+            events = [json.loads(line) for line in client.get(f"/impostor-game/replay/{fork_id}?speed=0").text.splitlines()]
+            assert [(e["type"], e.get("step")) for e in events] == [
+                ("game_created", None), ("step", 1), ("game_forked", None), ("step", 2)
+            ]
+            assert events[2]["parent"] == game_id
+        finally:
+            app.dependency_overrides.clear()
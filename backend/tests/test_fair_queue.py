@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.core.fair_queue import FairScheduler, parse_weights, priority_var
+from src.core.settings import Settings
+from src.features.impostor_game.service import ImpostorGameService
+
+
+async def grant_order(scheduler, calls):
+    """Queue `calls` ((priority, flow) pairs) behind a held slot and return the order they are served in"""
+    order = []
+
+    async def call(priority, flow):
+        async with scheduler.slot(priority, flow):
+            order.append((priority, flow))
+            await asyncio.sleep(0)
+
+    await scheduler.acquire("interactive", "holder")
+    tasks = [asyncio.ensure_future(call(priority, flow)) for priority, flow in calls]
+    await asyncio.sleep(0)
+    assert scheduler.queued == len(calls)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+class TestFairScheduler:
+    """Test weighted fair queuing across classes and games"""
+
+    @pytest.mark.asyncio
+    async def test_weighted_classes(self):
+        scheduler = FairScheduler(capacity=1, weights=parse_weights("interactive=3, batch=1"))
+        order = await grant_order(scheduler, [("batch", "b")] * 4 + [("interactive", "i")] * 4)
+        assert [priority[0] for priority, _ in order] == list("biiibibb")
+        assert scheduler.stats["batch"]["waited"] == 4 and scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_games_take_turns_within_a_class(self):
+        scheduler = FairScheduler(capacity=1)
+        order = await grant_order(scheduler, [("batch", "a")] * 3 + [("batch", "b")])
+        assert [flow for _, flow in order] == ["a", "b", "a", "a"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = FairScheduler(capacity=1)
+        await scheduler.acquire("batch", "a")
+        waiter = asyncio.ensure_future(scheduler.acquire("batch", "b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queued == 0
+        scheduler.release()
+        assert scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_racing_a_release(self):
+        scheduler = FairScheduler(capacity=1)
+        await scheduler.acquire("batch", "holder")
+        cancelled, granted, served = (asyncio.ensure_future(scheduler.acquire("batch", flow)) for flow in "abc")
+        await asyncio.sleep(0)
+        # Cancelled before the release pops it: skipped, the slot goes to the next waiter
+        cancelled.cancel()
+        scheduler.release()
+        # Granted the slot, then cancelled before it could run: the slot is passed on
+        granted.cancel()
+        for task in (cancelled, granted):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        await served
+        assert scheduler.running == 1 and scheduler.queued == 0
+        scheduler.release()
+        assert scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_unlimited_capacity_never_queues(self):
+        scheduler = FairScheduler()
+        for _ in range(5):
+            await scheduler.acquire("batch", "a")
+        assert scheduler.running == 5 and scheduler.queued == 0
+
+
+class TestGamePriority:
+    """Test that a game's calls are made in its priority class"""
+
+    @pytest.mark.asyncio
+    async def test_step_binds_priority(self):
+        service = ImpostorGameService(Settings(event_log_dir=None))
+        game_id = service.create_game(priority="batch").game_id
+        seen = set()
+
+        async def recording_llm(messages, **kwargs):
+            seen.add(priority_var.get())
+            if "moderating" in messages[-1]["content"]:
+                return "Red"
+            return '{"think": "t", "speak": "Blue, where were you?", "impostor_hypothesis": "blue", "vote": null}'
+
+        with patch('src.core.tts_service.tts_service.text_to_speech', return_value=None), \
+             patch.object(service.llm_client, 'generate_response', side_effect=recording_llm):
+            await service.run_step(game_id)
+        assert seen == {"batch"} and priority_var.get() == "interactive"
+
+    def test_init_priority(self):
+        from src.main import app
+        from src.features.impostor_game import routes
+        service = ImpostorGameService(Settings(event_log_dir=None))
+        app.dependency_overrides[routes.get_game_service] = lambda: service
+        client = TestClient(app)
+        try:
+            game_id = client.post("/impostor-game/init?priority=batch").json()["game_id"]
+            assert service.get_game(game_id).priority == "batch"
+            assert client.get(f"/impostor-game/debug/{game_id}").json()["priority"] == "batch"
+            assert client.post("/impostor-game/init?priority=urgent").status_code == 400
+        finally:
+            app.dependency_overrides.clear()
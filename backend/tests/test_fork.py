@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.main import app
+from src.features.impostor_game.history import History
+from src.features.impostor_game.event_log import record_checkpoint
+from src.features.impostor_game.schema import AgentAction, ActionType, GameState
+from src.features.impostor_game.service import ImpostorGameService
+
+
+class TestHistory:
+    """Test the copy-on-write history"""
+
+    def test_fork_shares_prefix_and_diverges(self):
+        parent = History([1, 2, 3])
+        fork = parent.fork(2)
+        parent.append(4)
+        fork.append(10)
+        assert list(parent) == [1, 2, 3, 4]
+        assert list(fork) == [1, 2, 10]
+        assert fork[-2:] == [2, 10]
+        assert fork[0] == 1 and fork[-1] == 10
+        assert fork._items == [10]  # only the new write is stored
+
+    def test_fork_of_fork(self):
+        root = History(range(5))
+        child = root.fork(4)
+        child.append("a")
+        grandchild = child.fork(3)
+        grandchild.append("b")
+        assert list(grandchild) == [0, 1, 2, "b"]
+        assert list(child) == [0, 1, 2, 3, "a"]
+        with pytest.raises(IndexError):
+            root.fork(6)
+
+    def test_pydantic_round_trip(self):
+        """History fields validate from lists and serialize back to lists"""
+        service = ImpostorGameService()
+        game = service.get_game(service.create_game().game_id)
+        game.public_action_history.append(AgentAction(agent_id="red", action_type=ActionType.SPEAK, content="hi"))
+        dumped = game.model_dump(mode="json")
+        assert dumped["public_action_history"][0]["content"] == "hi"
+        restored = GameState.model_validate(dumped)
+        assert isinstance(restored.public_action_history, History)
+        assert isinstance(restored.agents[0].memory_history, History)
+        assert restored.public_action_history == game.public_action_history
+
+
+def quiet_llm(step_words):
+    async def llm(messages, **kwargs):
+        if "moderating" in messages[-1]["content"]:
+            return "Red"
+        return f'{{"think": "thinking", "speak": "{step_words.pop(0) if step_words else "..."}", "vote": null}}'
+    return llm
+
+
+class TestForkGame:
+    """Test forking games at a step"""
+
+    @pytest.fixture
+    def game_service(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", str(tmp_path))
+        return ImpostorGameService()
+
+    @pytest.mark.asyncio
+    async def test_fork_restores_state_at_step(self, game_service):
+        game_id = game_service.create_game().game_id
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=quiet_llm(["one"] * 3 + ["two"] * 3 + ["three"] * 3)):
+            for _ in range(3):
+                await game_service.step_game(game_id)
+
+        fork = game_service.fork_game(game_id, at_step=2)
+        forked = game_service.get_game(fork.game_id)
+        parent = game_service.get_game(game_id)
+        assert forked.step_number == 2
+        assert forked.forked_from == game_id
+        assert [a.content for a in forked.public_action_history] == ["one"]
+        assert all(len(a.memory_history) == 1 for a in forked.agents if a.is_alive)
+        assert all(len(t) == 1 for t in forked.private_thoughts.values())
+
+        # Both branches continue independently
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=quiet_llm(["branch"] * 3)):
+            result = await game_service.step_game(fork.game_id)
+        assert result.step_number == 2
+        assert [a.content for a in forked.public_action_history] == ["one", "branch"]
+        assert [a.content for a in parent.public_action_history] == ["one", "two", "three"]
+        assert parent.step_number == 4
+        # The fork's log numbers its own transitions from 0, from the fork's version
+        assert [e["seq"] for e in game_service.event_log.iter_events(fork.game_id)] == [0, 1] == [0, forked.version]
+
+    @pytest.mark.asyncio
+    async def test_fork_is_independent_of_history_length(self, game_service):
+        game_id = game_service.create_game().game_id
+        game = game_service.get_game(game_id)
+        for i in range(10000):
+            game.public_action_history.append(AgentAction(agent_id="red", action_type=ActionType.SPEAK, content=str(i)))
+        game.step_number = 2
+        record_checkpoint(game)
+
+        fork = game_service.get_game(game_service.fork_game(game_id).game_id)
+        assert len(fork.public_action_history) == 10000
+        assert fork.public_action_history._items == []
+        assert fork.public_action_history[-1].content == "9999"
+
+    @pytest.mark.asyncio
+    async def test_fork_rebuilt_from_log(self, game_service):
+        game_id = game_service.create_game().game_id
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=quiet_llm(["one"] * 3 + ["two"] * 3)):
+            await game_service.step_game(game_id)
+            await game_service.step_game(game_id)
+        fork_id = game_service.fork_game(game_id, at_step=2).game_id
+        live = game_service.get_game(fork_id)
+
+        rebuilt = await ImpostorGameService().sync_game(fork_id)
+        assert rebuilt.model_dump(exclude={"counters"}) == live.model_dump(exclude={"counters"})
+
+    def test_invalid_fork_step(self, game_service):
+        game_id = game_service.create_game().game_id
+        with pytest.raises(ValueError):
+            game_service.fork_game(game_id, at_step=5)
+        assert game_service.fork_game("missing") is None
+
+
+class TestForkEndpoint:
+    def test_fork_endpoint(self):
+        client = TestClient(app)
+        game_id = client.post("/impostor-game/init").json()["game_id"]
+        response = client.post(f"/impostor-game/fork/{game_id}?at_step=1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["parent_game_id"] == game_id
+        assert client.get(f"/impostor-game/game/{data['game_id']}").json()["step_number"] == 1
+        assert client.post(f"/impostor-game/fork/{game_id}?at_step=7").status_code == 400
+        assert client.post("/impostor-game/fork/missing").status_code == 404
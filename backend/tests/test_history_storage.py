@@ -0,0 +1,77 @@
+import sys
+import pytest
+from unittest.mock import patch
+from src.features.impostor_game.history import ColdStore, History
+from src.features.impostor_game.schema import ActionType, AgentAction
+from src.features.impostor_game.service import ImpostorGameService
+
+
+@pytest.fixture
+def small_history(monkeypatch):
+    """Keep 4 items hot and compact in blocks of 4"""
+    monkeypatch.setattr(History, "hot_items", 4)
+    monkeypatch.setattr(History, "segment_items", 4)
+
+
+class TestCompaction:
+    """Test moving old history items to the cold store"""
+
+    def test_reads_span_hot_and_cold_items(self, small_history):
+        history = History(range(5))
+        history.extend(range(5, 30))
+        assert len(history) == 30
+        assert len(history._items) < 8 and history._cold_len == 30 - len(history._items)
+        assert list(history) == list(range(30))
+        assert history[0] == 0 and history[13] == 13 and history[-1] == 29
+        assert history[-15:] == list(range(15, 30))
+        assert history[2:10:3] == [2, 5, 8]
+
+    def test_forks_share_cold_segments(self, small_history):
+        parent = History(range(20))
+        fork = parent.fork(10)
+        fork.extend(["a", "b"])
+        parent.extend(range(20, 40))
+        assert list(fork) == list(range(10)) + ["a", "b"]
+        assert list(parent) == list(range(40))
+
+    def test_spilled_segments_round_trip(self, small_history, tmp_path, monkeypatch):
+        store = ColdStore(str(tmp_path))
+        monkeypatch.setattr(History, "cold_store", store)
+        actions = [AgentAction(agent_id="red", action_type=ActionType.SPEAK, content=str(i)) for i in range(20)]
+        history = History(actions)
+        assert store.spilling
+        assert all(isinstance(segment.ref, tuple) for segment in history._cold)
+        assert list(history) == actions
+
+    def test_agent_ids_are_interned(self):
+        action = AgentAction(agent_id="".join(["r", "ed"]), action_type=ActionType.VOTE, content="x",
+                             target_agent_id="".join(["bl", "ue"]))
+        assert action.agent_id is sys.intern("red") and action.target_agent_id is sys.intern("blue")
+
+
+class TestLongGame:
+    """Test that a long game keeps only a bounded tail of each history in memory"""
+
+    @pytest.mark.asyncio
+    async def test_histories_stay_bounded(self, small_history, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        service = ImpostorGameService()
+        game_id = service.create_game(max_steps=61).game_id
+
+        async def llm(messages, **kwargs):
+            if "moderating" in messages[-1]["content"]:
+                return "Red"
+            return '{"think": "Hmm", "speak": "Where were you?", "impostor_hypothesis": "blue", "vote": null}'
+
+        with patch.object(service.llm_client, 'generate_response', side_effect=llm):
+            for _ in range(60):
+                await service.step_game(game_id)
+
+        game = service.get_game(game_id)
+        histories = [game.public_action_history, game.checkpoints, *game.private_thoughts.values(),
+                     *(agent.memory_history for agent in game.agents)]
+        assert all(len(history._items) < 8 for history in histories)
+        assert len(game.public_action_history) == 60
+        assert [a.content for a in game.public_action_history[:2]] == ["Where were you?"] * 2
+        fork = service.get_game(service.fork_game(game_id, at_step=3).game_id)
+        assert len(fork.public_action_history) == 2
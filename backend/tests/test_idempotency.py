@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.features.impostor_game.service import ImpostorGameService, StaleStep, StepInProgress
+from src.features.impostor_game.step_cache import StepResponseCache
+
+
+@pytest.fixture
+def game_service(no_tts):
+    return ImpostorGameService()
+
+
+class TestIdempotentSteps:
+    """Test replaying and rejecting retried steps"""
+
+    @pytest.mark.asyncio
+    async def test_retry_replays_committed_step(self, game_service, mock_llm):
+        game_id = game_service.create_game().game_id
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm) as llm:
+            first = await game_service.run_step(game_id, idempotency_key="a")
+            calls = llm.call_count
+            assert await game_service.run_step(game_id, idempotency_key="a") is first
+            assert await game_service.run_step(game_id, step_number=1) is first
+            assert llm.call_count == calls
+            assert game_service.get_game(game_id).step_number == 2
+
+            second = await game_service.run_step(game_id, step_number=2)
+            assert second.step_number == 2 and llm.call_count > calls
+
+    @pytest.mark.asyncio
+    async def test_stale_step_is_rejected_without_stepping(self, game_service, mock_llm):
+        game_id = game_service.create_game().game_id
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm) as llm:
+            with pytest.raises(StaleStep) as rejected:
+                await game_service.run_step(game_id, step_number=4)
+            assert rejected.value.current_step == 1 and llm.call_count == 0
+        assert game_service.idempotency_stats["stale_rejected"] == 1
+        assert game_service.get_game(game_id).step_number == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_while_running_is_refused(self, game_service, mock_llm):
+        game_id = game_service.create_game().game_id
+        started = asyncio.Event()
+
+        async def slow_llm(messages, **kwargs):
+            started.set()
+            await asyncio.sleep(0.05)
+            return await mock_llm(messages)
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=slow_llm):
+            step = asyncio.ensure_future(game_service.run_step(game_id, idempotency_key="k"))
+            await started.wait()
+            with pytest.raises(StepInProgress):
+                await game_service.run_step(game_id, idempotency_key="k")
+            result = await step
+        assert await game_service.run_step(game_id, idempotency_key="k") is result
+
+    def test_cache_is_bounded(self, game_service):
+        cache = StepResponseCache(max_entries=3)
+        game_id = game_service.create_game().game_id
+        response = game_service.get_game_state_response(game_id)
+        for step in range(1, 4):
+            cache.put(response.model_copy(update={"step_number": step}), idempotency_key=f"k{step}")
+        assert len(cache) == 3 and cache.stats["evicted"] == 3
+        assert cache.get(game_id, step_number=1) is None
+        assert cache.get(game_id, idempotency_key="k3").step_number == 3
+
+
+class TestIdempotencyEndpoint:
+    """Test retried step requests over HTTP"""
+
+    def test_replay_header_and_conflict(self, game_service, mock_llm):
+        from src.main import app
+        from src.features.impostor_game import routes
+        app.dependency_overrides[routes.get_game_service] = lambda: game_service
+        client = TestClient(app)
+        try:
+            game_id = client.post("/impostor-game/init").json()["game_id"]
+            with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+                first = client.post(f"/impostor-game/step/{game_id}", headers={"Idempotency-Key": "retry-me"})
+                retry = client.post(f"/impostor-game/step/{game_id}", headers={"Idempotency-Key": "retry-me"})
+                stale = client.post(f"/impostor-game/step/{game_id}?step_number=7")
+            assert first.status_code == retry.status_code == 200
+            assert retry.headers["Idempotent-Replayed"] == "true" and retry.json() == first.json()
+            assert stale.status_code == 409 and "2" in stale.json()["detail"]
+            assert client.post(f"/impostor-game/step/{game_id}", headers={"Idempotency-Key": ""}).status_code == 400
+        finally:
+            app.dependency_overrides.clear()
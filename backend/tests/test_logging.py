@@ -0,0 +1,90 @@
+import asyncio
+import io
+import json
+import logging
+import pytest
+from unittest.mock import patch
+from src.core import log
+from src.features.impostor_game.service import ImpostorGameService
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    log.configure_logging(level="DEBUG", fmt="json", debug_sample_rate=1.0, stream=stream)
+    yield stream
+    log.shutdown_logging()
+
+
+def records(stream):
+    log.shutdown_logging()  # flush the queue
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestStructuredLogging:
+    """Test the queued, game-tagged logging layer"""
+
+    def test_records_carry_game_id_and_extra_fields(self, log_stream):
+        logger = logging.getLogger("src.test")
+        log.bind_game("game-1")
+        logger.info("Step completed", extra={"step": 3})
+        log.bind_game(None)
+        logger.warning("no game")
+        entries = records(log_stream)
+        assert entries[0]["msg"] == "Step completed" and entries[0]["game_id"] == "game-1" and entries[0]["step"] == 3
+        assert "game_id" not in entries[1] and entries[1]["level"] == "WARNING"
+
+    def test_disabled_debug_never_formats(self):
+        stream = io.StringIO()
+        log.configure_logging(level="INFO", stream=stream)
+        calls = []
+
+        class Expensive:
+            def __str__(self):
+                calls.append(1)
+                return "x"
+
+        logging.getLogger("src.test").debug("value %s", Expensive())
+        assert records(stream) == [] and calls == []
+
+    def test_debug_sampled_per_game(self):
+        stream = io.StringIO()
+        log.configure_logging(level="DEBUG", debug_sample_rate=0.5, stream=stream)
+        logger = logging.getLogger("src.test")
+        for i in range(200):
+            log.bind_game(f"game-{i}")
+            logger.debug("a")
+            logger.debug("b")
+            logger.info("always")
+        log.bind_game(None)
+        entries = records(stream)
+        debug_games = [e["game_id"] for e in entries if e["level"] == "DEBUG"]
+        assert len([e for e in entries if e["level"] == "INFO"]) == 200
+        assert 40 < len(set(debug_games)) < 160
+        # A sampled game keeps its full trace
+        assert all(debug_games.count(game) == 2 for game in set(debug_games))
+
+    def test_full_queue_drops_instead_of_blocking(self, monkeypatch):
+        monkeypatch.setenv("LOG_QUEUE_SIZE", "1")
+        handler = log.configure_logging(level="INFO", stream=io.StringIO())
+        log._listener.stop()  # nothing drains the queue
+        log._listener = None
+        for _ in range(5):
+            logging.getLogger("src.test").info("burst")
+        assert handler.dropped == 4
+        log.shutdown_logging()
+
+    @pytest.mark.asyncio
+    async def test_step_logs_are_tagged_with_the_game(self, log_stream, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        service = ImpostorGameService()
+        game_id = service.create_game().game_id
+
+        async def llm(messages, **kwargs):
+            return "Red" if "moderating" in messages[-1]["content"] else '{"think": "Hmm", "speak": "Hi", "vote": null}'
+
+        with patch.object(service.llm_client, 'generate_response', side_effect=llm):
+            await asyncio.ensure_future(service.step_game(game_id))
+        entries = [e for e in records(log_stream) if e["logger"].startswith("src.features") and not e["msg"].startswith("Loading")]
+        assert entries and all(e.get("game_id") == game_id for e in entries)
+        assert any(e["msg"] == "Step completed" and e["step"] == 1 for e in entries)
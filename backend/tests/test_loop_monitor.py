@@ -0,0 +1,120 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.core.log import bind_game
+from src.core.loop_monitor import LoopMonitor, request_scope_var
+from src.core.metrics import Histogram
+
+
+def blocking_call(seconds):
+    time.sleep(seconds)
+
+
+async def slow_turns(messages, **kwargs):
+    """Agent turns from an LLM client that blocks the loop"""
+    blocking_call(0.1)
+    if "moderating" in messages[-1]["content"]:
+        return "Red"
+    return '{"think": "t", "speak": "Blue, where were you?", "impostor_hypothesis": "blue", "vote": null}'
+
+
+class TestHistogram:
+    """Test the Prometheus histogram samples"""
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram([0.1, 1.0])
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        samples = histogram.samples()
+        assert [(s[1]["le"], s[2]) for s in samples[:3]] == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+        assert samples[3] == ("_sum", {}, 3.65) and samples[4] == ("_count", {}, 4)
+
+
+class TestLoopMonitor:
+    """Test stall detection and attribution"""
+
+    @pytest.mark.asyncio
+    async def test_stall_captures_stack_game_and_route(self):
+        monitor = LoopMonitor(interval=0.01, stall_threshold=0.05)
+        monitor.start()
+        try:
+            async def handler():
+                request_scope_var.set({"type": "http", "method": "POST", "path": "/impostor-game/step/g1"})
+                bind_game("g1")
+                blocking_call(0.25)
+
+            await asyncio.sleep(0.03)
+            await asyncio.ensure_future(handler())
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        assert monitor.stats["stalls"] == 1
+        stall = monitor.stalls[0]
+        assert stall["game_id"] == "g1" and stall["route"] == "POST /impostor-game/step/g1"
+        assert stall["duration_s"] >= 0.15
+        assert any("blocking_call" in line for line in stall["stack"])
+        assert monitor.stalls_for("g1") == [stall] and monitor.stalls_for("other") == []
+        assert monitor.lag.count > 1 and monitor.stats["max_lag_s"] >= 0.15
+
+    @pytest.mark.asyncio
+    async def test_previous_task_factory_is_kept_and_restored(self):
+        loop = asyncio.get_running_loop()
+        created = []
+
+        def factory(loop, coro, context=None):
+            created.append(coro)
+            return asyncio.Task(coro, loop=loop, context=context)
+
+        loop.set_task_factory(factory)
+        monitor = LoopMonitor(interval=0.01)
+        monitor.start()
+        try:
+            task = asyncio.ensure_future(asyncio.sleep(0))
+            await task
+            assert created and monitor.context_of(task) is not None
+        finally:
+            await monitor.stop()
+            restored = loop.get_task_factory()
+            loop.set_task_factory(None)
+        assert restored is factory
+
+    @pytest.mark.asyncio
+    async def test_no_stall_below_threshold(self):
+        monitor = LoopMonitor(interval=0.01, stall_threshold=0.2)
+        monitor.start()
+        try:
+            blocking_call(0.05)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+        assert monitor.stats["stalls"] == 0 and not monitor.running
+
+
+class TestLoopMonitorEndpoints:
+    """Test stalls reported for the blocking request's game and route"""
+
+    def test_blocking_step_is_attributed(self, monkeypatch):
+        from src.main import app
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        monkeypatch.setenv("IMPOSTOR_LOOP_MONITOR_INTERVAL_S", "0.01")
+        monkeypatch.setenv("IMPOSTOR_LOOP_STALL_S", "0.05")
+        monkeypatch.setenv("IMPOSTOR_ADMIN_TOKEN", "secret")
+        monkeypatch.delattr(app.state, "game_service", raising=False)
+
+        with TestClient(app) as client, patch('src.core.tts_service.tts_service.text_to_speech', return_value=None):
+            game_id = client.post("/impostor-game/init").json()["game_id"]
+            with patch.object(app.state.game_service.llm_client, 'generate_response', side_effect=slow_turns):
+                client.post(f"/impostor-game/step/{game_id}")
+            time.sleep(0.05)
+            stalls = client.get(f"/impostor-game/debug/{game_id}").json()["loop_stalls"]
+            assert stalls and stalls[0]["route"] == "POST /impostor-game/step/{game_id}" and "stack" not in stalls[0]
+            assert client.get("/debug/loop").status_code == 403
+            loop = client.get("/debug/loop", headers={"X-Admin-Token": "secret"}).json()
+            assert loop["stalls"] >= 1
+            assert any("blocking_call" in line for line in loop["recent_stalls"][-1]["stack"])
+            assert "impostor_event_loop_lag_seconds_bucket" in client.get("/metrics").text
+        del app.state.game_service
+
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.core.profiling import Profile, RequestProfiler, _await_chain, _joins_tasks
+
+
+async def slow_llm(messages, **kwargs):
+    """Waits on the "provider", then burns some CPU parsing"""
+    await asyncio.sleep(0.05)
+    deadline = time.perf_counter() + 0.01
+    while time.perf_counter() < deadline:
+        pass
+    if "moderating" in messages[-1]["content"]:
+        return "Red"
+    return '{"think": "t", "speak": "Blue, where were you?", "impostor_hypothesis": "blue", "vote": null}'
+
+
+class TestProfileRequests:
+    """Test which requests ask for profiling"""
+
+    def test_token_required(self):
+        profiler = RequestProfiler()
+        assert not profiler.requested({"headers": [(b"x-profile", b"anything")]})
+        profiler.configure("secret", 0.005, 5)
+        assert profiler.requested({"headers": [(b"x-profile", b"secret")]})
+        assert not profiler.requested({"headers": [(b"x-profile", b"wrong")]})
+        assert profiler.requested({"headers": [(b"x-profile", b"1"), (b"x-admin-token", b"secret")]})
+        assert not profiler.requested({"headers": [(b"x-admin-token", b"secret")]})  # an admin call is not profiled unless asked
+        assert not profiler.requested({"headers": [], "query_string": b"engine=joint&profile=secret"})  # never from the URL
+        assert not profiler.requested({"headers": []})
+
+
+class TestSampler:
+    """Test sampling the loop from the sampler thread"""
+
+    @pytest.mark.asyncio
+    async def test_gather_is_a_join(self):
+        async def waiter():
+            await asyncio.sleep(1)
+
+        async def joiner():
+            await asyncio.gather(waiter(), waiter())
+
+        task = asyncio.ensure_future(joiner())
+        sleeper = asyncio.ensure_future(waiter())
+        await asyncio.sleep(0.01)
+        try:
+            assert _joins_tasks(*_await_chain(task.get_coro()))
+            assert not _joins_tasks(*_await_chain(sleeper.get_coro()))
+        finally:
+            task.cancel()
+            sleeper.cancel()
+
+    @pytest.mark.asyncio
+    async def test_changing_task_set_skips_the_tick(self):
+        profile = Profile({"method": "GET", "path": "/"}, 0.005)
+        loop = asyncio.get_running_loop()
+        with patch("asyncio.all_tasks", side_effect=RuntimeError("Set changed size during iteration")):
+            profile._sample(loop, 0)
+        assert profile.samples == 0
+        with patch("asyncio.all_tasks", side_effect=[RuntimeError("Set changed size during iteration"), set()]):
+            profile._sample(loop, 0)
+        assert profile.samples == 1
+
+
+class TestProfilingEndpoints:
+    """Test profiling a step end to end"""
+
+    def test_profiled_step(self, monkeypatch):
+        from src.main import app
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        monkeypatch.setenv("IMPOSTOR_ADMIN_TOKEN", "secret")
+        monkeypatch.delattr(app.state, "game_service", raising=False)
+        admin = {"X-Admin-Token": "secret"}
+
+        with TestClient(app) as client, patch('src.core.tts_service.tts_service.text_to_speech', return_value=None):
+            game_id = client.post("/impostor-game/init").json()["game_id"]
+            assert "x-profile-id" not in client.get(f"/impostor-game/game/{game_id}").headers
+            with patch.object(app.state.game_service.llm_client, 'generate_response', side_effect=slow_llm):
+                response = client.post(f"/impostor-game/step/{game_id}", headers={"X-Profile": "secret"})
+            assert response.status_code == 200
+            profile_id = response.headers["x-profile-id"]
+
+            assert client.get(f"/admin/profiles/{profile_id}").status_code == 403
+            profile = client.get(f"/admin/profiles/{profile_id}", headers=admin).json()
+            assert profile["route"] == "POST /impostor-game/step/{game_id}" and profile["game_id"] == game_id
+            assert profile["status"] == 200 and profile["attributed"] and profile["samples"] > 0
+            assert profile["running_s"] > 0
+            assert any("agents.py" in call for call in profile["awaiting_s"])
+
+            folded = client.get(f"/admin/profiles/{profile_id}?format=folded", headers=admin).text
+            stack, count = folded.splitlines()[0].rsplit(" ", 1)
+            assert stack.startswith("[") and int(count) > 0
+            assert [p["id"] for p in client.get("/admin/profiles", headers=admin).json()] == [profile_id]
+            assert client.get("/admin/profiles/missing", headers=admin).status_code == 404
+        del app.state.game_service
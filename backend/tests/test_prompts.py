@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import patch
+from src.features.impostor_game.conversation import RenderedConversation, format_action
+from src.features.impostor_game.history import History
+from src.features.impostor_game.prompts import PromptTemplate
+from src.features.impostor_game.schema import ActionType, AgentAction
+from src.features.impostor_game.service import ImpostorGameService
+
+
+class TestPromptTemplate:
+    """Test compiled prompt templates"""
+
+    def test_partial_then_render(self):
+        template = PromptTemplate('You are {color} ({name}). Reply {{"vote": null}} in step {step}.')
+        agent = template.partial(color="red", name="Red")
+        assert agent.slots == ["step"]
+        assert agent.render(step=3) == 'You are red (Red). Reply {"vote": null} in step 3.'
+        assert template.render(color="blue", name="Blue", step=1).startswith("You are blue (Blue)")
+
+    def test_missing_and_invalid_slots(self):
+        with pytest.raises(KeyError):
+            PromptTemplate("{a} and {b}").render(a="x")
+        with pytest.raises(ValueError):
+            PromptTemplate("{agent.name}")
+
+
+class TestAgentReuse:
+    """Test that agents and their static prompt segments are reused across steps"""
+
+    @pytest.fixture
+    def game_service(self, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        return ImpostorGameService()
+
+    @pytest.mark.asyncio
+    async def test_agents_reused_within_a_game(self, game_service):
+        game_id = game_service.create_game().game_id
+        prompts = []
+
+        async def llm(messages, **kwargs):
+            if "moderating" in messages[-1]["content"]:
+                return "Red"
+            prompts.append(messages[-1]["content"])
+            return '{"think": "Hmm", "speak": "Hi", "vote": null}'
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=llm):
+            await game_service.step_game(game_id)
+            agents = dict(game_service.game_agents[game_id])
+            await game_service.step_game(game_id)
+
+        assert game_service.game_agents[game_id] == agents
+        red = agents["red"]
+        assert red.get_role_description().startswith("You are Red (red), a CREWMATE")
+        assert agents["yellow"].get_role_description().startswith("You are Yellow (yellow), the IMPOSTOR")
+        # The instruction block is the same string object every step
+        assert any(p is red.instructions for p in prompts[:3]) and any(p is red.instructions for p in prompts[3:])
+
+    def test_forks_get_their_own_agents(self, game_service):
+        game_id = game_service.create_game().game_id
+        game = game_service.get_game(game_id)
+        agent = game_service._create_agent(game.agents[0], game_id)
+        assert game_service._create_agent(game.agents[0], game_id) is agent
+
+        fork = game_service.get_game(game_service.fork_game(game_id).game_id)
+        assert game_service._create_agent(fork.agents[0], fork.game_id) is not agent
+        assert game_service._create_agent(game.agents[0]) is not agent
+
+
+class TestRenderedConversation:
+    """Test the shared, incrementally rendered conversation window"""
+
+    def test_each_action_formatted_once(self):
+        history = History()
+        conversation = RenderedConversation(size=3)
+        with patch("src.features.impostor_game.conversation.format_action", side_effect=format_action) as fmt:
+            for i in range(10):
+                history.append(AgentAction(agent_id="red", action_type=ActionType.VOTE, content=str(i), target_agent_id="blue"))
+                conversation.sync(history)
+                conversation.sync(history)
+        assert fmt.call_count == 10
+        assert conversation.text() == "\n".join(f"red vote: {i} (targeting blue)" for i in range(7, 10))
+
+    def test_prompt_shared_by_agents_until_next_sync(self):
+        history = History([AgentAction(agent_id="red", action_type=ActionType.SPEAK, content="hi")])
+        conversation = RenderedConversation.of(history)
+        template = PromptTemplate("Chat: {conversation}")
+        first = conversation.render(template)
+        assert conversation.render(template) is first
+        history.append(AgentAction(agent_id="blue", action_type=ActionType.SPEAK, content="hey"))
+        assert conversation.sync(history).render(template) == "Chat: red speak: hi\nblue speak: hey"
+
+    def test_other_history_starts_over(self):
+        parent = History([AgentAction(agent_id="red", action_type=ActionType.SPEAK, content=str(i)) for i in range(5)])
+        conversation = RenderedConversation.of(parent)
+        fork = parent.fork(2)
+        assert conversation.sync(fork).text(empty="none") == "red speak: 0\nred speak: 1"
+        assert RenderedConversation.of([]).text(empty="none") == "none"
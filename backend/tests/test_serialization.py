@@ -0,0 +1,24 @@
+import json
+from fastapi.encoders import jsonable_encoder
+from src.core.responses import ModelResponse
+from src.features.impostor_game.history import History
+from src.features.impostor_game.schema import ActionType, AgentAction, GamePhase, StepResponse
+
+
+class TestModelResponse:
+    """Test the fast response encoding path"""
+
+    def test_matches_validated_encoding(self):
+        history = History([AgentAction(agent_id="red", action_type=ActionType.SPEAK, content="Où étais-tu ?")])
+        fast = StepResponse.model_construct(game_id="g", phase=GamePhase.ACTIVE, step_number=1, max_steps=30,
+                                            turns=[], conversation_history=history.fork(), message="ok")
+        validated = StepResponse.model_validate(fast.model_dump())
+        assert json.loads(ModelResponse(fast).body) == jsonable_encoder(validated)
+
+    def test_snapshot_is_not_affected_by_later_steps(self):
+        history = History([AgentAction(agent_id="red", action_type=ActionType.SPEAK, content="one")])
+        response = StepResponse.model_construct(game_id="g", phase=GamePhase.ACTIVE, step_number=1, max_steps=30,
+                                                turns=[], conversation_history=history.fork(), message="ok")
+        history.append(AgentAction(agent_id="blue", action_type=ActionType.SPEAK, content="two"))
+        body = json.loads(ModelResponse(response).body)
+        assert [a["content"] for a in body["conversation_history"]] == ["one"]
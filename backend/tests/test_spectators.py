@@ -0,0 +1,101 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from src.features.impostor_game.spectators import SpectatorHub
+
+
+def step(n, winner=None):
+    return {"type": "step", "step": n, "winner": winner}
+
+
+class TestSpectatorHub:
+    """Test encoding once and bounding slow viewers"""
+
+    @pytest.mark.asyncio
+    async def test_frames_are_encoded_once(self):
+        encode_state = MagicMock(return_value=('{"step_number":1}', False))
+        hub = SpectatorHub(encode_state, lambda game_id: 0)
+        viewers = [hub.subscribe("g") for _ in range(3)]
+        snapshots = [await viewer.next() for viewer in viewers]
+        assert all(snapshot is snapshots[0] for snapshot in snapshots) and encode_state.call_count == 1
+        assert json.loads(snapshots[0].data) == {"seq": 0, "type": "snapshot", "state": {"step_number": 1}}
+
+        hub.publish("g", step(1), 1)
+        frames = [await viewer.next() for viewer in viewers]
+        assert all(frame is frames[0] for frame in frames) and hub.stats["frames_encoded"] == 1
+        assert frames[0].sse == b'id: 1\nevent: step\ndata: {"seq":1,"type":"step","step":1,"winner":null}\n\n'
+        assert hub.fanout_latency.count == 3
+
+        hub.publish("other", step(1), 1)
+        assert hub.stats == {"published": 2, "frames_encoded": 1, "snapshots_encoded": 1, "delivered": 3, "resynced": 0, "dropped": 0}
+
+    @pytest.mark.asyncio
+    async def test_slow_viewer_gets_a_snapshot(self):
+        versions = {"g": 0}
+        hub = SpectatorHub(lambda game_id: ("{}", False), versions.get, buffer_size=2)
+        viewer = hub.subscribe("g")
+        await viewer.next()
+        for n in range(1, 6):
+            versions["g"] = n
+            hub.publish("g", step(n), n)
+        assert len(viewer.frames) <= 2 and hub.stats["resynced"] >= 1
+        catch_up = await viewer.next()
+        assert catch_up.type == "snapshot" and catch_up.seq >= 3
+        assert all(frame.seq > catch_up.seq for frame in viewer.frames)
+
+    @pytest.mark.asyncio
+    async def test_slow_viewer_dropped_and_stream_ends_at_game_over(self):
+        hub = SpectatorHub(lambda game_id: ("{}", False), lambda game_id: 0, buffer_size=1, slow_policy="drop")
+        slow, fast = hub.subscribe("g"), hub.subscribe("g")
+        await slow.next(), await fast.next()
+        hub.publish("g", step(1), 1)
+        assert await fast.next() is not None
+        hub.publish("g", step(2, winner="Crewmates"), 2)
+        assert await slow.next() is None and hub.stats["dropped"] == 1 and hub.subscriber_count("g") == 1
+        assert (await fast.next()).final and await fast.next() is None
+
+    @pytest.mark.asyncio
+    async def test_snapshot_ahead_of_a_frame_skips_it(self):
+        """A shared step is published after its commit: a snapshot taken in between already has it"""
+        versions = {"g": 3}
+        hub = SpectatorHub(lambda game_id: ("{}", False), versions.get)
+        viewer = hub.subscribe("g")
+        assert (await viewer.next()).seq == 3
+        hub.publish("g", step(3), 3)
+        hub.publish("g", step(4), 4)
+        assert (await viewer.next()).seq == 4
+        assert hub.snapshot("missing") is None
+        assert not hasattr(hub, "sequences") and hub.subscriber_count("g") == 1
+
+
+class TestSpectatorEndpoints:
+    """Test watching a game over WebSocket and SSE"""
+
+    def test_websocket_and_sse(self, monkeypatch, mock_llm, no_tts):
+        from src.main import app
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        monkeypatch.delattr(app.state, "game_service", raising=False)
+
+        with TestClient(app) as client:
+            game_id = client.post("/impostor-game/init?max_steps=5").json()["game_id"]
+            service = app.state.game_service
+            with client.websocket_connect(f"/impostor-game/watch/{game_id}") as websocket:
+                snapshot = websocket.receive_json()
+                assert snapshot["type"] == "snapshot" and snapshot["state"]["step_number"] == 1
+                with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+                    client.post(f"/impostor-game/step/{game_id}")
+                event = websocket.receive_json()
+                assert event["type"] == "step" and event["step"] == 1 and event["seq"] == snapshot["seq"] + 1
+                assert client.get(f"/impostor-game/debug/{game_id}").json()["spectators"]["watching"] == 1
+
+            with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+                client.post("/impostor-game/bulk-step", json={"game_ids": [game_id], "until": "game_over"})
+            # A finished game's stream is its final snapshot
+            response = client.get(f"/impostor-game/watch/{game_id}")
+            assert response.headers["content-type"].startswith("text/event-stream")
+            assert response.text.startswith("id: ") and "event: snapshot" in response.text
+            assert '"status":"finished"' in response.text
+            assert client.get("/impostor-game/watch/missing").status_code == 404
+            assert "impostor_spectator_fanout_seconds_bucket" in client.get("/metrics").text
+        del app.state.game_service
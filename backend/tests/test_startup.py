@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import pytest
+from fastapi.testclient import TestClient
+from src.core.llm_client import LLMClient
+from src.core.settings import Settings
+from src.features.impostor_game.service import ImpostorGameService
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestSettings:
+    """Test reading the environment into one settings object"""
+
+    def test_from_env(self):
+        settings = Settings.from_env({"LLM_MODEL": "m", "IMPOSTOR_STEP_DEADLINE_S": "5", "IMPOSTOR_WARMUP": "true"})
+        assert settings.llm_model == "m" and settings.step_deadline_s == 5.0 and settings.warmup
+        assert settings.anthropic_api_key is None and settings.state_url is None
+        assert Settings.from_env({}).event_log_dir is None
+        assert Settings.from_env({"IMPOSTOR_EVENT_LOG_DIR": "logs"}).event_log_dir == "logs"
+
+    def test_services_take_settings(self):
+        service = ImpostorGameService(Settings(anthropic_api_key="k", event_log_dir=None, max_active_agents=2))
+        assert service.activation_scheduler.max_active == 2
+        assert not service.event_log.enabled
+        assert service._game_master_data is None  # read on first use
+        assert service.game_master_data
+
+
+class TestLazyStartup:
+    """Test that importing and creating the app does no provider work"""
+
+    def test_import_has_no_side_effects(self):
+        env = {key: value for key, value in os.environ.items() if key not in ("ANTHROPIC_API_KEY", "ELEVENLABS_API_KEY")}
+        code = "import sys, src.main; print('anthropic' in sys.modules, 'httpx' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["False", "False"]
+        assert result.stderr == ""
+
+    @pytest.mark.asyncio
+    async def test_missing_key_fails_on_first_call(self):
+        client = LLMClient(Settings())
+        with pytest.raises(ValueError):
+            await client.generate_response([{"role": "user", "content": "hi"}])
+        assert client.breaker.snapshot()["state"] == "closed"
+
+    def test_ready_after_startup(self, monkeypatch):
+        from src.main import app
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        monkeypatch.setenv("IMPOSTOR_WARMUP", "1")
+        monkeypatch.delattr(app.state, "game_service", raising=False)
+        assert TestClient(app).get("/ready").status_code == 503  # lifespan not run
+
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            assert response.status_code == 200
+            timings = response.json()["startup_s"]
+            assert timings["import"] > 0 and "warmup" in timings
+            assert app.state.game_service.llm_client._client is not None
+            assert 'impostor_startup_seconds{phase="warmup"}' in client.get("/metrics").text
+        assert not app.state.ready
+        del app.state.game_service
@@ -0,0 +1,72 @@
+import gzip
+import json
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.core.compression import choose_encoding
+from src.core.settings import Settings
+from src.features.impostor_game.service import ImpostorGameService
+from src.features.impostor_game.state_cache import EncodedStateCache
+
+
+class TestEncodedStateCache:
+    """Test encoding once per version and negotiating compression"""
+
+    def test_body_per_version(self):
+        cache = EncodedStateCache(max_games=2, min_compress_size=10)
+        encodes = []
+
+        def encode():
+            encodes.append(1)
+            return b'{"a": "' + b"x" * 100 + b'"}'
+
+        body, encoding = cache.body("g", 1, encode, "gzip")
+        assert encoding == "gzip" and gzip.decompress(body).startswith(b'{"a"')
+        assert cache.body("g", 1, encode, "gzip")[0] is body and cache.body("g", 1, encode)[1] is None
+        assert len(encodes) == 1 and cache.stats["compressed"] == 1
+
+        cache.body("g", 2, encode)
+        cache.body("h", 1, encode)
+        cache.body("i", 1, encode)
+        assert len(encodes) == 4 and len(cache) == 2 and cache.stats["evicted"] == 1
+
+    def test_small_bodies_are_not_compressed(self):
+        cache = EncodedStateCache()
+        assert cache.body("g", 1, lambda: b"{}", "gzip") == (b"{}", None)
+
+    def test_choose_encoding(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, identity") is None
+        assert choose_encoding("*") in ("br", "gzip")
+        assert choose_encoding(None) is None
+
+
+class TestGameStateEtag:
+    """Test conditional GETs of the game state"""
+
+    def test_not_modified_until_a_step_commits(self, mock_llm, no_tts):
+        from src.main import app
+        from src.features.impostor_game import routes
+        service = ImpostorGameService(Settings(event_log_dir=None))
+        app.dependency_overrides[routes.get_game_service] = lambda: service
+        client = TestClient(app)
+        try:
+            game_id = client.post("/impostor-game/init").json()["game_id"]
+            first = client.get(f"/impostor-game/game/{game_id}")
+            etag = first.headers["ETag"]
+            assert first.status_code == 200 and first.json()["step_number"] == 1
+            assert first.headers["Content-Encoding"] == "gzip" and "Accept-Encoding" in first.headers["Vary"]
+
+            unchanged = client.get(f"/impostor-game/game/{game_id}", headers={"If-None-Match": etag})
+            assert unchanged.status_code == 304 and unchanged.content == b""
+            plain = client.get(f"/impostor-game/game/{game_id}", headers={"Accept-Encoding": "identity"})
+            assert "Content-Encoding" not in plain.headers and json.loads(plain.content) == first.json()
+            assert service.state_bodies.stats["encoded"] == 1
+
+            with patch.object(service.llm_client, 'generate_response', side_effect=mock_llm):
+                client.post(f"/impostor-game/step/{game_id}")
+            changed = client.get(f"/impostor-game/game/{game_id}", headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.headers["ETag"] != etag
+            assert changed.json()["step_number"] == 2 and service.get_game(game_id).version == 1
+            assert client.get("/impostor-game/game/missing").status_code == 404
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from benchmarks.stub_redis import start_server
+from src.core.resp import RedisClient, RedisError
+from src.features.impostor_game.event_log import GameEventLog
+from src.features.impostor_game.service import ImpostorGameService, StepInProgress
+from src.features.impostor_game.state_store import RedisGameStore, StateConflict
+
+
+@pytest_asyncio.fixture
+async def redis_url():
+    server, _, url = await start_server()
+    yield url
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.fixture
+def workers(redis_url, monkeypatch, mock_llm, no_tts):
+    """Two game services ("uvicorn workers") sharing one state store"""
+    monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+    monkeypatch.setenv("IMPOSTOR_STATE_URL", redis_url)
+    services = [ImpostorGameService(), ImpostorGameService()]
+    for service in services:
+        patch.object(service.llm_client, "generate_response", side_effect=mock_llm).start()
+    yield services
+    patch.stopall()
+
+
+class TestRedisProtocol:
+    """Test the RESP client against the in-process stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_commands_and_expiry(self, redis_url):
+        client = RedisClient.from_url(redis_url)
+        assert await client.execute("SET", "k", b"v", "NX", "PX", 50) == "OK"
+        assert await client.execute("SET", "k", b"w", "NX") is None
+        assert await client.execute("MGET", "k", "missing") == [b"v", None]
+        await asyncio.sleep(0.06)
+        assert await client.execute("GET", "k") is None
+        with pytest.raises(RedisError):
+            await client.execute("NOPE")
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_watched_transaction_aborts_on_concurrent_write(self, redis_url):
+        client = RedisClient.from_url(redis_url)
+        async with client.connection() as connection:
+            await connection.execute("WATCH", "version")
+            await client.execute("SET", "version", 2)  # another connection writes first
+            await connection.execute("MULTI")
+            assert await connection.execute("SET", "version", 3) == "QUEUED"
+            assert await connection.execute("EXEC") is None
+        assert await client.execute("GET", "version") == b"2"
+        await client.close()
+
+
+class TestSharedGameState:
+    """Test games stepped across workers through the shared store"""
+
+    @pytest.mark.asyncio
+    async def test_consecutive_steps_on_different_workers(self, workers):
+        a, b = workers
+        game_id = a.create_game().game_id
+        await a.publish_game(game_id)
+
+        await b.run_step(game_id)
+        result = await a.run_step(game_id)  # a's copy is stale: it reloads version 2 first
+        assert result.step_number == 2
+        await b.run_step(game_id)
+
+        game = await a.sync_game(game_id)
+        assert game.step_number == 4 and a.game_versions[game_id] == 4
+        assert len(game.public_action_history) == 3
+        assert a.state_store.stats["loads"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_step_is_refused(self, workers, mock_llm):
+        a, b = workers
+        game_id = a.create_game().game_id
+        await a.publish_game(game_id)
+
+        started = asyncio.Event()
+
+        async def slow_llm(messages, **kwargs):
+            started.set()
+            await asyncio.sleep(0.2)
+            return await mock_llm(messages)
+
+        with patch.object(a.llm_client, "generate_response", side_effect=slow_llm):
+            step = asyncio.ensure_future(a.run_step(game_id))
+            await started.wait()
+            with pytest.raises(StepInProgress):
+                await b.run_step(game_id)
+            await step
+        assert (await b.sync_game(game_id)).step_number == 2
+
+    @pytest.mark.asyncio
+    async def test_commit_after_lost_lease_is_rejected(self, workers, mock_llm):
+        a, b = workers
+        game_id = a.create_game().game_id
+        await a.publish_game(game_id)
+        a.step_lease_seconds = 0.05
+
+        async def outlive_lease(messages, **kwargs):
+            await asyncio.sleep(0.1)
+            return await mock_llm(messages)
+
+        with patch.object(a.llm_client, "generate_response", side_effect=outlive_lease):
+            step = asyncio.ensure_future(a.run_step(game_id))
+            await asyncio.sleep(0.07)  # a's lease has expired: b steps the game meanwhile
+            await b.run_step(game_id)
+            with pytest.raises(StateConflict):
+                await step
+
+        # a dropped its diverged copy and sees b's step
+        assert game_id not in a.games
+        assert (await a.sync_game(game_id)).step_number == 2
+        assert a.game_versions[game_id] == 2
+
+    @pytest.mark.asyncio
+    async def test_conflicting_step_is_never_logged_or_broadcast(self, workers, tmp_path, mock_llm):
+        a, b = workers
+        a.event_log = GameEventLog(str(tmp_path))
+        game_id = a.create_game().game_id
+        await a.publish_game(game_id)
+        a.step_lease_seconds = 0.05
+
+        async def outlive_lease(messages, **kwargs):
+            await asyncio.sleep(0.1)
+            return await mock_llm(messages)
+
+        with patch.object(a.llm_client, "generate_response", side_effect=outlive_lease):
+            step = asyncio.ensure_future(a.run_step(game_id))
+            await asyncio.sleep(0.07)
+            await b.run_step(game_id)
+            with pytest.raises(StateConflict):
+                await step
+        assert [e["type"] for e in a.event_log.iter_events(game_id)] == ["game_created"]
+        assert a.spectators.stats["published"] == 1 and not a.pending_events
+
+        # A committed step is logged once the store has it, numbered by the game's version
+        a.step_lease_seconds = 120
+        await a.run_step(game_id)
+        events = list(a.event_log.iter_events(game_id))
+        assert [(e["type"], e["seq"]) for e in events] == [("game_created", 0), ("step", 2)]
+
+    @pytest.mark.asyncio
+    async def test_state_round_trips(self, workers):
+        a, b = workers
+        game_id = a.create_game().game_id
+        await a.publish_game(game_id)
+        await a.run_step(game_id)
+        fork = a.fork_game(game_id, at_step=1)
+        await a.publish_game(fork.game_id)
+
+        assert (await b.sync_game(game_id)).model_dump() == a.get_game(game_id).model_dump()
+        assert (await b.sync_game(fork.game_id)).step_number == 1
+        assert RedisGameStore.decode(RedisGameStore.encode(a.get_game(game_id))) == a.get_game(game_id)
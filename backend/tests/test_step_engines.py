@@ -0,0 +1,94 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.features.impostor_game.service import ImpostorGameService
+from src.features.impostor_game.schema import ActionType
+
+
+class TestJointStepEngine:
+    """Test the joint (one call per step) engine against the fan-out engine"""
+
+    @pytest.fixture
+    def game_service(self):
+        return ImpostorGameService()
+
+    def test_split_turns_validates_each_agent(self, game_service):
+        """Joint output is split into one normalized AgentTurn per alive agent"""
+        game_id = game_service.create_game(engine="joint").game_id
+        game = game_service.get_game(game_id)
+        alive_agents = [a for a in game.agents if a.is_alive]
+
+        response = "Here you go: " + json.dumps({"turns": {
+            "red": {"think": "Yellow was slow at the card swipe", "speak": "Yellow, why so slow?", "impostor_hypothesis": "YELLOW", "vote": "purple"},
+            "blue": {"think": "", "speak": "null", "impostor_hypothesis": "red", "vote": None},
+        }})
+        turns = game_service.joint_generator.split_turns(response, alive_agents, game.step_number)
+
+        assert [t.agent_id for t in turns] == [a.id for a in alive_agents]
+        red, blue, yellow = turns
+        assert red.impostor_hypothesis == "yellow"
+        assert red.vote is None  # not a valid color
+        assert blue.think == "I'm processing the situation..."
+        assert blue.speak is None
+        # Missing agent falls back to the _parse_turn fallback turn (impostor flavor)
+        assert yellow.think.startswith("I need to analyze who suspects me")
+        assert all(t.memory_update.step_number == game.step_number for t in turns)
+
+    def test_split_turns_accepts_list_format(self, game_service):
+        """A list of turns with agent_id is accepted as well as a color-keyed object"""
+        game_id = game_service.create_game(engine="joint").game_id
+        game = game_service.get_game(game_id)
+        alive_agents = [a for a in game.agents if a.is_alive]
+
+        response = json.dumps({"turns": [
+            {"agent_id": a.id, "think": f"{a.id} thinking", "speak": None} for a in alive_agents
+        ]})
+        turns = game_service.joint_generator.split_turns(response, alive_agents, game.step_number)
+        assert [t.think for t in turns] == [f"{a.id} thinking" for a in alive_agents]
+
+    @pytest.mark.asyncio
+    async def test_joint_step_uses_single_agent_call(self, game_service):
+        """Pre-meeting joint steps issue one agent call plus the speaker selection call"""
+        game_id = game_service.create_game(engine="joint").game_id
+        calls = []
+
+        async def mock_llm(messages, **kwargs):
+            calls.append(messages)
+            if len(calls) == 1:
+                return json.dumps({"turns": {
+                    "red": {"think": "red private", "speak": "Hello all", "impostor_hypothesis": "yellow", "vote": None},
+                    "blue": {"think": "blue private", "speak": "Hi red", "impostor_hypothesis": "red", "vote": None},
+                    "yellow": {"think": "yellow private", "speak": None, "impostor_hypothesis": "blue", "vote": None},
+                }})
+            return "Blue"
+
+        with patch('src.core.tts_service.tts_service.text_to_speech', return_value=None), \
+             patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+            result = await game_service.step_game(game_id)
+
+        assert len(calls) == 2
+        assert len(result.turns) == 3
+        game = game_service.get_game(game_id)
+        # Private thoughts stay with their own agent
+        assert [t.content for t in game.private_thoughts["red"]] == ["red private"]
+        assert [t.content for t in game.private_thoughts["yellow"]] == ["yellow private"]
+        speaks = [a for a in result.conversation_history if a.action_type == ActionType.SPEAK]
+        assert [(a.agent_id, a.content) for a in speaks] == [("blue", "Hi red")]
+        assert all(len(a.memory_history) == 1 for a in game.agents if a.is_alive)
+
+    @pytest.mark.asyncio
+    async def test_meeting_steps_use_fanout(self, game_service):
+        """From the emergency meeting on, the joint engine falls back to per-agent calls"""
+        game_id = game_service.create_game(engine="joint").game_id
+        game_service.get_game(game_id).step_number = 25
+        calls = []
+
+        async def mock_llm(messages, **kwargs):
+            calls.append(messages)
+            return '{"think": "thinking", "speak": null, "vote": null}'
+
+        with patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+            result = await game_service.step_game(game_id)
+
+        assert len(calls) == 3
+        assert len(result.turns) == 3
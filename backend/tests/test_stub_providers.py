@@ -0,0 +1,76 @@
+import json
+import anthropic
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from benchmarks.stub_providers import ProviderProfile, create_app
+from src.core.llm_client import LLMClient, LLMProviderError
+from src.core.tts_service import ElevenLabsTTSService
+from src.features.impostor_game.service import ImpostorGameService
+
+
+def stub_llm_client(app) -> LLMClient:
+    """An LLMClient whose requests are answered by the stand-in app, parsed into the SDK's Message type"""
+    client = LLMClient()
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub")
+
+    async def create(**params):
+        response = await http.post("/v1/messages", json=params)
+        if response.status_code != 200:
+            raise anthropic.APIStatusError(response.json()["error"]["message"], response=response, body=response.json())
+        return anthropic.types.Message.model_validate(response.json())
+
+    client.client.messages.create = create
+    return client
+
+
+class TestStubProviders:
+    """Test that the stand-in providers speak the real API shapes and drive full game steps"""
+
+    @pytest.mark.asyncio
+    async def test_messages_api_through_the_sdk(self):
+        app = create_app()
+        client = stub_llm_client(app)
+        text = await client.generate_response([{"role": "user", "content": "YOU ARE: Red (Red)\nRespond with valid JSON only!"}])
+        turn = json.loads(text)
+        assert set(turn) == {"think", "speak", "impostor_hypothesis", "vote"} and turn["impostor_hypothesis"] != "red"
+        assert app.state.stats["llm_requests"] == 1 and app.state.stats["output_tokens"] > 0
+
+    @pytest.mark.asyncio
+    async def test_injected_rate_limits_are_typed_errors(self):
+        app = create_app(llm=ProviderProfile(rate_limit_rate=1.0, retry_after=2))
+        client = stub_llm_client(app)
+        with pytest.raises(LLMProviderError) as excinfo:
+            await client.generate_response([{"role": "user", "content": "hi"}])
+        assert excinfo.value.__cause__.status_code == 429
+        assert excinfo.value.__cause__.response.headers["retry-after"] == "2"
+        assert app.state.stats["llm_rate_limited"] == 1
+
+    def test_clients_use_configured_base_urls(self, monkeypatch):
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", "http://127.0.0.1:9100")
+        monkeypatch.setenv("ELEVENLABS_BASE_URL", "http://127.0.0.1:9100/v1/")
+        monkeypatch.delenv("ELEVENLABS_API_KEY", raising=False)
+        assert str(LLMClient().client.base_url).startswith("http://127.0.0.1:9100")
+        tts = ElevenLabsTTSService()
+        assert tts.base_url == "http://127.0.0.1:9100/v1" and tts.api_key
+
+    def test_text_to_speech_returns_audio(self):
+        client = TestClient(create_app(audio_bytes=100))
+        response = client.post("/v1/text-to-speech/voice", json={"text": "hello there"})
+        assert response.status_code == 200 and response.headers["content-type"] == "audio/mpeg"
+        assert len(response.content) == 100
+        assert client.get("/stats").json()["tts_characters"] == 11
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("engine", ["fanout", "joint"])
+    async def test_game_steps_against_the_stub(self, monkeypatch, engine):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        service = ImpostorGameService()
+        service.llm_client = service.joint_generator.llm_client = stub_llm_client(create_app(seed=1))
+        game_id = service.create_game(engine=engine).game_id
+        with patch('src.core.tts_service.tts_service.text_to_speech', return_value=None):
+            result = await service.step_game(game_id)
+        assert not any(turn.degraded for turn in result.turns)
+        assert all(not turn.think.startswith("I'm analyzing the situation") for turn in result.turns)
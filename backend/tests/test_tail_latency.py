@@ -0,0 +1,156 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.core.hedging import LatencyTracker, hedged
+from src.core.llm_client import LLMClient
+from src.core.settings import Settings
+from src.core.usage import UsageMeter
+from src.features.impostor_game.service import ImpostorGameService
+
+
+class TestHedging:
+    """Test hedged requests and latency percentiles"""
+
+    def test_percentile_needs_samples(self):
+        tracker = LatencyTracker(min_samples=5)
+        for value in [0.1, 0.2, 0.3, 0.4]:
+            tracker.record(value)
+        assert tracker.percentile(95) is None
+        tracker.record(5.0)
+        assert tracker.percentile(95) == 5.0
+        assert tracker.percentile(50) == 0.3
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_when_fast(self):
+        fired = []
+
+        async def call():
+            return "ok"
+
+        assert await hedged(call, 0.1, on_hedge=lambda: fired.append(1)) == "ok"
+        assert fired == []
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_and_loser_is_cancelled(self):
+        """A slow primary is raced by a duplicate, the duplicate wins and the primary is cancelled"""
+        attempts = []
+        cancelled = []
+        fired, wins = [], []
+
+        async def call():
+            attempt = len(attempts)
+            attempts.append(attempt)
+            try:
+                await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(attempt)
+                raise
+            return f"attempt {attempt}"
+
+        start = time.monotonic()
+        result = await hedged(call, 0.05, on_hedge=lambda: fired.append(1), on_hedge_win=lambda: wins.append(1))
+        await asyncio.sleep(0)
+        assert result == "attempt 1"
+        assert time.monotonic() - start < 0.5
+        assert fired == [1] and wins == [1]
+        assert cancelled == [0]
+
+    @pytest.mark.asyncio
+    async def test_failed_duplicate_waits_for_primary(self):
+        attempts = []
+
+        async def call():
+            attempt = len(attempts)
+            attempts.append(attempt)
+            if attempt == 1:
+                raise RuntimeError("boom")
+            await asyncio.sleep(0.1)
+            return "primary"
+
+        assert await hedged(call, 0.01) == "primary"
+
+    @pytest.mark.asyncio
+    async def test_hedge_needs_a_free_slot(self):
+        """A duplicate takes its own scheduler slot, and is skipped when there is none"""
+        llm = LLMClient(Settings(anthropic_api_key="x", llm_max_concurrency=1))
+        attempts = []
+
+        async def create(**kwargs):
+            attempts.append(1)
+            await asyncio.sleep(0.1)
+            return SimpleNamespace(usage=None)
+
+        llm.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+        with patch.object(llm, '_hedge_delay', return_value=0.01):
+            async with llm.scheduler.slot():
+                await llm._create({"model": "m"})
+            assert attempts == [1] and llm.stats["hedges_skipped"] == 1
+
+            llm.scheduler.capacity = 2
+            async with llm.scheduler.slot():
+                await llm._create({"model": "m"})
+                await asyncio.sleep(0.01)  # the cancelled duplicate gives its slot back
+                assert llm.scheduler.running == 1
+        assert len(attempts) == 3 and llm.stats["hedges_fired"] == 1
+        assert llm.scheduler.running == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_loser_is_metered(self):
+        """The request cut short by the winner was billed too, so it is metered like the winner"""
+        llm = LLMClient(Settings(anthropic_api_key="x"))
+        attempts = []
+
+        async def create(**kwargs):
+            attempts.append(1)
+            await asyncio.sleep(1.0 if len(attempts) == 1 else 0.01)
+            return SimpleNamespace(usage=SimpleNamespace(input_tokens=100, output_tokens=10))
+
+        llm.client = SimpleNamespace(messages=SimpleNamespace(create=create))
+        meter = UsageMeter()
+        with patch.object(llm, '_hedge_delay', return_value=0.05), \
+             patch('src.core.llm_client.usage_meter', meter):
+            await llm._create({"model": "m"})
+        assert llm.stats["hedge_wins"] == 1 and llm.stats["hedge_losers_billed"] == 1
+        assert meter.total.llm_calls == 2 and meter.total.input_tokens == 200
+
+
+class TestStepDeadline:
+    """Test that slow agents get degraded turns instead of stalling the step"""
+
+    @pytest.fixture
+    def game_service(self):
+        service = ImpostorGameService()
+        service.step_deadline = 0.2
+        return service
+
+    @pytest.mark.asyncio
+    async def test_slow_agent_gets_degraded_turn(self, game_service):
+        game_id = game_service.create_game().game_id
+        game = game_service.get_game(game_id)
+        game.impostor_hypotheses["blue"] = "yellow"
+
+        async def mock_llm(messages, **kwargs):
+            prompt = messages[0]["content"]
+            if prompt.startswith("You are Blue"):
+                await asyncio.sleep(5)
+            if "moderating" in messages[-1]["content"]:
+                return "Red"
+            return '{"think": "fast thinking", "speak": "hello", "impostor_hypothesis": "red", "vote": null}'
+
+        start = time.monotonic()
+        with patch('src.core.tts_service.tts_service.text_to_speech', return_value=None), \
+             patch.object(game_service.llm_client, 'generate_response', side_effect=mock_llm):
+            result = await game_service.step_game(game_id)
+        assert time.monotonic() - start < 2
+
+        blue = next(t for t in result.turns if t.agent_id == "blue")
+        assert blue.degraded
+        assert blue.speak is None
+        assert blue.impostor_hypothesis == "yellow"
+        assert game.counters["deadline_misses"] == 1
+        # The degraded agent's previous hypothesis is kept and no private thought is stored
+        assert game.impostor_hypotheses["blue"] == "yellow"
+        assert "blue" not in game.private_thoughts
+        assert all(not t.degraded for t in result.turns if t.agent_id != "blue")
@@ -0,0 +1,140 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.core.llm_client import LLMClient
+from src.core.log import bind_game
+from src.core.tenancy import tenant_from_api_key, tenant_var
+from src.core.tts_service import tts_service
+from src.core.usage import BUDGET_ECONOMY, BUDGET_NO_TTS, BUDGET_OK, UsageMeter
+from src.features.impostor_game.service import ImpostorGameService
+
+
+@pytest.fixture
+def meter(monkeypatch):
+    meter = UsageMeter(game_budget_usd=0.01, tts_cutoff=0.5)
+    monkeypatch.setattr("src.core.llm_client.usage_meter", meter)
+    monkeypatch.setattr("src.core.tts_service.usage_meter", meter)
+    monkeypatch.setattr("src.features.impostor_game.service.usage_meter", meter)
+    yield meter
+    bind_game(None)
+
+
+def fake_create(models, input_tokens=1000, output_tokens=100):
+    async def create(**params):
+        models.append(params["model"])
+        return SimpleNamespace(content=[SimpleNamespace(text="ok")],
+                               usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens))
+    return create
+
+
+class TestUsageMeter:
+    """Test usage aggregation and per-game budgets"""
+
+    def test_costs_are_aggregated_per_game_tenant_and_model(self):
+        meter = UsageMeter()
+        token = tenant_var.set("key-abc")
+        try:
+            meter.record_llm("claude-3-5-sonnet-20241022", 1_000_000, 0, game_id="g1")
+            meter.record_llm("claude-3-5-haiku-20241022", 0, 1_000_000, game_id="g2")
+        finally:
+            tenant_var.reset(token)
+        meter.record_tts(2000, game_id="g1")
+
+        assert meter.game_usage("g1").as_dict()["cost_usd"] == pytest.approx(3.0 + 0.6)
+        assert meter.games["g2"].cost_usd == pytest.approx(4.0)
+        assert meter.tenants["key-abc"].llm_calls == 2 and meter.tenants["anonymous"].tts_characters == 2000
+        assert meter.models["claude-3-5-haiku-20241022"].output_tokens == 1_000_000
+        assert meter.total.cost_usd == pytest.approx(7.6)
+
+    def test_budget_degrades_tts_then_model(self):
+        meter = UsageMeter(game_budget_usd=1.0, tts_cutoff=0.8)
+        meter.record_llm("claude-3-5-sonnet-20241022", 200_000, 0, game_id="g1")  # $0.60
+        assert meter.budget_state("g1") == BUDGET_OK and meter.allows_tts("g1")
+        meter.record_llm("claude-3-5-sonnet-20241022", 100_000, 0, game_id="g1")  # $0.90
+        assert meter.budget_state("g1") == BUDGET_NO_TTS and not meter.allows_tts("g1")
+        meter.record_llm("claude-3-5-sonnet-20241022", 100_000, 0, game_id="g1")  # $1.20
+        assert meter.budget("g1") == {"budget_usd": 1.0, "spent_usd": 1.2, "state": BUDGET_ECONOMY}
+        assert meter.budget_state("g2") == BUDGET_OK
+
+    def test_tenant_label_hides_the_key(self):
+        label = tenant_from_api_key("secret-key")
+        assert label.startswith("key-") and "secret" not in label
+        assert label == tenant_from_api_key("secret-key") != tenant_from_api_key("other-key")
+
+    def test_unknown_keys_are_anonymous(self, monkeypatch):
+        from src.core.tenancy import TenantMiddleware
+        monkeypatch.setattr(TenantMiddleware, "known_tenants", frozenset())
+        TenantMiddleware.configure("real-key, other")
+        middleware = TenantMiddleware(None)
+        assert middleware.tenant_of("real-key") == tenant_from_api_key("real-key")
+        assert middleware.tenant_of("random") == middleware.tenant_of(None) == "anonymous"
+
+    @pytest.mark.asyncio
+    async def test_finished_game_is_forgotten(self, meter):
+        service = ImpostorGameService()
+        game_id = service.create_game(max_steps=5).game_id
+        meter.record_llm("claude-3-5-sonnet-20241022", 1_000_000, 0, game_id=game_id)
+        assert meter.budget_state(game_id) == BUDGET_ECONOMY and game_id in meter.games
+
+        service.get_game(game_id).step_number = 5  # time is up: the next step ends the game
+        assert (await service.step_game(game_id)).game_over
+        assert game_id not in meter.games and meter.budget_state(game_id) == BUDGET_OK
+        assert meter.tenants["anonymous"].llm_calls == 1
+
+
+class TestMeteredCalls:
+    """Test that LLM and TTS calls are metered and degraded for the current game"""
+
+    @pytest.mark.asyncio
+    async def test_llm_calls_switch_to_economy_model_past_budget(self, meter):
+        client = LLMClient()
+        models = []
+        client.client.messages.create = fake_create(models, input_tokens=1000, output_tokens=100)  # $0.0045 a call
+        bind_game("g1")
+        for _ in range(4):
+            assert await client.generate_response([{"role": "user", "content": "hi"}]) == "ok"
+
+        assert models == [client.model] * 3 + [client.economy_model]
+        assert meter.games["g1"].llm_calls == 4 and meter.games["g1"].input_tokens == 4000
+
+    @pytest.mark.asyncio
+    async def test_step_skips_tts_past_soft_limit(self, meter, monkeypatch):
+        monkeypatch.setenv("IMPOSTOR_EVENT_LOG_DIR", "")
+        monkeypatch.setattr(tts_service, "api_key", "test")
+        service = ImpostorGameService()
+        game = service.create_game()
+        meter.record_llm("claude-3-5-sonnet-20241022", 2000, 0, game_id=game.game_id)  # $0.006, past 50%
+
+        async def mock_generate(messages, max_tokens=200, temperature=0.7):
+            if "moderating" in messages[-1]["content"]:
+                return "Red"
+            return '{"think": "hmm", "speak": "I saw Blue near the vent", "vote": null}'
+
+        with patch.object(service.llm_client, "generate_response", side_effect=mock_generate), \
+             patch.object(tts_service, "text_to_speech") as text_to_speech:
+            result = await service.step_game(game.game_id)
+
+        text_to_speech.assert_not_called()
+        assert all(turn.audio_base64 is None for turn in result.turns)
+
+
+class TestUsageEndpoints:
+    """Test usage reporting on /debug and /metrics"""
+
+    def test_debug_and_metrics_report_usage(self, meter, monkeypatch):
+        from src.main import app
+        from src.features.impostor_game import routes
+        monkeypatch.setattr(routes, "usage_meter", meter)
+        client = TestClient(app)
+        game_id = client.post("/impostor-game/init").json()["game_id"]
+        meter.record_llm("claude-3-5-sonnet-20241022", 1000, 100, game_id=game_id)
+
+        debug = client.get(f"/impostor-game/debug/{game_id}").json()
+        assert debug["usage"]["llm_calls"] == 1 and debug["usage"]["input_tokens"] == 1000
+        assert debug["budget"]["state"] == BUDGET_OK
+
+        with patch("src.core.metrics._collectors", [meter.collect]):
+            text = client.get("/metrics", headers={"X-API-Key": "secret-key"}).text
+        assert "# TYPE impostor_llm_calls_total counter" in text
+        assert 'impostor_llm_model_tokens_total{model="claude-3-5-sonnet-20241022",direction="input"} 1000' in text